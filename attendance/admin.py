@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import AttendanceLog, DailySummary, LatenessRecord
+from .models import AttendanceLog, DailySummary, DirtyDay, LatenessRecord
 
 
 @admin.register(AttendanceLog)
@@ -20,3 +20,10 @@ class DailySummaryAdmin(admin.ModelAdmin):
 class LatenessRecordAdmin(admin.ModelAdmin):
     list_display = ["employee", "date", "minutes_late", "check_in_time"]
     date_hierarchy = "date"
+
+
+@admin.register(DirtyDay)
+class DirtyDayAdmin(admin.ModelAdmin):
+    list_display = ["employee", "date", "reason", "created_at"]
+    list_filter = ["reason"]
+    date_hierarchy = "date"
@@ -0,0 +1,130 @@
+"""
+Sana oralig'i uchun kunlik xulosalarni (DailySummary, LatenessRecord) qayta hisoblash.
+Jarima va Telegram bu yerda yo'q — ular uchun run_weekly_penalties.
+
+Ishlatish:
+  python manage.py recompute_range --from 2026-01-01 --to 2026-03-31
+  python manage.py recompute_range --from 2026-01-01 --to 2026-03-31 --workers 4 --chunk 50
+  python manage.py recompute_range --from 2026-03-01 --to 2026-03-31 --employees EMP001,EMP002
+  python manage.py recompute_range --from 2026-03-01 --to 2026-03-31 --dry-run
+  python manage.py recompute_range --from 2026-01-01 --to 2026-03-31 --restart
+  python manage.py recompute_range --from 2025-01-01 --to 2025-12-31 --engine vectorized --chunk 1000
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from attendance.recompute import (
+    RangeCheckpoint,
+    _init_worker,
+    build_chunks,
+    get_chunk_runner,
+    run_chunk_in_worker,
+)
+from employees.models import Employee
+from reports.reconciliation import invalidate_snapshots
+
+
+class Command(BaseCommand):
+    help = "Oraliq bo'yicha kunlik xulosalarni chunklab (ixtiyoriy parallel) qayta hisoblaydi, checkpoint bilan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", required=True, help="Boshlanish sanasi (YYYY-MM-DD)")
+        parser.add_argument("--to", dest="date_to", required=True, help="Tugash sanasi (YYYY-MM-DD)")
+        parser.add_argument("--employees", default="", help="Vergul bilan employee_id lar (default: barcha faollar)")
+        parser.add_argument("--workers", type=int, default=1, help="Parallel processlar soni (default: 1)")
+        parser.add_argument("--chunk", type=int, default=50, help="Bir chunkdagi xodimlar soni (default: 50)")
+        parser.add_argument(
+            "--engine",
+            choices=["scalar", "vectorized"],
+            default="scalar",
+            help="scalar — har xodim-kun alohida; vectorized — chunk massivlarda (katta --chunk bilan tarixiy qayta qurish)",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Hisoblaydi, lekin hech narsa yozmaydi")
+        parser.add_argument("--restart", action="store_true", help="Checkpointni o'chirib boshidan boshlash")
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options["date_from"])
+            end = date.fromisoformat(options["date_to"])
+        except ValueError:
+            raise CommandError("--from va --to YYYY-MM-DD formatida bo'lishi kerak.")
+        if start > end:
+            raise CommandError("--from sanasi --to dan keyin bo'lmasligi kerak.")
+        workers = max(1, options["workers"])
+        if workers > 1 and connections["default"].vendor == "sqlite":
+            # SQLite bir vaqtda bitta yozuvchiga ruxsat beradi — parallel chunklar "database is locked" bilan yiqiladi
+            self.stderr.write(self.style.WARNING("SQLite: --workers e'tiborsiz qoldirildi, 1 process ishlatiladi."))
+            workers = 1
+        chunk_size = max(1, options["chunk"])
+        dry_run = options["dry_run"]
+        engine = options["engine"]
+        run_chunk = get_chunk_runner(engine)
+
+        qs = Employee.objects.filter(is_active=True)
+        ids = [s.strip() for s in options["employees"].split(",") if s.strip()]
+        if ids:
+            qs = qs.filter(employee_id__in=ids)
+        employee_pks = list(qs.values_list("pk", flat=True))
+        if not employee_pks:
+            self.stdout.write("Xodim topilmadi.")
+            return
+
+        chunks = build_chunks(employee_pks, chunk_size)
+        checkpoint = RangeCheckpoint.for_params(start, end, employee_pks, chunk_size)
+        if options["restart"]:
+            checkpoint.clear()
+        # dry-run checkpointga yozmaydi va uni hisobga ham olmaydi
+        pending = [i for i in range(len(chunks)) if dry_run or i not in checkpoint.done]
+        skipped = len(chunks) - len(pending)
+
+        self.stdout.write(
+            f"Oraliq: {start} — {end}, xodimlar: {len(employee_pks)}, chunklar: {len(chunks)} "
+            f"(o'tkazib yuborildi: {skipped}), workers={workers}, engine={engine}, dry_run={dry_run}"
+        )
+
+        started = time.monotonic()
+        total_done = total_errors = 0
+        if workers == 1 or len(pending) <= 1:
+            for index in pending:
+                done, errors = run_chunk(chunks[index], start, end, dry_run=dry_run)
+                total_done += done
+                total_errors += errors
+                self._chunk_finished(checkpoint, index, done, errors, len(chunks), dry_run)
+        else:
+            # Fork qilinadigan processlarga ochiq DB ulanishi o'tmasligi kerak
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                futures = [
+                    pool.submit(run_chunk_in_worker, index, chunks[index], start, end, dry_run, engine)
+                    for index in pending
+                ]
+                for future in as_completed(futures):
+                    index, done, errors = future.result()
+                    total_done += done
+                    total_errors += errors
+                    self._chunk_finished(checkpoint, index, done, errors, len(chunks), dry_run)
+
+        elapsed = time.monotonic() - started
+        rate = total_done / elapsed if elapsed > 0 else 0.0
+        if not dry_run:
+            # Qayta hisoblangan kunlar reconciliation snapshotlari eskirdi
+            invalidate_snapshots(start=start, end=end)
+            if not total_errors:
+                checkpoint.clear()
+        style = self.style.SUCCESS if not total_errors else self.style.WARNING
+        self.stdout.write(
+            style(
+                f"Tugadi: {total_done} xodim-kun, {total_errors} xato, {elapsed:.1f}s, "
+                f"{rate:.1f} xodim-kun/s{' (dry-run, hech narsa yozilmadi)' if dry_run else ''}."
+            )
+        )
+
+    def _chunk_finished(self, checkpoint, index, done, errors, total_chunks, dry_run):
+        # Xatoli chunk checkpointga yozilmaydi — qayta ishga tushirilganda yana hisoblanadi
+        if not dry_run and not errors:
+            checkpoint.mark_done(index)
+        self.stdout.write(f"  chunk {index + 1}/{total_chunks}: {done} xodim-kun, {errors} xato")
@@ -1,22 +1,32 @@
 """
 Oxirgi 7 kun uchun kunlik xulosa va jarimalarni hisoblash.
 Celery kerak emas — to'g'ridan-to'gri Telegram jo'natiladi.
+Hisoblash va yetkazish ajratilgan: xabarlar avval yig'iladi, oxirida digestlarga birlashtirilib
+cheklangan thread pool orqali (chat cheklovi umumiy klientda) jo'natiladi. Yuborilmaganlari outbox ga qo'yiladi.
 
 Ishlatish:
   python manage.py run_weekly_penalties
   python manage.py run_weekly_penalties --days 14
   python manage.py run_weekly_penalties --dry-run
+  python manage.py run_weekly_penalties --send-workers 8
 """
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
 from employees.models import Employee
 from attendance.services import recompute_daily_summary
 from attendance.models import LatenessRecord
-from penalties.services import apply_penalty_for_lateness
-from notifications.services import send_telegram_message_sync
+from penalties.exemptions import ExemptionIndex
+from penalties.services import apply_penalties_for_latenesses
+from notifications.client import TelegramClient
+from notifications.models import NotificationOutbox, TelegramSettings
+from notifications.outbox import pack_digests
+from reports.reconciliation import invalidate_snapshots
 
 
 class Command(BaseCommand):
@@ -34,6 +44,18 @@ class Command(BaseCommand):
             action="store_true",
             help="Jarima yozmasdan va Telegram jo'natmasdan faqat xulosa hisobla",
         )
+        parser.add_argument(
+            "--send-workers",
+            type=int,
+            default=4,
+            help="Telegram jo'natish uchun threadlar soni (default: 4)",
+        )
+        parser.add_argument(
+            "--max-wait",
+            type=float,
+            default=None,
+            help="Bitta xabar uchun cheklov/429 da kutish chegarasi, soniya (default: TELEGRAM_MAX_WAIT_SECONDS)",
+        )
 
     def handle(self, *args, **options):
         days = options["days"]
@@ -43,18 +65,27 @@ class Command(BaseCommand):
 
         self.stdout.write(f"Oraliq: {start_date} — {end_date} (dry_run={dry_run})")
 
+        # Butun oraliq uchun ozodlar bitta so'rov bilan yuklanadi
+        exemptions = ExemptionIndex.load(start_date, end_date)
+        messages = []
         for day_offset in range(days):
             day_date = start_date + timedelta(days=day_offset)
-            self._process_day(day_date, dry_run)
+            messages.extend(self._process_day(day_date, dry_run, exemptions))
+
+        # Qayta hisoblangan kunlar reconciliation snapshotlari eskirdi
+        invalidate_snapshots(start=start_date, end=end_date)
 
+        if messages:
+            self._deliver(messages, options["send_workers"], options["max_wait"])
         self.stdout.write(self.style.SUCCESS("Tugadi."))
 
-    def _process_day(self, day_date: date, dry_run: bool):
+    def _process_day(self, day_date: date, dry_run: bool, exemptions=None):
+        """Xulosa va jarimalar; Telegram xabarlari matnlari ro'yxatini qaytaradi (bu yerda jo'natilmaydi)."""
         # 1) Kunlik xulosa (LatenessRecord yaratiladi/yangilanadi)
         employees = Employee.objects.filter(is_active=True)
         for employee in employees:
             try:
-                recompute_daily_summary(employee, day_date)
+                recompute_daily_summary(employee, day_date, exemptions=exemptions)
             except Exception as e:
                 self.stderr.write(
                     self.style.WARNING(f"  recompute employee={employee.pk} {day_date}: {e}")
@@ -62,14 +93,19 @@ class Command(BaseCommand):
 
         if dry_run:
             self.stdout.write(f"  {day_date}: xulosa hisoblandi (dry-run, jarima o‘chirildi)")
-            return
+            return []
 
-        # 2) Shu kun uchun kechikishlar bo'yicha jarima + Telegram
-        lateness_records = LatenessRecord.objects.filter(date=day_date).select_related("employee")
-        sent = 0
+        # 2) Shu kun uchun kechikishlar bo'yicha jarima; xabarlar _deliver da jo'natiladi
+        lateness_records = list(LatenessRecord.objects.filter(date=day_date).select_related("employee"))
+        try:
+            penalties = apply_penalties_for_latenesses(lateness_records, exemptions=exemptions)
+        except Exception as e:
+            self.stderr.write(self.style.WARNING(f"  penalties {day_date}: {e}"))
+            penalties = {}
+        messages = []
         for lateness in lateness_records:
             try:
-                penalty = apply_penalty_for_lateness(lateness)
+                penalty = penalties.get(lateness.pk)
                 if not penalty:
                     continue
                 emp = lateness.employee
@@ -90,14 +126,47 @@ class Command(BaseCommand):
                 if getattr(emp, "telegram_username", None) and str(emp.telegram_username).strip():
                     username = str(emp.telegram_username).strip().lstrip("@")
                     msg_lines.append(f"@{username}")
-                result = send_telegram_message_sync("\n".join(msg_lines))
-                if result.get("ok"):
-                    sent += 1
-                else:
-                    self.stderr.write(
-                        self.style.WARNING(f"  Telegram {emp.employee_id}: {result.get('reason') or result.get('error')}")
-                    )
+                messages.append("\n".join(msg_lines))
             except Exception as e:
                 self.stderr.write(self.style.WARNING(f"  penalty lateness {lateness.pk}: {e}"))
 
-        self.stdout.write(f"  {day_date}: {len(lateness_records)} kechikish, {sent} xabar jo‘natildi.")
+        self.stdout.write(f"  {day_date}: {len(lateness_records)} kechikish, {len(messages)} xabar navbatga qo‘yildi.")
+        return messages
+
+    def _deliver(self, messages, workers: int, max_wait: float = None):
+        """
+        Xabarlarni digestlarga birlashtirib thread pool da jo'natadi. Tezlik cheklovi TelegramClient da
+        (chat bo'yicha, barcha processlar uchun umumiy); yuborilmagan digest xabarlari outbox ga qo'yiladi.
+        """
+        telegram = TelegramSettings.get_settings()
+        if not telegram.enabled or not telegram.bot_token or not telegram.chat_id:
+            self.stdout.write(f"Telegram sozlanmagan: {len(messages)} xabar jo‘natilmadi.")
+            return
+        max_wait = settings.TELEGRAM_MAX_WAIT_SECONDS if max_wait is None else max_wait
+        client = TelegramClient(telegram.bot_token)
+        digests = pack_digests(list(enumerate(messages)))
+
+        def send(digest):
+            # Threadlarda DB ishlatilmaydi — faqat HTTP va kesh
+            return client.send_message(telegram.chat_id, digest[1], max_wait=max_wait)
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = list(pool.map(send, digests))
+
+        sent = 0
+        failed = []
+        for (indexes, _text), result in zip(digests, results):
+            if result.get("ok"):
+                sent += len(indexes)
+                continue
+            self.stderr.write(self.style.WARNING(f"  Telegram: {result.get('error')} ({len(indexes)} xabar)"))
+            failed.extend(
+                NotificationOutbox(kind=NotificationOutbox.KIND_LATENESS, text=messages[i]) for i in indexes
+            )
+        if failed:
+            NotificationOutbox.objects.bulk_create(failed)
+        self.stdout.write(
+            f"Telegram: {len(digests)} digest, {sent}/{len(messages)} xabar jo‘natildi, "
+            f"{len(failed)} outbox ga qo‘yildi ({time.monotonic() - started:.1f}s)."
+        )
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0001_initial'),
+        ('employees', '0004_add_penalty_exemption'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirtyDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_index=True)),
+                ('reason', models.CharField(choices=[('log', 'Attendance log'), ('exemption', 'Penalty exemption'), ('schedule', 'Work schedule')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dirty_days', to='employees.employee')),
+            ],
+            options={
+                'verbose_name': 'Dirty Day',
+                'verbose_name_plural': 'Dirty Days',
+                'ordering': ['date', 'employee'],
+            },
+        ),
+    ]
@@ -99,3 +99,36 @@ class LatenessRecord(models.Model):
 
     def __str__(self):
         return f"{self.employee} {self.date} ({self.minutes_late} min late)"
+
+
+class DirtyDay(models.Model):
+    """
+    Qayta hisoblanishi kerak bo'lgan (xodim, kun) juftligi.
+    Log qo'shilganda/o'chirilganda, ozod o'zgarganda yoki grafik o'zgarganda yoziladi;
+    nightly task faqat shu qatorlarni qayta hisoblab, keyin o'chiradi.
+    """
+    REASON_LOG = "log"
+    REASON_EXEMPTION = "exemption"
+    REASON_SCHEDULE = "schedule"
+    REASON_CHOICES = [
+        (REASON_LOG, "Attendance log"),
+        (REASON_EXEMPTION, "Penalty exemption"),
+        (REASON_SCHEDULE, "Work schedule"),
+    ]
+
+    employee = models.ForeignKey(
+        "employees.Employee",
+        on_delete=models.CASCADE,
+        related_name="dirty_days",
+    )
+    date = models.DateField(db_index=True)
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["date", "employee"]
+        verbose_name = "Dirty Day"
+        verbose_name_plural = "Dirty Days"
+
+    def __str__(self):
+        return f"{self.employee_id} {self.date} ({self.reason})"
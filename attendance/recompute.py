@@ -0,0 +1,118 @@
+"""
+Sana oralig'i bo'yicha DailySummary/LatenessRecord ni qayta hisoblash (recompute_range komandasi uchun).
+Ish xodimlar bloklariga (chunk) bo'linadi: har bir chunk — bir nechta xodim x butun oraliq,
+ozodlar chunk uchun bitta so'rov bilan yuklanadi. Bajarilgan chunklar checkpoint faylga yoziladi,
+shuning uchun to'xtab qolgan ish xuddi shu parametrlar bilan qayta ishga tushirilganda davom etadi.
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+
+from employees.models import Employee
+from penalties.exemptions import ExemptionIndex
+from .services import recompute_daily_summary
+
+logger = logging.getLogger(__name__)
+
+
+def build_chunks(employee_pks, chunk_size: int):
+    """Tartiblangan xodim pk larini chunk_size li bloklarga bo'ladi."""
+    pks = sorted(employee_pks)
+    chunk_size = max(1, chunk_size)
+    return [pks[i:i + chunk_size] for i in range(0, len(pks), chunk_size)]
+
+
+def recompute_chunk(employee_pks, start: date, end: date, dry_run: bool = False):
+    """
+    Bitta chunk: berilgan xodimlar uchun [start, end] dagi har bir kunni qayta hisoblaydi.
+    dry_run=True bo'lsa hammasi tranzaksiya ichida bajariladi va oxirida rollback qilinadi.
+    Returns (employee_days, errors).
+    """
+    employees = list(Employee.objects.filter(pk__in=employee_pks, is_active=True).order_by("pk"))
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    done = errors = 0
+    with transaction.atomic():
+        exemptions = ExemptionIndex.load(start, end, employee_ids=[e.pk for e in employees])
+        for employee in employees:
+            for day in days:
+                try:
+                    with transaction.atomic():
+                        recompute_daily_summary(employee, day, exemptions=exemptions)
+                    done += 1
+                except Exception as e:
+                    errors += 1
+                    logger.exception("recompute_chunk employee=%s day=%s: %s", employee.pk, day, e)
+        if dry_run:
+            transaction.set_rollback(True)
+    return done, errors
+
+
+def _init_worker():
+    """ProcessPool worker: spawn bo'lsa Django ni sozlaydi; fork dan meros qolgan ulanishlarni tashlaydi."""
+    import django
+    from django.db import connections
+
+    django.setup()
+    for conn in connections.all(initialized_only=True):
+        conn.close()
+
+
+def get_chunk_runner(engine: str):
+    """"scalar" — har xodim-kun uchun recompute_daily_summary; "vectorized" — chunk bo'yicha massivlarda."""
+    if engine == "vectorized":
+        from .vectorized import recompute_chunk_vectorized
+
+        return recompute_chunk_vectorized
+    return recompute_chunk
+
+
+def run_chunk_in_worker(index, employee_pks, start, end, dry_run, engine="scalar"):
+    """Pool worker entry point: (index, employee_days, errors)."""
+    done, errors = get_chunk_runner(engine)(employee_pks, start, end, dry_run=dry_run)
+    return index, done, errors
+
+
+class RangeCheckpoint:
+    """
+    Bajarilgan chunk indekslarini JSON faylda saqlaydi. Fayl nomi parametrlar (oraliq, xodimlar,
+    chunk hajmi) hashidan olinadi — boshqa parametrlar bilan ishga tushirish eski checkpointni ishlatmaydi.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.done = set()
+        if self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self.done = set(json.load(f).get("done", []))
+            except (OSError, ValueError):
+                logger.warning("Checkpoint o'qilmadi, boshidan boshlanadi: %s", self.path)
+                self.done = set()
+
+    @classmethod
+    def for_params(cls, start: date, end: date, employee_pks, chunk_size: int, root=None):
+        root = Path(root or settings.RECOMPUTE_CHECKPOINT_DIR)
+        key = json.dumps([start.isoformat(), end.isoformat(), sorted(employee_pks), chunk_size])
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return cls(root / f"recompute_{start.isoformat()}_{end.isoformat()}_{digest}.json")
+
+    def mark_done(self, index: int):
+        self.done.add(index)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"done": sorted(self.done)}, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        self.done = set()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
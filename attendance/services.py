@@ -1,12 +1,17 @@
 """
 Business logic: process attendance events, compute daily summary, lateness.
 """
+import logging
 from datetime import datetime, date, timedelta
 from django.utils import timezone
 
 from employees.models import Employee
-from .models import AttendanceLog, DailySummary, LatenessRecord
-from penalties.models import PenaltyExemption
+from .models import AttendanceLog, DailySummary, DirtyDay, LatenessRecord
+from core.date_range import datetime_bounds
+from penalties.exemptions import ExemptionIndex
+from penalties.services import is_penalty_exempt
+
+logger = logging.getLogger(__name__)
 
 
 def get_employee_by_identifier(employee_id: str = None, device_person_id: str = None):
@@ -31,6 +36,17 @@ def resolve_employee_from_device_string(identifier: str):
     return Employee.objects.filter(device_person_id=s, is_active=True).first()
 
 
+def mark_days_dirty(pairs, reason: str):
+    """
+    (employee_pk, date) juftliklarini DirtyDay ga yozadi (bitta bulk_create).
+    Dublikatlar ruxsat etiladi — nightly task ularni (xodim, kun) bo'yicha birlashtiradi.
+    """
+    rows = [DirtyDay(employee_id=employee_pk, date=day, reason=reason) for employee_pk, day in set(pairs)]
+    if rows:
+        DirtyDay.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
 def create_log_idempotent(employee_id: str, event_type: str, timestamp, source_id: str = "", source: str = "device"):
     """
     Create attendance log if not already present (idempotent by source_id).
@@ -63,8 +79,11 @@ def create_log_idempotent(employee_id: str, event_type: str, timestamp, source_i
     return log, True
 
 
-def recompute_daily_summary(employee, day: date):
-    """Build or update DailySummary and LatenessRecord for one employee for one day."""
+def recompute_daily_summary(employee, day: date, exemptions=None):
+    """
+    Build or update DailySummary and LatenessRecord for one employee for one day.
+    exemptions: ixtiyoriy ExemptionIndex — batchlarda har kun uchun ozod so'rovi yuborilmaydi.
+    """
     logs = (
         AttendanceLog.objects.filter(employee=employee, timestamp__date=day)
         .order_by("timestamp")
@@ -87,9 +106,7 @@ def recompute_daily_summary(employee, day: date):
 
     # Agar shu xodim va sana uchun jarimadan ozod (ruxsat olgan/ta'til/kasallik) bo'lsa,
     # holatni "Ruxsat olgan" qilib, kechikish/jarimalarni hisoblamaymiz.
-    if PenaltyExemption.objects.filter(
-        employee=employee, date_from__lte=day, date_to__gte=day
-    ).exists():
+    if is_penalty_exempt(employee, day, exemptions=exemptions):
         summary.status = DailySummary.STATUS_LEAVE
         summary.minutes_late = 0
         summary.working_minutes = 0
@@ -140,3 +157,116 @@ def recompute_daily_summary(employee, day: date):
 
     summary.save()
     return summary
+
+
+def recompute_dirty_days(up_to: date):
+    """
+    DirtyDay ledgeridagi up_to gacha bo'lgan (xodim, kun) juftliklarini qayta hisoblaydi va
+    o'qilgan qatorlarni o'chiradi (ishlov paytida qo'shilgan yangilari keyingi safarga qoladi).
+    Returns qayta hisoblangan juftliklar soni.
+    """
+    rows = list(DirtyDay.objects.filter(date__lte=up_to).values_list("pk", "employee_id", "date"))
+    if not rows:
+        return 0
+    pairs = sorted({(employee_pk, day) for _pk, employee_pk, day in rows}, key=lambda p: (p[1], p[0]))
+    employee_pks = {employee_pk for employee_pk, _day in pairs}
+    employees = Employee.objects.filter(pk__in=employee_pks, is_active=True).in_bulk()
+    exemptions = ExemptionIndex.load(pairs[0][1], up_to, employee_ids=employee_pks)
+    for employee_pk, day in pairs:
+        employee = employees.get(employee_pk)
+        if not employee:
+            continue
+        try:
+            recompute_daily_summary(employee, day, exemptions=exemptions)
+        except Exception as e:
+            logger.exception("recompute_dirty_days employee=%s day=%s: %s", employee_pk, day, e)
+    pks = [pk for pk, _employee_pk, _day in rows]
+    for i in range(0, len(pks), 1000):
+        DirtyDay.objects.filter(pk__in=pks[i:i + 1000]).delete()
+    return len(pairs)
+
+
+def materialize_absent_rows(day: date) -> int:
+    """
+    Bitta set-based INSERT ... SELECT: shu kun grafik bo'yicha ishlashi kerak bo'lgan faol xodimlardan
+    DailySummary qatori ham, logi ham yo'qlariga "absent" (ozod bo'lsa "leave") qatori yoziladi.
+    Ish kunlari kompilyatsiya qilingan grafik keshidan olinadi (CSV ni SQL da parse qilmaymiz).
+    Returns kiritilgan qatorlar soni.
+    """
+    from django.db import connection
+
+    from employees.schedules import non_working_schedule_ids
+    from penalties.models import PenaltyExemption
+
+    ops = connection.ops
+    qn = ops.quote_name
+    summary_t = qn(DailySummary._meta.db_table)
+    employee_t = qn(Employee._meta.db_table)
+    exemption_t = qn(PenaltyExemption._meta.db_table)
+    log_t = qn(AttendanceLog._meta.db_table)
+    dt_from, dt_to = datetime_bounds(day, day)
+    day_v = ops.adapt_datefield_value(day)
+
+    params = [
+        # SELECT
+        day_v,
+        day_v,
+        day_v,
+        DailySummary.STATUS_LEAVE,
+        DailySummary.STATUS_ABSENT,
+        False,
+        ops.adapt_datetimefield_value(timezone.now()),
+        # WHERE
+        True,
+        day_v,
+        ops.adapt_datetimefield_value(dt_from),
+        ops.adapt_datetimefield_value(dt_to),
+    ]
+    schedule_filter = ""
+    non_working = non_working_schedule_ids(day)
+    if non_working:
+        placeholders = ", ".join(["%s"] * len(non_working))
+        schedule_filter = f"AND (e.work_schedule_id IS NULL OR e.work_schedule_id NOT IN ({placeholders}))"
+        params += non_working
+
+    sql = f"""
+        INSERT INTO {summary_t}
+            (employee_id, date, status, working_minutes, minutes_late, missing_check_out, updated_at)
+        SELECT
+            e.id,
+            %s,
+            CASE WHEN EXISTS (
+                SELECT 1 FROM {exemption_t} x
+                WHERE x.employee_id = e.id AND x.date_from <= %s AND x.date_to >= %s
+            ) THEN %s ELSE %s END,
+            0, 0, %s, %s
+        FROM {employee_t} e
+        WHERE e.is_active = %s
+          AND NOT EXISTS (SELECT 1 FROM {summary_t} s WHERE s.employee_id = e.id AND s.date = %s)
+          AND NOT EXISTS (
+              SELECT 1 FROM {log_t} l
+              WHERE l.employee_id = e.id AND l.timestamp >= %s AND l.timestamp < %s
+          )
+          {schedule_filter}
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def mark_absent_for_day(day: date, exemptions=None):
+    """
+    Kunlik xulosasi yo'q faol xodimlar uchun: logi bor, lekin xulosasi yo'qlar qayta hisoblanadi,
+    qolganlariga materialize_absent_rows bitta INSERT bilan "absent"/"leave" qatorini yozadi.
+    Returns yaratilgan absent/leave qatorlar soni.
+    """
+    dt_from, dt_to = datetime_bounds(day, day)
+    with_logs = (
+        Employee.objects.filter(is_active=True)
+        .exclude(daily_summaries__date=day)
+        .filter(attendance_logs__timestamp__gte=dt_from, attendance_logs__timestamp__lt=dt_to)
+        .distinct()
+    )
+    for employee in with_logs:
+        recompute_daily_summary(employee, day, exemptions=exemptions)
+    return materialize_absent_rows(day)
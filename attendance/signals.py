@@ -0,0 +1,90 @@
+"""Signal handlers: o'zgargan (xodim, kun) juftliklarini DirtyDay ledgeriga yozish."""
+from datetime import timedelta
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from employees.models import Employee, WorkSchedule
+from penalties.models import PenaltyExemption
+
+from .models import AttendanceLog, DirtyDay
+from .services import mark_days_dirty
+
+SCHEDULE_FIELDS = ("work_schedule_id", "work_start_time", "work_end_time", "grace_period_minutes")
+
+
+def _local_day(dt):
+    return timezone.localtime(dt).date() if timezone.is_aware(dt) else dt.date()
+
+
+def _employee_deletion(origin):
+    """Xodim o'chirilayotganda (cascade) ledgerga yozmaymiz — yangi qator FK ni buzadi."""
+    return isinstance(origin, Employee) or getattr(origin, "model", None) is Employee
+
+
+def _date_range(date_from, date_to):
+    return [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+
+
+@receiver(post_save, sender=AttendanceLog, dispatch_uid="attendance_dirty_log_save")
+def mark_dirty_on_log_save(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    mark_days_dirty([(instance.employee_id, _local_day(instance.timestamp))], DirtyDay.REASON_LOG)
+
+
+@receiver(post_delete, sender=AttendanceLog, dispatch_uid="attendance_dirty_log_delete")
+def mark_dirty_on_log_delete(sender, instance, origin=None, **kwargs):
+    if _employee_deletion(origin):
+        return
+    mark_days_dirty([(instance.employee_id, _local_day(instance.timestamp))], DirtyDay.REASON_LOG)
+
+
+@receiver(pre_save, sender=PenaltyExemption, dispatch_uid="attendance_dirty_exemption_pre_save")
+def remember_old_exemption_range(sender, instance, raw=False, **kwargs):
+    instance._dirty_old_range = None
+    if raw or not instance.pk:
+        return
+    instance._dirty_old_range = (
+        PenaltyExemption.objects.filter(pk=instance.pk).values_list("employee_id", "date_from", "date_to").first()
+    )
+
+
+@receiver(post_save, sender=PenaltyExemption, dispatch_uid="attendance_dirty_exemption_save")
+def mark_dirty_on_exemption_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    pairs = [(instance.employee_id, d) for d in _date_range(instance.date_from, instance.date_to)]
+    old = getattr(instance, "_dirty_old_range", None)
+    if old:
+        employee_pk, date_from, date_to = old
+        pairs += [(employee_pk, d) for d in _date_range(date_from, date_to)]
+    mark_days_dirty(pairs, DirtyDay.REASON_EXEMPTION)
+
+
+@receiver(post_delete, sender=PenaltyExemption, dispatch_uid="attendance_dirty_exemption_delete")
+def mark_dirty_on_exemption_delete(sender, instance, origin=None, **kwargs):
+    if _employee_deletion(origin):
+        return
+    pairs = [(instance.employee_id, d) for d in _date_range(instance.date_from, instance.date_to)]
+    mark_days_dirty(pairs, DirtyDay.REASON_EXEMPTION)
+
+
+@receiver(pre_save, sender=Employee, dispatch_uid="attendance_dirty_employee_pre_save")
+def mark_dirty_on_employee_schedule_change(sender, instance, raw=False, **kwargs):
+    """Grafik yoki shaxsiy ish vaqti o'zgarsa — bugungi kun qayta hisoblanadi (tarix uchun recompute_range)."""
+    if raw or not instance.pk:
+        return
+    old = Employee.objects.filter(pk=instance.pk).values(*SCHEDULE_FIELDS).first()
+    if old and any(old[f] != getattr(instance, f) for f in SCHEDULE_FIELDS):
+        mark_days_dirty([(instance.pk, timezone.localdate())], DirtyDay.REASON_SCHEDULE)
+
+
+@receiver(post_save, sender=WorkSchedule, dispatch_uid="attendance_dirty_schedule_save")
+def mark_dirty_on_work_schedule_save(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    today = timezone.localdate()
+    employee_pks = Employee.objects.filter(work_schedule=instance, is_active=True).values_list("pk", flat=True)
+    mark_days_dirty([(pk, today) for pk in employee_pks], DirtyDay.REASON_SCHEDULE)
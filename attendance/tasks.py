@@ -3,26 +3,37 @@ Celery tasks: end-of-day summary and penalty application.
 Jarima va hisobotlar ish kuni tugagach (masalan 20:00) bir marta hisoblanadi.
 """
 import logging
+import time
 from datetime import date
 
 from celery import shared_task
 from django.utils import timezone
 
 from employees.models import Employee
-from attendance.services import recompute_daily_summary
+from attendance.services import (
+    mark_absent_for_day,
+    materialize_absent_rows,
+    recompute_daily_summary,
+    recompute_dirty_days,
+)
 from attendance.models import LatenessRecord
-from penalties.services import apply_penalty_for_lateness
-from notifications.tasks import send_telegram_message
+from core import metrics
+from penalties.exemptions import ExemptionIndex
+from penalties.services import apply_penalties_for_latenesses
+from notifications.models import NotificationOutbox
+from notifications.tasks import dispatch_notification_outbox
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task(bind=True)
-def run_daily_summary_and_penalties(self, day=None):
+def run_daily_summary_and_penalties(self, day=None, full=False):
     """
-    Kun oxirida barcha xodimlar uchun kunlik xulosa qayta hisoblash va
-    kechikish bo'yicha jarimalarni bir marta qo'llash.
+    Kun oxirida kunlik xulosa qayta hisoblash va kechikish bo'yicha jarimalarni bir marta qo'llash.
     Birinchi kelish (first check_in) va oxirgi ketish (last check_out) ishlatiladi.
+    Standart rejim inkremental: faqat DirtyDay ledgeridagi (xodim, kun) lar qayta hisoblanadi,
+    xulosasi yo'q xodimlar uchun esa bulk "absent" qatorlari yaratiladi.
+    full=True — avvalgidek barcha faol xodimlar qayta hisoblanadi.
     day: sana (YYYY-MM-DD yoki date); berilmasa bugungi sana.
     """
     if day is None:
@@ -30,20 +41,35 @@ def run_daily_summary_and_penalties(self, day=None):
     elif isinstance(day, str):
         day = date.fromisoformat(day)
 
-    # Barcha faol xodimlar uchun kunlik xulosa qayta hisobla
+    started = time.monotonic()
     employees = Employee.objects.filter(is_active=True)
     employees_count = employees.count()
-    for employee in employees:
-        try:
-            recompute_daily_summary(employee, day)
-        except Exception as e:
-            logger.exception("run_daily_summary_and_penalties recompute employee=%s day=%s: %s", employee.pk, day, e)
+    # Ozodlar bitta so'rov bilan — recompute va jarima bosqichlarida qayta ishlatiladi
+    exemptions = ExemptionIndex.load(day, day)
+    dirty_count = 0
+    absent_created = 0
+    if full:
+        for employee in employees:
+            try:
+                recompute_daily_summary(employee, day, exemptions=exemptions)
+            except Exception as e:
+                logger.exception("run_daily_summary_and_penalties recompute employee=%s day=%s: %s", employee.pk, day, e)
+    else:
+        dirty_count = recompute_dirty_days(day)
+        absent_created = mark_absent_for_day(day, exemptions=exemptions)
 
     # Shu kun uchun kechikish yozuvlari bo'yicha jarima qo'llash (har biri uchun bitta)
     lateness_records = list(LatenessRecord.objects.filter(date=day).select_related("employee"))
+    try:
+        # Qoidalar, mavjud jarimalar va kunlik yig'indilar bittadan so'rov; jarimalar bulk_create bilan
+        penalties = apply_penalties_for_latenesses(lateness_records, exemptions=exemptions)
+    except Exception as e:
+        logger.exception("run_daily_summary_and_penalties penalties day=%s: %s", day, e)
+        penalties = {}
+    outbox = []
     for lateness in lateness_records:
         try:
-            penalty = apply_penalty_for_lateness(lateness)
+            penalty = penalties.get(lateness.pk)
             if penalty:
                 emp = lateness.employee
                 name = emp.get_full_name()
@@ -63,8 +89,37 @@ def run_daily_summary_and_penalties(self, day=None):
                 if getattr(emp, "telegram_username", None) and str(emp.telegram_username).strip():
                     username = str(emp.telegram_username).strip().lstrip("@")
                     msg_lines.append(f"@{username}")
-                send_telegram_message.delay("\n".join(msg_lines))
+                outbox.append(NotificationOutbox(kind=NotificationOutbox.KIND_LATENESS, text="\n".join(msg_lines)))
         except Exception as e:
             logger.exception("run_daily_summary_and_penalties penalty lateness=%s: %s", lateness.pk, e)
 
-    return {"ok": True, "day": str(day), "employees": employees_count, "lateness_count": len(lateness_records)}
+    # Har bir jarima uchun alohida task o'rniga: outbox ga bitta INSERT, dispatcher digest qilib yuboradi
+    if outbox:
+        NotificationOutbox.objects.bulk_create(outbox)
+        dispatch_notification_outbox.delay()
+
+    metrics.NIGHTLY_RUN_SECONDS.observe(time.monotonic() - started)
+    return {
+        "ok": True,
+        "day": str(day),
+        "employees": employees_count,
+        "dirty": dirty_count,
+        "absent_created": absent_created,
+        "lateness_count": len(lateness_records),
+        "notifications_queued": len(outbox),
+    }
+
+
+@shared_task(bind=True)
+def materialize_absent_summaries(self, day=None):
+    """
+    Kun boshida ishlashi kerak bo'lgan barcha xodimlar uchun "absent" qatorlarini bitta INSERT bilan yaratadi.
+    Kelish loglari recompute_daily_summary orqali ularni "present"/"late" ga o'zgartiradi,
+    shuning uchun dashboarddagi kelmaganlar soni oddiy COUNT bo'ladi.
+    """
+    if day is None:
+        day = timezone.localdate()
+    elif isinstance(day, str):
+        day = date.fromisoformat(day)
+    created = materialize_absent_rows(day)
+    return {"ok": True, "day": str(day), "created": created}
@@ -0,0 +1,75 @@
+"""Set-based absent qatorlarini yaratish va dashboard kelmaganlar soni."""
+from datetime import date, datetime, time
+
+from django.test import Client, TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from attendance.models import AttendanceLog, DailySummary
+from attendance.services import materialize_absent_rows
+from employees.models import Employee, WorkSchedule
+from penalties.models import PenaltyExemption
+
+
+@override_settings(USE_TZ=True, TIME_ZONE="Asia/Tashkent")
+class MaterializeAbsentRowsTests(TestCase):
+    def _emp(self, employee_id, **kwargs):
+        return Employee.objects.create(
+            employee_id=employee_id,
+            first_name="A",
+            last_name="B",
+            work_start_time=time(9, 0),
+            work_end_time=time(18, 0),
+            **kwargs,
+        )
+
+    def test_inserts_for_scheduled_employees_only(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            weekdays = WorkSchedule.objects.create(
+                name="Du-Ju", work_start_time=time(9, 0), work_end_time=time(18, 0), working_days="0,1,2,3,4"
+            )
+        saturday = date(2026, 6, 6)
+        plain = self._emp("A001")
+        scheduled = self._emp("A002", work_schedule=weekdays)
+        exempt = self._emp("A003")
+        with_log = self._emp("A004")
+        already = self._emp("A005")
+        self._emp("A006", is_active=False)
+        PenaltyExemption.objects.create(employee=exempt, date_from=saturday, date_to=saturday)
+        AttendanceLog.objects.create(
+            employee=with_log,
+            event_type="check_in",
+            timestamp=timezone.make_aware(datetime.combine(saturday, time(9, 0))),
+            source_id="sat",
+        )
+        DailySummary.objects.create(employee=already, date=saturday, status=DailySummary.STATUS_PRESENT)
+
+        with self.assertNumQueries(2):  # grafik keshi + INSERT
+            created = materialize_absent_rows(saturday)
+
+        self.assertEqual(created, 2)
+        rows = dict(DailySummary.objects.filter(date=saturday).values_list("employee_id", "status"))
+        self.assertEqual(rows[plain.pk], DailySummary.STATUS_ABSENT)
+        self.assertEqual(rows[exempt.pk], DailySummary.STATUS_LEAVE)
+        self.assertEqual(rows[already.pk], DailySummary.STATUS_PRESENT)
+        self.assertNotIn(scheduled.pk, rows)
+        self.assertNotIn(with_log.pk, rows)
+        # Takroriy chaqiruv hech narsa qo'shmaydi
+        self.assertEqual(materialize_absent_rows(saturday), 0)
+
+    def test_dashboard_absent_count_is_aggregate(self):
+        self._emp("B001")
+        self._emp("B002")
+        today = timezone.localdate()
+        DailySummary.objects.create(employee=self._emp("B003"), date=today, status=DailySummary.STATUS_PRESENT)
+        DailySummary.objects.create(employee=self._emp("B004"), date=today, status=DailySummary.STATUS_LEAVE)
+        self._emp("B005", is_active=False)
+        user = User.objects.create_user(username="mgr", password="x", role="manager")
+        client = Client()
+        client.force_login(user)
+        # absent qatorlari hali yozilmagan bo'lsa ham kelmaganlar soni to'g'ri
+        r = client.get("/")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.context["absent_count"], 2)
+        materialize_absent_rows(today)
+        self.assertEqual(client.get("/").context["absent_count"], 2)
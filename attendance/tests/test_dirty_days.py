@@ -0,0 +1,91 @@
+"""DirtyDay ledger va inkremental nightly task."""
+from datetime import date, datetime, time
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from attendance.models import AttendanceLog, DailySummary, DirtyDay
+from attendance.tasks import run_daily_summary_and_penalties
+from employees.models import Employee, WorkSchedule
+from penalties.models import PenaltyExemption
+
+
+@override_settings(USE_TZ=True, TIME_ZONE="Asia/Tashkent")
+class DirtyDayTests(TestCase):
+    def setUp(self):
+        self.emp = Employee.objects.create(
+            employee_id="D001",
+            first_name="Test",
+            last_name="User",
+            work_start_time=time(9, 0),
+            work_end_time=time(18, 0),
+            grace_period_minutes=5,
+        )
+        self.absent = Employee.objects.create(
+            employee_id="D002",
+            first_name="No",
+            last_name="Show",
+            work_start_time=time(9, 0),
+            work_end_time=time(18, 0),
+        )
+        self.day = date(2026, 6, 1)
+
+    def _log(self, t, source_id):
+        return AttendanceLog.objects.create(
+            employee=self.emp,
+            event_type="check_in",
+            timestamp=timezone.make_aware(datetime.combine(self.day, t)),
+            source_id=source_id,
+        )
+
+    def _dirty(self):
+        return set(DirtyDay.objects.values_list("employee_id", "date", "reason"))
+
+    def test_log_create_and_delete_mark_day(self):
+        log = self._log(time(0, 30), "d1")  # mahalliy kun (UTC bo'yicha oldingi kun)
+        self.assertEqual(self._dirty(), {(self.emp.pk, self.day, DirtyDay.REASON_LOG)})
+        DirtyDay.objects.all().delete()
+        log.delete()
+        self.assertEqual(self._dirty(), {(self.emp.pk, self.day, DirtyDay.REASON_LOG)})
+
+    def test_exemption_edit_marks_old_and_new_range(self):
+        ex = PenaltyExemption.objects.create(employee=self.emp, date_from=date(2026, 6, 1), date_to=date(2026, 6, 2))
+        DirtyDay.objects.all().delete()
+        ex.date_from = ex.date_to = date(2026, 6, 5)
+        ex.save()
+        days = {d for _e, d, _r in self._dirty()}
+        self.assertEqual(days, {date(2026, 6, 1), date(2026, 6, 2), date(2026, 6, 5)})
+
+    def test_schedule_change_marks_today(self):
+        sched = WorkSchedule.objects.create(name="S", work_start_time=time(8, 0), work_end_time=time(17, 0))
+        DirtyDay.objects.all().delete()
+        self.emp.work_schedule = sched
+        self.emp.save()
+        self.assertEqual(self._dirty(), {(self.emp.pk, timezone.localdate(), DirtyDay.REASON_SCHEDULE)})
+
+    def test_employee_delete_does_not_break_on_cascade(self):
+        self._log(time(9, 0), "d2")
+        self.emp.delete()
+        self.assertFalse(DirtyDay.objects.exists())
+
+    def test_nightly_recomputes_dirty_and_marks_absent(self):
+        self._log(time(9, 30), "late1")
+        on_leave = Employee.objects.create(
+            employee_id="D003",
+            first_name="On",
+            last_name="Leave",
+            work_start_time=time(9, 0),
+            work_end_time=time(18, 0),
+        )
+        PenaltyExemption.objects.create(employee=on_leave, date_from=self.day, date_to=self.day)
+        DirtyDay.objects.filter(employee=on_leave).delete()
+        DailySummary.objects.all().delete()
+
+        result = run_daily_summary_and_penalties(self.day.isoformat())
+
+        self.assertEqual(result["dirty"], 1)
+        self.assertEqual(result["absent_created"], 2)
+        self.assertEqual(DailySummary.objects.get(employee=self.emp, date=self.day).status, DailySummary.STATUS_LATE)
+        self.assertEqual(DailySummary.objects.get(employee=self.absent, date=self.day).status, DailySummary.STATUS_ABSENT)
+        self.assertEqual(DailySummary.objects.get(employee=on_leave, date=self.day).status, DailySummary.STATUS_LEAVE)
+        self.assertFalse(DirtyDay.objects.filter(date__lte=self.day).exists())
@@ -0,0 +1,73 @@
+"""recompute_range komandasi: chunklar, checkpoint va dry-run."""
+import tempfile
+from datetime import date, datetime, time
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from attendance.models import AttendanceLog, DailySummary
+from attendance.recompute import RangeCheckpoint, recompute_chunk
+from employees.models import Employee
+
+
+@override_settings(USE_TZ=True, TIME_ZONE="Asia/Tashkent")
+class RecomputeRangeCommandTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(RECOMPUTE_CHECKPOINT_DIR=self.tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.employees = [
+            Employee.objects.create(
+                employee_id=f"R00{i}",
+                first_name="R",
+                last_name=str(i),
+                work_start_time=time(9, 0),
+                work_end_time=time(18, 0),
+            )
+            for i in range(3)
+        ]
+        AttendanceLog.objects.create(
+            employee=self.employees[0],
+            event_type="check_in",
+            timestamp=timezone.make_aware(datetime(2026, 5, 4, 9, 30)),
+            source_id="r1",
+        )
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command("recompute_range", "--from", "2026-05-04", "--to", "2026-05-06", *args, stdout=out)
+        return out.getvalue()
+
+    def test_recomputes_every_employee_day(self):
+        out = self._run("--chunk", "2")
+        self.assertEqual(DailySummary.objects.count(), 9)
+        self.assertEqual(
+            DailySummary.objects.get(employee=self.employees[0], date=date(2026, 5, 4)).status,
+            DailySummary.STATUS_LATE,
+        )
+        self.assertIn("9 xodim-kun", out)
+        self.assertIn("xodim-kun/s", out)
+
+    def test_dry_run_writes_nothing(self):
+        out = self._run("--dry-run")
+        self.assertEqual(DailySummary.objects.count(), 0)
+        self.assertIn("9 xodim-kun", out)
+
+    def test_resumes_from_checkpoint(self):
+        pks = sorted(e.pk for e in self.employees)
+        checkpoint = RangeCheckpoint.for_params(date(2026, 5, 4), date(2026, 5, 6), pks, 2)
+        checkpoint.mark_done(0)  # birinchi chunk (2 xodim) oldingi ishda tugagan
+
+        with patch("attendance.recompute.recompute_chunk", wraps=recompute_chunk) as mock:
+            self._run("--chunk", "2")
+
+        self.assertEqual(mock.call_count, 1)
+        self.assertEqual(mock.call_args.args[0], [pks[2]])
+        self.assertEqual(DailySummary.objects.count(), 3)
+        # Muvaffaqiyatli tugagach checkpoint o'chiriladi
+        self.assertFalse(checkpoint.path.exists())
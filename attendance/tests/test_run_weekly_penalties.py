@@ -0,0 +1,52 @@
+"""run_weekly_penalties: jarimalar hisoblanadi, Telegram xabarlari oxirida digest qilib jo'natiladi."""
+from datetime import datetime, time, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from attendance.models import AttendanceLog
+from employees.models import Employee
+from notifications.models import NotificationOutbox, TelegramSettings
+from penalties.models import Penalty, PenaltyRule
+
+
+class RunWeeklyPenaltiesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        TelegramSettings.objects.update_or_create(pk=1, defaults={"enabled": True, "bot_token": "t", "chat_id": "c"})
+        PenaltyRule.objects.create(name="Daqiqa", rule_type="per_minute", amount_per_unit=1000)
+        today = timezone.localdate()
+        for n in range(6):
+            emp = Employee.objects.create(
+                employee_id=f"W{n:03d}", first_name="A", last_name="B", work_start_time=time(9, 0), work_end_time=time(18, 0)
+            )
+            for back in (1, 2):
+                day = today - timedelta(days=back)
+                AttendanceLog.objects.create(
+                    employee=emp,
+                    event_type="check_in",
+                    timestamp=timezone.make_aware(datetime.combine(day, time(9, 30))),
+                    source_id=f"w{n}-{back}",
+                )
+
+    def _run(self, send_result):
+        out = StringIO()
+        with mock.patch("notifications.client.TelegramClient.send_message", return_value=send_result) as send:
+            call_command("run_weekly_penalties", "--days", "3", "--send-workers", "2", stdout=out, stderr=StringIO())
+        return send, out.getvalue()
+
+    def test_penalties_then_single_digest(self):
+        send, out = self._run({"ok": True})
+        self.assertEqual(Penalty.objects.count(), 12)
+        self.assertEqual(send.call_count, 1)  # 12 ta qisqa xabar bitta digestga sig'adi
+        self.assertIn("12/12 xabar", out)
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_failed_digest_goes_to_outbox(self):
+        send, out = self._run({"ok": False, "retry_after": 40, "error": "rate_limited"})
+        self.assertEqual(NotificationOutbox.objects.filter(status=NotificationOutbox.STATUS_PENDING).count(), 12)
+        self.assertIn("12 outbox", out)
@@ -0,0 +1,88 @@
+"""Vektorlashgan range recompute scalar recompute_daily_summary bilan bir xil natija beradi (generatsiya qilingan ma'lumotda)."""
+from datetime import date, datetime, time, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from attendance.models import AttendanceLog, DailySummary, LatenessRecord
+from attendance.recompute import recompute_chunk
+from attendance.vectorized import recompute_chunk_vectorized
+from core.dataset import generate_dataset
+from employees.models import Employee
+from employees.schedules import invalidate_schedule_cache
+from penalties.models import Penalty
+
+START = date(2026, 3, 2)
+END = date(2026, 3, 22)
+
+
+def _snapshot():
+    summaries = sorted(
+        DailySummary.objects.values_list(
+            "employee_id", "date", "status", "check_in_time", "check_out_time",
+            "working_minutes", "minutes_late", "missing_check_out",
+        )
+    )
+    lateness = sorted(
+        LatenessRecord.objects.values_list("employee_id", "date", "minutes_late", "check_in_time", "expected_start")
+    )
+    return summaries, lateness
+
+
+@override_settings(USE_TZ=True, TIME_ZONE="Asia/Tashkent")
+class VectorizedRecomputeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_schedule_cache()
+        generate_dataset(
+            employees=40, days=21, end=END, seed=7, raw_events=False,
+            late_ratio=0.3, absent_ratio=0.1, exemption_ratio=0.05, missing_checkout_ratio=0.1,
+        )
+        # Chekka holatlar: 30 soniya kechikish (status late, 0 daqiqa) va check-out check-in dan oldin (scalar xato)
+        self.edge = Employee.objects.create(
+            employee_id="EDGE1", first_name="E", last_name="D", work_start_time=time(9, 0),
+            work_end_time=time(18, 0), grace_period_minutes=0,
+        )
+        at = lambda d, h, m, s=0: timezone.make_aware(datetime(d.year, d.month, d.day, h, m, s))  # noqa: E731
+        AttendanceLog.objects.bulk_create([
+            AttendanceLog(employee=self.edge, event_type="check_in", timestamp=at(START, 9, 0, 30), source_id="e1"),
+            AttendanceLog(employee=self.edge, event_type="check_in", timestamp=at(START, 9, 40), source_id="e2"),
+            AttendanceLog(employee=self.edge, event_type="check_out", timestamp=at(START, 17, 59, 59), source_id="e3"),
+            AttendanceLog(employee=self.edge, event_type="check_in", timestamp=at(START + timedelta(days=1), 12, 0), source_id="e4"),
+            AttendanceLog(employee=self.edge, event_type="check_out", timestamp=at(START + timedelta(days=1), 8, 0), source_id="e5"),
+            AttendanceLog(employee=self.edge, event_type="check_in", timestamp=at(START + timedelta(days=2), 0, 10), source_id="e6"),
+        ])
+        self.pks = list(Employee.objects.values_list("pk", flat=True))
+
+    def test_matches_scalar_on_fresh_and_existing_rows(self):
+        with self.assertLogs("attendance.recompute", level="ERROR"):
+            scalar_done, scalar_errors = recompute_chunk(self.pks, START, END)
+        expected = _snapshot()
+        self.assertEqual(scalar_errors, 1)  # EDGE1, check-out check-in dan oldin
+        self.assertTrue(any(row[2] == DailySummary.STATUS_LATE and row[6] == 0 for row in expected[0]))
+
+        DailySummary.objects.all().delete()
+        LatenessRecord.objects.all().delete()
+        with self.assertLogs("attendance.vectorized", level="ERROR"):
+            self.assertEqual(recompute_chunk_vectorized(self.pks, START, END), (scalar_done, scalar_errors))
+        self.assertEqual(_snapshot(), expected)
+
+        # Mavjud qatorlar ustidan: log o'zgarishi va eski kechikish yozuvlari (jarima bog'langan pk saqlanadi)
+        record = LatenessRecord.objects.order_by("pk").first()
+        penalty = Penalty.objects.create(
+            employee_id=record.employee_id, lateness_record=record, penalty_date=record.date, amount=100
+        )
+        AttendanceLog.objects.filter(employee=self.edge, source_id="e5").delete()
+        recompute_chunk(self.pks, START, END)
+        expected = _snapshot()
+        recompute_chunk_vectorized(self.pks, START, END)
+        self.assertEqual(_snapshot(), expected)
+        penalty.refresh_from_db()
+        self.assertEqual(penalty.lateness_record_id, record.pk)
+
+    def test_dry_run_writes_nothing(self):
+        with self.assertLogs("attendance.vectorized", level="ERROR"):
+            done, errors = recompute_chunk_vectorized(self.pks, START, END, dry_run=True)
+        self.assertEqual(done + errors, len(self.pks) * 21)
+        self.assertEqual(DailySummary.objects.count(), 0)
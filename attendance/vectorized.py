@@ -0,0 +1,255 @@
+"""
+Vektorlashgan oraliq recompute: recompute_daily_summary bilan bir xil natija, lekin xodim-kun bo'yicha so'rovlarsiz.
+Chunkdagi barcha loglar bitta so'rov bilan massivga yuklanadi, (xodim, mahalliy kun) bo'yicha birinchi check-in va
+oxirgi check-out pandas groupby bilan topiladi. Grafik va ozod kalendarlari (xodim × kun) NumPy matritsalariga
+yoyiladi, holat / kechikish / ishlash daqiqalari butun matritsada birdaniga hisoblanadi.
+Yozish: DailySummary — bulk upsert, LatenessRecord — bulk_update / bulk_create / delete (mavjud yozuvlar pk si
+saqlanadi, ularga bog'langan jarimalar uzilmaydi).
+"""
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from django.utils import timezone
+
+from core.date_range import datetime_bounds
+from employees.models import Employee
+from employees.schedules import ALL_WEEKDAYS_MASK, get_compiled_schedule
+from penalties.exemptions import ExemptionIndex
+from .models import AttendanceLog, DailySummary, LatenessRecord
+
+logger = logging.getLogger(__name__)
+
+NS_PER_MINUTE = 60 * 10**9
+NAT = np.iinfo(np.int64).min  # pandas NaT ning int64 ko'rinishi
+SUMMARY_UPDATE_FIELDS = [
+    "status",
+    "check_in_time",
+    "check_out_time",
+    "working_minutes",
+    "minutes_late",
+    "missing_check_out",
+    "updated_at",
+]
+WRITE_BATCH_SIZE = 1000
+
+
+@dataclass
+class RangeResult:
+    """(xodim, kun) matritsalari; qatorlar employees, ustunlar days tartibida. Vaqtlar — UTC ns (yo'q bo'lsa NAT)."""
+
+    employees: list
+    days: list
+    status: np.ndarray
+    check_in: np.ndarray
+    check_out: np.ndarray
+    working_minutes: np.ndarray
+    minutes_late: np.ndarray
+    missing_check_out: np.ndarray
+    late: np.ndarray
+    invalid: np.ndarray  # scalar yo'l xato beradigan kunlar (check-out check-in dan oldin) — yozilmaydi
+    expected_start: list  # xodim bo'yicha ish boshlanishi (LatenessRecord.expected_start)
+
+
+def load_log_bounds(employee_pks, start: date, end: date):
+    """
+    Bitta so'rov: [start, end] dagi loglar -> (check_in, check_out) Series lari,
+    indeks (employee, day_offset), qiymat — birinchi check-in / oxirgi check-out (UTC ns).
+    """
+    dt_from, dt_to = datetime_bounds(start, end)
+    rows = (
+        AttendanceLog.objects.filter(employee_id__in=list(employee_pks), timestamp__gte=dt_from, timestamp__lt=dt_to)
+        .order_by()
+        .values_list("employee_id", "event_type", "timestamp")
+    )
+    frame = pd.DataFrame.from_records(list(rows), columns=["employee", "event_type", "timestamp"])
+    if frame.empty:
+        empty = pd.Series(dtype="int64")
+        return empty, empty
+    stamps = pd.to_datetime(frame["timestamp"], utc=True)
+    frame["ns"] = stamps.dt.as_unit("ns").astype("int64")
+    # timestamp__date bilan bir xil: kun joriy vaqt zonasida olinadi
+    local_day = stamps.dt.tz_convert(timezone.get_current_timezone()).dt.tz_localize(None).dt.normalize()
+    frame["day"] = (local_day - pd.Timestamp(start)).dt.days
+    keys = ["employee", "day"]
+    check_in = frame[frame["event_type"] == "check_in"].groupby(keys)["ns"].min()
+    check_out = frame[frame["event_type"] == "check_out"].groupby(keys)["ns"].max()
+    return check_in, check_out
+
+
+def _fill(matrix, series, rows):
+    if series.empty:
+        return
+    employees = series.index.get_level_values(0)
+    matrix[rows.get_indexer(employees), series.index.get_level_values(1).to_numpy()] = series.to_numpy()
+
+
+def _aware_ns(day: date, at) -> int:
+    return pd.Timestamp(timezone.make_aware(datetime.combine(day, at))).as_unit("ns").value
+
+
+def compute_range(employees, start: date, end: date, exemptions=None) -> RangeResult:
+    """Xodimlar × [start, end] uchun natija matritsalari (DB ga yozmaydi)."""
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    n, m = len(employees), len(days)
+    rows = pd.Index([e.pk for e in employees])
+    if exemptions is None:
+        exemptions = ExemptionIndex.load(start, end, employee_ids=list(rows))
+
+    check_in = np.full((n, m), NAT, dtype=np.int64)
+    check_out = np.full((n, m), NAT, dtype=np.int64)
+    first_in, last_out = load_log_bounds(list(rows), start, end)
+    _fill(check_in, first_in, rows)
+    _fill(check_out, last_out, rows)
+    has_in = check_in != NAT
+    has_out = check_out != NAT
+
+    # Grafik kalendari: resolve_work_params bilan bir xil — faol grafik bo'lsa uning vaqtlari va hafta kunlari
+    work_starts, graces, masks = [], np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64)
+    for i, employee in enumerate(employees):
+        compiled = get_compiled_schedule(employee.work_schedule_id)
+        if compiled is not None:
+            work_starts.append(compiled.work_start_time)
+            graces[i], masks[i] = compiled.grace_period_minutes, compiled.weekday_mask
+        else:
+            work_starts.append(employee.work_start_time)
+            graces[i], masks[i] = employee.grace_period_minutes, ALL_WEEKDAYS_MASK
+    weekdays = np.array([d.weekday() for d in days], dtype=np.int64)
+    working_day = ((masks[:, None] >> weekdays[None, :]) & 1).astype(bool)
+    # Ish boshlanishi (mahalliy -> UTC): har bir noyob (vaqt, kun) uchun bir marta make_aware (DST ham scalar kabi)
+    unique_starts = sorted(set(work_starts))
+    codes = np.array([unique_starts.index(t) for t in work_starts], dtype=np.int64)
+    anchors = np.array([[_aware_ns(day, t) for day in days] for t in unique_starts], dtype=np.int64).reshape(-1, m)
+    grace_end = anchors[codes] + graces[:, None] * NS_PER_MINUTE
+
+    exempt = np.zeros((n, m), dtype=bool)
+    for i, employee in enumerate(employees):
+        for date_from, date_to in zip(*exemptions.intervals(employee.pk)):
+            lo, hi = max((date_from - start).days, 0), min((date_to - start).days, m - 1)
+            if lo <= hi:
+                exempt[i, lo:hi + 1] = True
+
+    both = has_in & has_out
+    diff = np.zeros((n, m), dtype=np.int64)
+    np.subtract(check_out, check_in, out=diff, where=both)
+    # int(delta.total_seconds() / 60) — nol tomon kesish
+    working = np.where(diff >= 0, diff // NS_PER_MINUTE, -((-diff) // NS_PER_MINUTE))
+    late_ns = np.zeros((n, m), dtype=np.int64)
+    np.subtract(check_in, grace_end, out=late_ns, where=has_in)
+
+    counted = has_in & ~exempt
+    late = counted & working_day & (late_ns > 0)
+    status = np.full((n, m), DailySummary.STATUS_ABSENT, dtype=object)
+    status[counted] = DailySummary.STATUS_PRESENT
+    status[late] = DailySummary.STATUS_LATE
+    status[exempt] = DailySummary.STATUS_LEAVE
+
+    return RangeResult(
+        employees=employees,
+        days=days,
+        status=status,
+        check_in=check_in,
+        check_out=check_out,
+        working_minutes=np.where(counted, working, 0),
+        minutes_late=np.where(late, late_ns // NS_PER_MINUTE, 0),
+        missing_check_out=counted & ~has_out,
+        late=late,
+        invalid=counted & (working < 0),
+        expected_start=work_starts,
+    )
+
+
+def _datetimes(ns_matrix):
+    """UTC ns matritsa -> aware datetime (NAT -> None) object matritsa."""
+    flat = ns_matrix.ravel()
+    values = pd.to_datetime(flat, utc=True).to_pydatetime()
+    return np.where(flat == NAT, None, values).reshape(ns_matrix.shape)
+
+
+def write_range(result: RangeResult):
+    """Natijani yozadi. Returns (employee_days, errors) — recompute_chunk bilan bir xil."""
+    valid = ~result.invalid
+    check_in = _datetimes(result.check_in)
+    check_out = _datetimes(result.check_out)
+    now = timezone.now()
+    employee_pks = [e.pk for e in result.employees]
+    summaries = [
+        DailySummary(
+            employee_id=employee_pks[i],
+            date=result.days[j],
+            status=result.status[i, j],
+            check_in_time=check_in[i, j],
+            check_out_time=check_out[i, j],
+            working_minutes=int(result.working_minutes[i, j]),
+            minutes_late=int(result.minutes_late[i, j]),
+            missing_check_out=bool(result.missing_check_out[i, j]),
+            updated_at=now,
+        )
+        for i, j in zip(*np.nonzero(valid))
+    ]
+    for i, j in zip(*np.nonzero(result.invalid)):
+        logger.error(
+            "vectorized recompute employee=%s day=%s: check_out is before check_in", employee_pks[i], result.days[j]
+        )
+
+    late = {
+        (employee_pks[i], result.days[j]): (int(result.minutes_late[i, j]), check_in[i, j], result.expected_start[i])
+        for i, j in zip(*np.nonzero(result.late & valid))
+    }
+    skipped = {(employee_pks[i], result.days[j]) for i, j in zip(*np.nonzero(result.invalid))}
+    to_update, to_delete, seen = [], [], set()
+    existing = LatenessRecord.objects.filter(
+        employee_id__in=employee_pks, date__gte=result.days[0], date__lte=result.days[-1]
+    ).order_by("pk").values_list("pk", "employee_id", "date")
+    for pk, employee_pk, day in existing:
+        key = (employee_pk, day)
+        if key in skipped or key in seen:
+            continue
+        if key in late:
+            minutes_late, check_in_time, expected_start = late[key]
+            to_update.append(
+                LatenessRecord(
+                    pk=pk, minutes_late=minutes_late, check_in_time=check_in_time, expected_start=expected_start
+                )
+            )
+            seen.add(key)
+        else:
+            to_delete.append(pk)
+    to_create = [
+        LatenessRecord(
+            employee_id=employee_pk, date=day, minutes_late=minutes_late, check_in_time=check_in_time,
+            expected_start=expected_start,
+        )
+        for (employee_pk, day), (minutes_late, check_in_time, expected_start) in late.items()
+        if (employee_pk, day) not in seen
+    ]
+
+    DailySummary.objects.bulk_create(
+        summaries,
+        batch_size=WRITE_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["employee", "date"],
+        update_fields=SUMMARY_UPDATE_FIELDS,
+    )
+    LatenessRecord.objects.bulk_update(
+        to_update, ["minutes_late", "check_in_time", "expected_start"], batch_size=WRITE_BATCH_SIZE
+    )
+    LatenessRecord.objects.bulk_create(to_create, batch_size=WRITE_BATCH_SIZE)
+    for i in range(0, len(to_delete), WRITE_BATCH_SIZE):
+        LatenessRecord.objects.filter(pk__in=to_delete[i:i + WRITE_BATCH_SIZE]).delete()
+    return len(summaries), int(result.invalid.sum())
+
+
+def recompute_chunk_vectorized(employee_pks, start: date, end: date, dry_run: bool = False):
+    """recompute_chunk ning vektorlashgan muqobili (recompute_range --engine vectorized). Returns (employee_days, errors)."""
+    employees = list(Employee.objects.filter(pk__in=employee_pks, is_active=True).order_by("pk"))
+    if not employees:
+        return 0, 0
+    with transaction.atomic():
+        done, errors = write_range(compute_range(employees, start, end))
+        if dry_run:
+            transaction.set_rollback(True)
+    return done, errors
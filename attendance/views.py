@@ -8,7 +8,7 @@ from django.http import HttpResponse
 from core.decorators import manager_required, admin_required
 from django.utils.decorators import method_decorator
 
-from core.date_range import parse_date_range, query_string_for_export
+from core.date_range import parse_date_range, query_string_for_export, datetime_bounds
 from reports.export import export_attendance_logs_excel
 
 from .models import AttendanceLog, DailySummary
@@ -25,7 +25,8 @@ class AttendanceLogListView(LoginRequiredMixin, ListView):
     def get_queryset(self):
         start, end, _ = parse_date_range(self.request, default_period="month")
         qs = super().get_queryset().select_related("employee")
-        qs = qs.filter(timestamp__date__gte=start, timestamp__date__lte=end)
+        dt_from, dt_to = datetime_bounds(start, end)
+        qs = qs.filter(timestamp__gte=dt_from, timestamp__lt=dt_to)
         employee_id = self.request.GET.get("employee_id")
         if employee_id:
             qs = qs.filter(employee__employee_id=employee_id)
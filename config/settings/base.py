@@ -17,6 +17,9 @@ env = environ.Env(
     TIME_ZONE=(str, "Asia/Tashkent"),
     WEBHOOK_RATE_LIMIT=(int, 120),  # max requests per minute per IP for webhook
     REDIS_CACHE_URL=(str, ""),  # bo'sh bo'lsa LocMemCache (webhook rate limit bitta processda)
+    PROFILING_ENABLED=(bool, False),
+    METRICS_TOKEN=(str, ""),  # /metrics uchun Bearer token; bo'sh bo'lsa ochiq
+    AUDIT_LOG_BUFFERED=(bool, True),  # False bo'lsa audit yozuvlari so'rov ichida sync yoziladi
 )
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -48,6 +51,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.ProfilingMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
@@ -137,16 +141,114 @@ CELERY_TASK_DEFAULT_QUEUE = "worktrack"
 from celery.schedules import crontab
 
 CELERY_BEAT_SCHEDULE = {
+    # Kun boshida: ishlashi kerak bo'lgan xodimlar uchun "absent" qatorlari (dashboard COUNT uchun)
+    "materialize-absent-summaries": {
+        "task": "attendance.tasks.materialize_absent_summaries",
+        "schedule": crontab(hour=0, minute=5),
+    },
     "run-daily-summary-and-penalties": {
         "task": "attendance.tasks.run_daily_summary_and_penalties",
         "schedule": crontab(hour=20, minute=0),
     },
+    # Yo'qolgan/xato bilan tugagan raw eventlarni qayta navbatga qo'yish
+    "sweep-stuck-raw-events": {
+        "task": "integrations.tasks.sweep_stuck_raw_events",
+        "schedule": crontab(minute="*/5"),
+    },
+    # Eski qayta ishlangan raw eventlarni gzip arxivga ko'chirish
+    "archive-raw-device-events": {
+        "task": "integrations.tasks.archive_raw_device_events",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    # Reconciliation hisobotlari uchun kunlik snapshotlar (oxirgi RECONCILIATION_SNAPSHOT_DAYS kun qayta yoziladi)
+    "snapshot-reconciliation": {
+        "task": "reports.tasks.snapshot_reconciliation",
+        "schedule": crontab(hour=2, minute=30),
+    },
+    # Yopilgan oylarning ustunli davomat snapshotlari (faqat o'zgargan oylar qayta yoziladi)
+    "refresh-attendance-snapshots": {
+        "task": "reports.tasks.refresh_attendance_snapshots",
+        "schedule": crontab(hour=2, minute=45),
+    },
+    # Telegram outbox: qolib ketgan/xato bergan xabarlarni qayta yuborish
+    "dispatch-notification-outbox": {
+        "task": "notifications.tasks.dispatch_notification_outbox",
+        "schedule": crontab(minute="*/2"),
+    },
 }
 
 # Audit log (simple file or DB; extend as needed)
 AUDIT_LOG_ENABLED = True
+# Buferlangan yozuv: so'rov yo'lida INSERT yo'q, fon thread har FLUSH_INTERVAL soniyada bulk_create qiladi;
+# DB xato bersa yozuvlar FALLBACK_PATH ga JSONL sifatida tushadi
+AUDIT_LOG_BUFFERED = env("AUDIT_LOG_BUFFERED")
+AUDIT_LOG_FLUSH_INTERVAL = 2
+AUDIT_LOG_BATCH_SIZE = 200
+AUDIT_LOG_FALLBACK_PATH = BASE_DIR / "var" / "audit" / "fallback.jsonl"
+# Test runner test muhitida AUDIT_LOG_BUFFERED ni o'chiradi (core.testing)
+TEST_RUNNER = "core.testing.WorkTrackTestRunner"
+
 WEBHOOK_RATE_LIMIT = env("WEBHOOK_RATE_LIMIT")
 
+# Raw event sweeper: "received" holatida shuncha daqiqadan ko'p turgan event yo'qolgan hisoblanadi
+RAW_EVENT_STALE_MINUTES = 10
+RAW_EVENT_SWEEP_BATCH_SIZE = 500
+# Exponential backoff: base * 2**retry_count (jitter bilan), max bilan cheklangan
+RAW_EVENT_RETRY_BASE_SECONDS = 60
+RAW_EVENT_RETRY_MAX_SECONDS = 6 * 60 * 60
+# Shuncha urinishdan keyin event "poison" deb belgilanadi va avtomatik qayta ishlanmaydi
+RAW_EVENT_MAX_ATTEMPTS = 5
+
+# Raw event retention: shuncha kundan eski "processed" eventlar gzip JSONL arxivga ko'chiriladi
+RAW_EVENT_RETENTION_DAYS = 90
+RAW_EVENT_ARCHIVE_BATCH_SIZE = 5000
+RAW_EVENT_ARCHIVE_DIR = BASE_DIR / "archive" / "raw_events"
+
+# recompute_range komandasi: bajarilgan chunklar checkpointi (to'xtagan ish davom ettiriladi)
+RECOMPUTE_CHECKPOINT_DIR = BASE_DIR / "var" / "recompute"
+
+# benchmark komandasi: baseline repoda saqlanishi mumkin, oxirgi natija esa var/ da
+BENCHMARK_BASELINE_PATH = BASE_DIR / "benchmarks" / "baseline.json"
+BENCHMARK_RESULTS_PATH = BASE_DIR / "var" / "benchmarks" / "latest.json"
+BENCHMARK_REGRESSION_THRESHOLD = 0.25
+
+# Profiling (ixtiyoriy): so'rov/task vaqti, SQL soni va eng sekin SQL lar; chegaradan sekinlari "worktrack.slow" logiga
+PROFILING_ENABLED = env("PROFILING_ENABLED")
+PROFILING_SLOW_MS = {"view": 1000, "task": 10000}
+PROFILING_TOP_SQL = 5
+# p50/p95/p99 gistogrammasi keshda: PROFILING_WINDOWS ta PROFILING_WINDOW_SECONDS lik oyna (default 1 soat)
+PROFILING_WINDOW_SECONDS = 300
+PROFILING_WINDOWS = 12
+
+# Hisobot ETaglari: shablon/eksport formati o'zgarganda oshiring (eski keshlangan javoblar bekor bo'ladi)
+REPORTS_ETAG_VERSION = 1
+
+# Reconciliation snapshot: har kecha shuncha oxirgi kun qayta hisoblanadi (kech kelgan ma'lumotlar uchun)
+RECONCILIATION_SNAPSHOT_DAYS = 7
+
+# Ustunli oylik davomat snapshotlari (.npy ustunlar, memory-map bilan o'qiladi): katalog va har kecha tekshiriladigan
+# oxirgi yopilgan oylar soni
+ATTENDANCE_SNAPSHOT_DIR = BASE_DIR / "var" / "snapshots" / "attendance"
+ATTENDANCE_SNAPSHOT_MONTHS = 24
+
+# Telegram klienti: chat bo'yicha (xabarlar, oyna soniyalari) — guruh chatlari uchun ~20/daqiqa;
+# sync yo'l 429/cheklov uchun jami shuncha soniyagacha kutadi, task esa retry_after bilan retry qiladi
+TELEGRAM_API_URL = "https://api.telegram.org"
+TELEGRAM_TIMEOUT_SECONDS = 10
+TELEGRAM_POOL_SIZE = 8
+TELEGRAM_RATE_LIMIT = (20, 60)
+TELEGRAM_MAX_WAIT_SECONDS = 30
+
+# Telegram outbox dispatcher: bir ishda shuncha xabar, digestlar orasida pauza
+# (guruh chatiga ~20 xabar/daqiqa), shuncha muvaffaqiyatsiz urinishdan keyin failed
+NOTIFICATION_DISPATCH_BATCH_SIZE = 2000
+NOTIFICATION_DIGEST_INTERVAL_SECONDS = 3
+NOTIFICATION_MAX_ATTEMPTS = 5
+NOTIFICATION_DISPATCH_LOCK_SECONDS = 600
+
+# Prometheus /metrics; hisoblagichlar umumiy keshda (Redis) — barcha processlar uchun bitta qiymat
+METRICS_TOKEN = env("METRICS_TOKEN")
+
 # Kesh: productionda Redis (masalan redis://127.0.0.1:6379/1) — webhook rate limit ko'p workerda ishlaydi
 if env("REDIS_CACHE_URL"):
     CACHES = {
@@ -5,3 +5,9 @@ class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
     verbose_name = "Core"
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
+        from .profiling import connect_celery_signals
+
+        connect_celery_signals()
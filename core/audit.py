@@ -0,0 +1,114 @@
+"""
+Buferlangan audit log yozuvchisi. So'rov yo'lida faqat navbatga qo'shiladi; fon thread har
+AUDIT_LOG_FLUSH_INTERVAL soniyada (yoki AUDIT_LOG_BATCH_SIZE to'lganda) bitta bulk_create bilan yozadi.
+Process tugashida (atexit) qolgan yozuvlar yoziladi; DB ga yozib bo'lmasa — JSONL fallback faylga.
+created_at navbatga qo'shilgan paytdagi vaqt (flush vaqti emas).
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogWriter:
+    def __init__(self, batch_size: int, interval: float, fallback_path, max_buffer: int = 10000):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.fallback_path = Path(fallback_path)
+        self._queue = queue.Queue(maxsize=max_buffer)
+        self._wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def enqueue(self, entry: dict):
+        """entry: AuditLog maydonlari (user_id, action, ..., created_at)."""
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            # Yozuvchi orqada qolgan (DB sekin/ishlamayapti) — xotirani o'stirmasdan faylga
+            self._write_fallback([entry])
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_thread(self):
+        # fork dan keyin (gunicorn worker) thread bolaga o'tmaydi — pid bo'yicha qayta ishga tushiriladi
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception("audit log writer loop failed")
+
+    def _drain(self):
+        entries = []
+        while True:
+            try:
+                entries.append(self._queue.get_nowait())
+            except queue.Empty:
+                return entries
+
+    def flush(self) -> int:
+        """Navbatdagi barcha yozuvlarni yozadi; yozilgan (yoki faylga tushgan) yozuvlar sonini qaytaradi."""
+        from .models import AuditLog
+
+        with self._flush_lock:
+            entries = self._drain()
+            if not entries:
+                return 0
+            try:
+                AuditLog.objects.bulk_create([AuditLog(**e) for e in entries], batch_size=self.batch_size)
+            except Exception:
+                logger.exception("audit log flush failed, %s entries written to %s", len(entries), self.fallback_path)
+                self._write_fallback(entries)
+            return len(entries)
+
+    def _write_fallback(self, entries):
+        try:
+            self.fallback_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.fallback_path, "a", encoding="utf-8") as f:
+                for e in entries:
+                    f.write(json.dumps(e, default=str, ensure_ascii=False) + "\n")
+        except OSError:
+            logger.exception("audit log fallback write failed, %s entries lost", len(entries))
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> AuditLogWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AuditLogWriter(
+                    batch_size=settings.AUDIT_LOG_BATCH_SIZE,
+                    interval=settings.AUDIT_LOG_FLUSH_INTERVAL,
+                    fallback_path=settings.AUDIT_LOG_FALLBACK_PATH,
+                )
+                atexit.register(_writer.flush)
+    return _writer
@@ -0,0 +1,266 @@
+"""
+Issiq yo'llar uchun end-to-end benchmark (benchmark komandasi).
+Har bir holat uchun: devor vaqti (repeat ta yugurishning medianasi), DB so'rovlar soni va tracemalloc
+bo'yicha eng yuqori xotira. Hamma narsa bitta tranzaksiya ichida bajarilib, oxirida rollback qilinadi —
+ma'lumotlar bazasi o'zgarmaydi; har bir yugurish alohida savepoint da, shuning uchun holatlar bir-biriga ta'sir qilmaydi.
+"""
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, time as dt_time, timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    run: callable
+    # setup() savepoint ichida, vaqt o'lchovidan oldin chaqiriladi; natijasi run() ga argument sifatida beriladi
+    setup: callable = None
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    wall_ms: float
+    wall_ms_min: float
+    queries: int
+    peak_kb: float
+    runs: int
+
+
+class _Rollback(Exception):
+    pass
+
+
+class QueryCounter:
+    """connection.execute_wrapper: so'rovlarni sanaydi (queries_log ning 9000 qatorli chegarasisiz)."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _run_once(case, trace=False):
+    """Savepoint ichida bir marta: (wall_seconds, queries, peak_bytes)."""
+    out = {}
+    try:
+        with transaction.atomic():
+            arg = case.setup() if case.setup else None
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                if trace:
+                    tracemalloc.start()
+                try:
+                    started = time.perf_counter()
+                    case.run(arg) if case.setup else case.run()
+                    out["wall"] = time.perf_counter() - started
+                    if trace:
+                        out["peak"] = tracemalloc.get_traced_memory()[1]
+                finally:
+                    # Case xato bersa ham tracemalloc qolgan o'lchovlarni sekinlashtirmasin
+                    if trace:
+                        tracemalloc.stop()
+            out["queries"] = counter.count
+            raise _Rollback
+    except _Rollback:
+        pass
+    return out
+
+
+def measure(case: BenchmarkCase, repeat: int = 3) -> BenchmarkResult:
+    """repeat ta vaqt o'lchovi (tracemalloc siz) + bitta xotira/so'rov o'lchovi (tracemalloc bilan)."""
+    walls = [_run_once(case)["wall"] for _ in range(max(1, repeat))]
+    traced = _run_once(case, trace=True)
+    return BenchmarkResult(
+        name=case.name,
+        wall_ms=round(statistics.median(walls) * 1000, 2),
+        wall_ms_min=round(min(walls) * 1000, 2),
+        queries=traced["queries"],
+        peak_kb=round(traced.get("peak", 0) / 1024, 1),
+        runs=len(walls),
+    )
+
+
+def prepare_context(employees=200, days=30, seed=42, use_existing=False, progress=None):
+    """
+    Benchmark uchun ma'lumot: generate_dataset (use_existing bo'lmasa), oxirgi 7 kun uchun xulosalar,
+    faol jarima qoidasi va dashboardga kirish uchun admin. Chaqiruvchi tranzaksiya ichida bo'lishi kerak.
+    """
+    from accounts.models import User
+    from attendance.models import AttendanceLog
+    from attendance.recompute import recompute_chunk
+    from core.dataset import generate_dataset
+    from employees.models import Employee
+    from penalties.models import PenaltyRule
+
+    if use_existing:
+        last = AttendanceLog.objects.order_by("-timestamp").values_list("timestamp", flat=True).first()
+        end = timezone.localtime(last).date() if last else timezone.localdate()
+        start = end - timedelta(days=days - 1)
+    else:
+        counts = generate_dataset(employees=employees, days=days, seed=seed, progress=progress)
+        start, end = counts["start"], counts["end"]
+    employee_pks = list(Employee.objects.filter(is_active=True).values_list("pk", flat=True))
+    summary_from = max(start, end - timedelta(days=6))
+    recompute_chunk(employee_pks, summary_from, end)
+    if not PenaltyRule.objects.filter(is_active=True).exists():
+        PenaltyRule.objects.create(name="Benchmark", rule_type="per_minute", amount_per_unit=1000)
+    user = User.objects.create_user(username="__benchmark__", password="x", role="admin")
+    client = Client()
+    client.force_login(user)
+    return {"start": start, "end": end, "summary_from": summary_from, "client": client, "employee_pks": employee_pks}
+
+
+def _webhook_secret():
+    from integrations.models import IntegrationSettings
+
+    return (IntegrationSettings.get_settings().webhook_secret or "").strip()
+
+
+def default_cases(ctx):
+    """Issiq yo'llar ro'yxati (tartib natija faylida saqlanadi)."""
+    from attendance.models import LatenessRecord
+    from attendance.services import recompute_daily_summary
+    from attendance.tasks import run_daily_summary_and_penalties
+    from employees.models import Employee
+    from integrations.models import RawDeviceEvent
+    from integrations.tasks import process_raw_device_event
+    from penalties.exemptions import ExemptionIndex
+    from penalties.services import apply_penalties_for_latenesses
+    from reports import export
+
+    client = ctx["client"]
+    start, end, day = ctx["start"], ctx["end"], ctx["end"]
+    sample = list(Employee.objects.filter(is_active=True).order_by("pk")[:50])
+    webhook_url = reverse("integrations:webhook")
+    secret = _webhook_secret()
+    headers = {"HTTP_X_WEBHOOK_SECRET": secret} if secret else {}
+
+    def payload(i, emp):
+        ts = timezone.make_aware(datetime.combine(day, dt_time(9, 0))) + timedelta(seconds=i)
+        return {"employee_id": emp.employee_id, "event_type": "check_in", "timestamp": ts.isoformat(), "event_id": f"bench-{i}"}
+
+    single_body = json.dumps(payload(0, sample[0]))
+    array_body = json.dumps([payload(i, emp) for i, emp in enumerate(sample)])
+
+    def post_webhook(body):
+        response = client.post(webhook_url, data=body, content_type="application/json", **headers)
+        if response.status_code != 202:
+            raise RuntimeError(f"webhook returned {response.status_code}")
+
+    def raw_event_setup():
+        return RawDeviceEvent.objects.create(external_event_id="bench-raw", payload_json=payload(10_000, sample[0])).pk
+
+    def recompute_sample():
+        exemptions = ExemptionIndex.load(day, day)
+        for emp in sample:
+            recompute_daily_summary(emp, day, exemptions=exemptions)
+
+    def penalty_batch():
+        exemptions = ExemptionIndex.load(ctx["summary_from"], end)
+        apply_penalties_for_latenesses(
+            LatenessRecord.objects.filter(date__gte=ctx["summary_from"], date__lte=end).select_related("employee"),
+            exemptions=exemptions,
+        )
+
+    def get(url):
+        response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} returned {response.status_code}")
+
+    range_qs = f"?date_from={start.isoformat()}&date_to={end.isoformat()}"
+    return [
+        BenchmarkCase("webhook_single", lambda: post_webhook(single_body)),
+        BenchmarkCase(f"webhook_array_{len(sample)}", lambda: post_webhook(array_body)),
+        BenchmarkCase("process_raw_device_event", lambda pk: process_raw_device_event(pk), setup=raw_event_setup),
+        BenchmarkCase(f"recompute_daily_summary_x{len(sample)}", recompute_sample),
+        BenchmarkCase("run_daily_summary_and_penalties_full", lambda: run_daily_summary_and_penalties(day=day, full=True)),
+        BenchmarkCase("run_daily_summary_and_penalties", lambda: run_daily_summary_and_penalties(day=day)),
+        BenchmarkCase("apply_penalty_for_lateness_batch", penalty_batch),
+        BenchmarkCase("export_attendance_excel", lambda: export.export_attendance_excel(start, end)),
+        BenchmarkCase("export_lateness_excel", lambda: export.export_lateness_excel(start, end)),
+        BenchmarkCase("export_penalty_excel", lambda: export.export_penalty_excel(start, end)),
+        BenchmarkCase("export_attendance_logs_excel", lambda: export.export_attendance_logs_excel(start, end)),
+        BenchmarkCase("dashboard_view", lambda: get(reverse("core:dashboard"))),
+        BenchmarkCase("reconciliation_report", lambda: get(reverse("reports:reconciliation") + range_qs)),
+    ]
+
+
+def run_benchmarks(employees=200, days=30, seed=42, repeat=3, use_existing=False, only=None, progress=None):
+    """
+    Barcha holatlarni o'lchaydi va natija dict ini qaytaradi (JSON ga yoziladigan shaklda).
+    Celery .delay chaqiruvlari o'chiriladi — ingest o'zi o'lchanadi, navbat emas.
+    """
+    results = []
+    meta = {}
+    with mock.patch("integrations.views.process_raw_device_event.delay"), mock.patch(
+        "attendance.tasks.dispatch_notification_outbox.delay"
+    ), override_settings(
+        WEBHOOK_RATE_LIMIT=10**9, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+    ):
+        try:
+            with transaction.atomic():
+                ctx = prepare_context(employees, days, seed, use_existing, progress=progress)
+                meta = {"start": ctx["start"].isoformat(), "end": ctx["end"].isoformat(), "employees": len(ctx["employee_pks"])}
+                for case in default_cases(ctx):
+                    if only and not any(part in case.name for part in only):
+                        continue
+                    result = measure(case, repeat=repeat)
+                    results.append(result)
+                    if progress:
+                        progress(f"  {result.name}: {result.wall_ms} ms, {result.queries} so'rov, {result.peak_kb} KB")
+                raise _Rollback
+        except _Rollback:
+            pass
+    return {
+        "created_at": timezone.now().isoformat(),
+        "python": platform.python_version(),
+        "database": connection.vendor,
+        "dataset": {**meta, "days": days, "seed": seed, "use_existing": use_existing},
+        "results": [asdict(r) for r in results],
+    }
+
+
+def compare_to_baseline(report: dict, baseline: dict, threshold: float, min_delta_ms: float = 5.0):
+    """
+    Regressiyalar ro'yxati: vaqt baseline dan (1 + threshold) martadan va min_delta_ms dan ko'p oshgan
+    yoki so'rovlar soni ko'paygan holatlar. Baseline da yo'q holatlar e'tiborsiz qoldiriladi.
+    """
+    base = {r["name"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for r in report["results"]:
+        b = base.get(r["name"])
+        if not b:
+            continue
+        if r["wall_ms"] > b["wall_ms"] * (1 + threshold) and r["wall_ms"] - b["wall_ms"] > min_delta_ms:
+            regressions.append(f"{r['name']}: {b['wall_ms']} ms -> {r['wall_ms']} ms")
+        if r["queries"] > b["queries"]:
+            regressions.append(f"{r['name']}: {b['queries']} -> {r['queries']} so'rov")
+    return regressions
+
+
+def write_json(path, data):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
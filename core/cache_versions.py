@@ -0,0 +1,27 @@
+"""
+Process keshlari uchun umumiy versiya hisoblagichlari (Django cache da).
+Hisoblagich faqat kesh backendi processlar orasida umumiy bo'lsa (Redis) boshqa processlarga yetib boradi;
+LocMemCache har bir processda alohida — unda keshlar versiyaga emas, muddatga tayanishi kerak
+(employees.schedules, core.system_settings). Hisobot ETaglari esa umumiy keshni talab qiladi (core.checks).
+"""
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def is_process_local_cache(alias: str = "default") -> bool:
+    """Kesh backendi boshqa processlar (gunicorn/Celery workerlari) bilan bo'lishilmaydimi."""
+    return isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+def get_version(key: str) -> int:
+    return cache.get(key, 0)
+
+
+def bump_version(key: str):
+    """Hisoblagichni atomik oshiradi (kalit yo'q yoki muddati o'tgan bo'lsa 1 dan boshlanadi)."""
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
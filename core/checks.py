@@ -0,0 +1,24 @@
+"""Loyiha system checklari (manage.py check --deploy)."""
+from django.core.checks import Tags, Warning, register
+
+from .cache_versions import is_process_local_cache
+
+
+@register(Tags.caches, deploy=True)
+def shared_cache_check(app_configs, **kwargs):
+    """
+    Bir nechta gunicorn/Celery worker bilan umumiy kesh kerak: hisobot ETag versiyasi, Telegram va webhook
+    cheklovlari keshda. LocMemCache da ular har bir processda alohida.
+    """
+    if not is_process_local_cache():
+        return []
+    return [
+        Warning(
+            "Default cache is process-local (REDIS_CACHE_URL is not set).",
+            hint=(
+                "Report ETag invalidation, Telegram and webhook rate limits are per process. "
+                "Set REDIS_CACHE_URL when running more than one gunicorn or Celery worker."
+            ),
+            id="core.W001",
+        )
+    ]
@@ -0,0 +1,273 @@
+"""
+Yuklama va masshtab testlari uchun sintetik ma'lumotlar generatori (generate_dataset komandasi).
+Hamma narsa seed dan deterministik: bir xil parametrlar bir xil xodimlar, loglar va raw eventlarni beradi.
+Qatorlar bulk_create bilan yoziladi — signal ishlamaydi (DirtyDay, rematch navbatga qo'yilmaydi).
+Raw eventlar Hikvision shakllarida (webhook AccessControllerEvent va AcsEvent InfoList) yasaladi va
+haqiqiy mapperlar (_hikvision_event_to_payload, _acs_item_to_payload) orqali payload ga aylantiriladi.
+"""
+import math
+import random
+from datetime import date, datetime, time, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from attendance.models import AttendanceLog
+from employees.models import Employee, WorkSchedule
+from integrations.models import RawDeviceEvent, device_identifier_from_payload
+from penalties.models import PenaltyExemption
+
+GENERATED_DEVICE_IP = "generated"
+LATE_DISTRIBUTIONS = ("exponential", "uniform", "lognormal")
+
+DEPARTMENTS = [
+    "Buxgalteriya", "IT", "Sotuv", "Logistika", "Ombor", "Kadrlar",
+    "Marketing", "Yuridik", "Ishlab chiqarish", "Xavfsizlik", "Xizmat ko'rsatish", "Ta'minot",
+]
+FIRST_NAMES = ["Ali", "Vali", "Aziz", "Bobur", "Dilshod", "Jasur", "Kamola", "Malika", "Nodira", "Sardor", "Shahlo", "Zarina"]
+LAST_NAMES = ["Karimov", "Valiyev", "Rahimov", "Tursunov", "Yusupova", "Saidova", "Aliyeva", "Qodirov", "Nazarov", "Ergasheva"]
+
+# (nomi, boshlanish, tugash, muhlat, ish kunlari)
+SCHEDULES = [
+    ("Du-Ju 09:00", time(9, 0), time(18, 0), 5, "0,1,2,3,4"),
+    ("Du-Sh 08:00", time(8, 0), time(17, 0), 10, "0,1,2,3,4,5"),
+    ("Smena 10:00", time(10, 0), time(22, 0), 15, "0,1,2,3,4,5,6"),
+]
+
+
+def _late_minutes(rng, distribution: str, mean: float) -> int:
+    if distribution == "uniform":
+        value = rng.uniform(1, 2 * mean)
+    elif distribution == "lognormal":
+        sigma = 0.8
+        value = rng.lognormvariate(math.log(max(mean, 1)) - sigma * sigma / 2, sigma)
+    else:
+        value = rng.expovariate(1 / max(mean, 1))
+    return max(1, int(round(value)))
+
+
+def hikvision_webhook_body(employee_no: str, ts: datetime, event_type: str, serial_no: int) -> dict:
+    """Qurilma webhook (multipart AccessControllerEvent qismi) JSON i."""
+    return {
+        "ipAddress": "192.168.1.64",
+        "portNo": 80,
+        "protocol": "HTTP",
+        "macAddress": "44:19:b6:00:00:01",
+        "channelID": 1,
+        "dateTime": ts.isoformat(),
+        "activePostCount": 1,
+        "eventType": "AccessControllerEvent",
+        "eventState": "active",
+        "eventDescription": "Access Controller Event",
+        "shortSerialNumber": "K1T341",
+        "AccessControllerEvent": {
+            "deviceName": "Access Controller",
+            "majorEventType": 5,
+            "subEventType": 1025 if event_type == "check_out" else 1024,
+            "name": "",
+            "cardReaderNo": 1,
+            "employeeNoString": employee_no,
+            "serialNo": serial_no,
+            "userType": "normal",
+            "currentVerifyMode": "cardOrFaceOrFp",
+            "attendanceStatus": "checkOut" if event_type == "check_out" else "checkIn",
+            "label": "out" if event_type == "check_out" else "in",
+        },
+    }
+
+
+def hikvision_acs_item(employee_no: str, ts: datetime, event_type: str, serial_no: int) -> dict:
+    """ISAPI AcsEvent InfoList elementi (tarixiy import shakli)."""
+    return {
+        "major": 5,
+        "minor": 1025 if event_type == "check_out" else 1024,
+        "time": ts.isoformat(),
+        "cardType": 1,
+        "name": "",
+        "cardReaderNo": 1,
+        "doorNo": 1,
+        "employeeNoString": employee_no,
+        "serialNo": serial_no,
+        "userType": "normal",
+        "currentVerifyMode": "cardOrFaceOrFp",
+        "mask": "unknown",
+        "label": "out" if event_type == "check_out" else "in",
+    }
+
+
+def reset_dataset(prefix: str = "GEN"):
+    """Oldingi generatsiyani o'chiradi (xodimlar kaskad bilan loglar/xulosalar/ozodlarni olib ketadi)."""
+    with transaction.atomic():
+        RawDeviceEvent.objects.filter(device_ip=GENERATED_DEVICE_IP).delete()
+        deleted, _ = Employee.objects.filter(employee_id__startswith=prefix).delete()
+        WorkSchedule.objects.filter(name__startswith=f"{prefix} ").delete()
+    return deleted
+
+
+def generate_dataset(
+    employees: int = 100,
+    days: int = 30,
+    end: date = None,
+    seed: int = 42,
+    prefix: str = "GEN",
+    departments: int = 8,
+    late_ratio: float = 0.15,
+    late_mean: float = 12.0,
+    late_distribution: str = "exponential",
+    absent_ratio: float = 0.05,
+    exemption_ratio: float = 0.02,
+    missing_checkout_ratio: float = 0.03,
+    raw_events: bool = True,
+    unmatched_ratio: float = 0.01,
+    batch_size: int = 5000,
+    progress=None,
+):
+    """
+    employees ta xodim va [end - days + 1, end] kunlari uchun log/ozod/raw eventlarni yaratadi.
+    progress: ixtiyoriy callable(str) — har bir xodim blokidan keyin chaqiriladi.
+    Returns yaratilgan qatorlar soni bo'yicha dict.
+    """
+    if late_distribution not in LATE_DISTRIBUTIONS:
+        raise ValueError(f"late_distribution must be one of {LATE_DISTRIBUTIONS}")
+    from integrations.tasks import _acs_item_to_payload
+    from integrations.views import _hikvision_event_to_payload, _parse_event_time
+
+    rng = random.Random(seed)
+    end = end or timezone.localdate()
+    start = end - timedelta(days=days - 1)
+    day_list = [start + timedelta(days=i) for i in range(days)]
+    tz = timezone.get_current_timezone()
+    now = timezone.now()
+    dept_names = DEPARTMENTS[: max(1, min(departments, len(DEPARTMENTS)))]
+    counts = {"employees": 0, "logs": 0, "exemptions": 0, "raw_events": 0, "unmatched": 0}
+
+    schedules = []
+    for name, ws, we, grace, working_days in SCHEDULES:
+        schedule, _ = WorkSchedule.objects.get_or_create(
+            name=f"{prefix} {name}",
+            defaults={
+                "work_start_time": ws,
+                "work_end_time": we,
+                "grace_period_minutes": grace,
+                "working_days": working_days,
+            },
+        )
+        schedules.append(schedule)
+    schedule_by_pk = {s.pk: s for s in schedules}
+
+    # Seed bo'yicha siljitilgan seriya raqamlari — turli seedlar source_id larda to'qnashmaydi
+    serial_no = seed * 1_000_000_000
+    block = max(1, batch_size // max(1, days * 2))
+    for block_start in range(0, employees, block):
+        rows = []
+        for n in range(block_start, min(employees, block_start + block)):
+            # Taxminan har 4-xodimdan biri grafiksiz (o'z vaqtlari bilan)
+            schedule = schedules[n % len(schedules)] if rng.random() >= 0.25 else None
+            rows.append(
+                Employee(
+                    employee_id=f"{prefix}{n + 1:06d}",
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=rng.choice(LAST_NAMES),
+                    department=rng.choice(dept_names),
+                    work_schedule=schedule,
+                    work_start_time=time(9, 0),
+                    work_end_time=time(18, 0),
+                    grace_period_minutes=5,
+                    device_person_id=f"HV{prefix}{n + 1:06d}",
+                )
+            )
+        with transaction.atomic():
+            created = Employee.objects.bulk_create(rows, batch_size=batch_size)
+            logs, exemptions, raws = [], [], []
+            for emp in created:
+                schedule = schedule_by_pk.get(emp.work_schedule_id)
+                if schedule:
+                    work_start, work_end, grace = schedule.work_start_time, schedule.work_end_time, schedule.grace_period_minutes
+                    weekdays = schedule.get_working_weekdays()
+                else:
+                    work_start, work_end, grace = emp.work_start_time, emp.work_end_time, emp.grace_period_minutes
+                    weekdays = {0, 1, 2, 3, 4}
+                for day in day_list:
+                    if rng.random() < exemption_ratio:
+                        length = rng.randint(1, 5)
+                        exemptions.append(
+                            PenaltyExemption(
+                                employee=emp,
+                                date_from=day,
+                                date_to=day + timedelta(days=length - 1),
+                                reason_type=rng.choice(["sick_leave", "leave_approved", "business_trip", "other"]),
+                            )
+                        )
+                    if day.weekday() not in weekdays or rng.random() < absent_ratio:
+                        continue
+                    start_dt = datetime.combine(day, work_start, tzinfo=tz)
+                    if rng.random() < late_ratio:
+                        offset = grace + _late_minutes(rng, late_distribution, late_mean)
+                    else:
+                        offset = rng.randint(-20, grace)
+                    check_in = start_dt + timedelta(minutes=offset, seconds=rng.randint(0, 59))
+                    events = [("check_in", check_in)]
+                    if rng.random() >= missing_checkout_ratio:
+                        out_dt = datetime.combine(day, work_end, tzinfo=tz)
+                        if work_end <= work_start:
+                            out_dt += timedelta(days=1)
+                        events.append(("check_out", out_dt + timedelta(minutes=rng.randint(-15, 60))))
+                    for event_type, ts in events:
+                        serial_no += 1
+                        if raw_events:
+                            if serial_no % 2:
+                                payload = _hikvision_event_to_payload(
+                                    hikvision_webhook_body(emp.employee_id, ts, event_type, serial_no)
+                                )
+                            else:
+                                payload = _acs_item_to_payload(hikvision_acs_item(emp.employee_id, ts, event_type, serial_no))
+                            source_id = payload["event_id"]
+                            raws.append(
+                                RawDeviceEvent(
+                                    device_ip=GENERATED_DEVICE_IP,
+                                    external_event_id=source_id,
+                                    payload_json=payload,
+                                    device_identifier=device_identifier_from_payload(payload),
+                                    event_time_device=_parse_event_time(payload["timestamp"]),
+                                    processed_at=now,
+                                    status=RawDeviceEvent.STATUS_PROCESSED,
+                                )
+                            )
+                        else:
+                            source_id = f"gen_{seed}_{serial_no}"
+                        logs.append(
+                            AttendanceLog(employee=emp, event_type=event_type, timestamp=ts, source_id=source_id)
+                        )
+            if raw_events:
+                # Noma'lum qurilma identifikatorlari — unmatched navbati uchun
+                for _ in range(int(len(logs) * unmatched_ratio)):
+                    serial_no += 1
+                    ts = datetime.combine(rng.choice(day_list), time(9, 0), tzinfo=tz) + timedelta(minutes=rng.randint(-30, 60))
+                    payload = _hikvision_event_to_payload(
+                        hikvision_webhook_body(f"UNK{rng.randint(1, 50):04d}", ts, "check_in", serial_no)
+                    )
+                    raws.append(
+                        RawDeviceEvent(
+                            device_ip=GENERATED_DEVICE_IP,
+                            external_event_id=payload["event_id"],
+                            payload_json=payload,
+                            device_identifier=device_identifier_from_payload(payload),
+                            event_time_device=ts,
+                            processed_at=now,
+                            status=RawDeviceEvent.STATUS_UNMATCHED,
+                            error_code="employee_not_found",
+                        )
+                    )
+                    counts["unmatched"] += 1
+            AttendanceLog.objects.bulk_create(logs, batch_size=batch_size)
+            PenaltyExemption.objects.bulk_create(exemptions, batch_size=batch_size)
+            RawDeviceEvent.objects.bulk_create(raws, batch_size=batch_size)
+        counts["employees"] += len(created)
+        counts["logs"] += len(logs)
+        counts["exemptions"] += len(exemptions)
+        counts["raw_events"] += len(raws)
+        if progress:
+            progress(f"  {counts['employees']}/{employees} xodim, {counts['logs']} log")
+    counts["start"] = start
+    counts["end"] = end
+    return counts
@@ -1,5 +1,5 @@
 """Umumiy sana oralig‘i: GET parametrlaridan start/end."""
-from datetime import date, timedelta
+from datetime import date, datetime, time, timedelta
 
 from django.utils import timezone
 
@@ -63,6 +63,16 @@ def parse_date_range(request, *, default_period="month"):
     return start, end, period
 
 
+def datetime_bounds(start: date, end: date):
+    """
+    [start, end] sana oralig‘ini mahalliy vaqt bo‘yicha yarim ochiq [dt_from, dt_to) datetime chegaraga aylantiradi.
+    `field__date__gte/lte` o‘rniga `field__gte=dt_from, field__lt=dt_to` — indeks ishlatiladi (sargable).
+    """
+    dt_from = timezone.make_aware(datetime.combine(start, time.min))
+    dt_to = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+    return dt_from, dt_to
+
+
 def query_string_for_export(request, allowed_keys=None):
     """Excel havolasi uchun GET ni nusxalash."""
     from urllib.parse import urlencode
@@ -0,0 +1,67 @@
+"""
+Issiq yo'llar benchmarki: vaqt, so'rovlar soni, eng yuqori xotira; baseline bilan solishtirish.
+Barcha yozuvlar rollback qilinadi — ishlayotgan bazada ham xavfsiz.
+
+Ishlatish:
+  python manage.py benchmark
+  python manage.py benchmark --employees 1000 --days 60 --repeat 5
+  python manage.py benchmark --only webhook,export
+  python manage.py benchmark --save-baseline
+  python manage.py benchmark --baseline benchmarks/baseline.json --threshold 0.3
+  python manage.py benchmark --use-existing --days 30
+"""
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import compare_to_baseline, read_json, run_benchmarks, write_json
+
+
+class Command(BaseCommand):
+    help = "Webhook, task, eksport va hisobot sahifalarini o'lchaydi va baseline bilan solishtiradi."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=200, help="Generatsiya qilinadigan xodimlar (default: 200)")
+        parser.add_argument("--days", type=int, default=30, help="Kunlar soni (default: 30)")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--repeat", type=int, default=3, help="Har bir holat necha marta o'lchanadi (median)")
+        parser.add_argument("--use-existing", action="store_true", help="Generatsiya qilmasdan bazadagi ma'lumotlarda")
+        parser.add_argument("--only", default="", help="Vergul bilan holat nomi bo'laklari")
+        parser.add_argument("--output", default="", help="Natija JSON (default: BENCHMARK_RESULTS_PATH)")
+        parser.add_argument("--baseline", default="", help="Baseline JSON (default: BENCHMARK_BASELINE_PATH)")
+        parser.add_argument("--threshold", type=float, default=None, help="Ruxsat etilgan sekinlashish ulushi (0.25 = 25%)")
+        parser.add_argument("--save-baseline", action="store_true", help="Natijani baseline sifatida saqlash")
+
+    def handle(self, *args, **options):
+        only = [s.strip() for s in options["only"].split(",") if s.strip()]
+        report = run_benchmarks(
+            employees=options["employees"],
+            days=options["days"],
+            seed=options["seed"],
+            repeat=options["repeat"],
+            use_existing=options["use_existing"],
+            only=only,
+            progress=self.stdout.write,
+        )
+        output = Path(options["output"] or settings.BENCHMARK_RESULTS_PATH)
+        write_json(output, report)
+        self.stdout.write(f"Natija: {output}")
+
+        baseline_path = Path(options["baseline"] or settings.BENCHMARK_BASELINE_PATH)
+        if options["save_baseline"]:
+            write_json(baseline_path, report)
+            self.stdout.write(self.style.SUCCESS(f"Baseline saqlandi: {baseline_path}"))
+            return
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(f"Baseline yo'q ({baseline_path}) — solishtirilmadi."))
+            return
+        threshold = options["threshold"]
+        if threshold is None:
+            threshold = settings.BENCHMARK_REGRESSION_THRESHOLD
+        regressions = compare_to_baseline(report, read_json(baseline_path), threshold)
+        if regressions:
+            for line in regressions:
+                self.stderr.write(self.style.ERROR(f"  {line}"))
+            raise CommandError(f"{len(regressions)} ta regressiya (threshold {threshold:.0%}).")
+        self.stdout.write(self.style.SUCCESS(f"Baseline bilan solishtirildi: regressiya yo'q (threshold {threshold:.0%})."))
@@ -0,0 +1,157 @@
+"""
+Prometheus formatidagi metrikalar (/metrics). Qiymatlar Django keshida (productionda Redis) saqlanadi,
+shuning uchun gunicorn va Celery processlari bitta hisoblagichga yozadi va istalgan worker ularni ko'rsatadi.
+Label qiymatlari oldindan e'lon qilinadi — scrape vaqtida barcha kalitlar bitta get_many bilan o'qiladi.
+Metrika yozishdagi xato chaqiruvchi kodni hech qachon buzmaydi.
+"""
+import bisect
+import itertools
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "worktrack_"
+_KEY_PREFIX = "metrics:"
+REGISTRY = []
+
+
+def _incr(key, amount):
+    try:
+        if cache.add(key, amount, timeout=None):
+            return
+        cache.incr(key, amount)
+    except ValueError:
+        cache.set(key, amount, timeout=None)
+    except Exception:
+        logger.debug("metrics: cache write failed for %s", key, exc_info=True)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    # Label qiymatlari oldindan e'lon qilingan oddiy satrlar — escaping kerak emas
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Counter:
+    def __init__(self, name, documentation, labels=None):
+        # labels: {"result": ["ok", "failed"]} — faqat shu qiymatlar qabul qilinadi
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labels = labels or {}
+        REGISTRY.append(self)
+
+    def _series(self):
+        names = sorted(self.labels)
+        for values in itertools.product(*(self.labels[n] for n in names)):
+            yield tuple(zip(names, values))
+
+    def _key(self, series):
+        return _KEY_PREFIX + self.name + ":" + ",".join(f"{k}={v}" for k, v in series)
+
+    def inc(self, amount=1, **labels):
+        series = tuple(sorted(labels.items()))
+        if set(labels) != set(self.labels) or any(v not in self.labels[k] for k, v in series):
+            logger.warning("metrics: unknown labels for %s: %s", self.name, labels)
+            return
+        _incr(self._key(series), int(amount))
+
+    def keys(self):
+        return [self._key(s) for s in self._series()]
+
+    def render(self, values):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for series in self._series():
+            lines.append(f"{self.name}_total{_format_labels(series)} {values.get(self._key(series), 0)}")
+        return lines
+
+
+class Histogram:
+    """Qiymatlar soniyada; yig'indi keshda millisekund butun soni sifatida saqlanadi (incr faqat int)."""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.buckets = list(buckets)
+        REGISTRY.append(self)
+
+    def _bucket_key(self, index):
+        return f"{_KEY_PREFIX}{self.name}:bucket:{index}"
+
+    def observe(self, seconds):
+        if seconds is None:
+            return
+        seconds = max(0.0, float(seconds))
+        _incr(self._bucket_key(bisect.bisect_left(self.buckets, seconds)), 1)
+        _incr(f"{_KEY_PREFIX}{self.name}:sum_ms", int(round(seconds * 1000)))
+
+    def keys(self):
+        return [self._bucket_key(i) for i in range(len(self.buckets) + 1)] + [f"{_KEY_PREFIX}{self.name}:sum_ms"]
+
+    def render(self, values):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        running = 0
+        for i, upper in enumerate(self.buckets):
+            running += values.get(self._bucket_key(i), 0)
+            lines.append(f'{self.name}_bucket{{le="{upper:g}"}} {running}')
+        running += values.get(self._bucket_key(len(self.buckets)), 0)
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {running}')
+        lines.append(f"{self.name}_sum {values.get(f'{_KEY_PREFIX}{self.name}:sum_ms', 0) / 1000:g}")
+        lines.append(f"{self.name}_count {running}")
+        return lines
+
+
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600]
+RUN_BUCKETS = [1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600]
+
+WEBHOOK_REQUESTS = Counter(
+    "webhook_requests",
+    "Webhook requests by result.",
+    {"result": ["accepted", "rate_limited", "unauthorized", "disabled", "bad_request"]},
+)
+WEBHOOK_EVENTS_QUEUED = Counter("webhook_events_queued", "Raw events stored and queued by the webhook.")
+RAW_EVENT_PROCESSING_SECONDS = Histogram(
+    "raw_event_processing_seconds", "processed_at - received_at for raw device events.", LATENCY_BUCKETS
+)
+DEVICE_LAG_SECONDS = Histogram(
+    "device_lag_seconds", "received_at - event_time_device at webhook ingest.", LATENCY_BUCKETS
+)
+NIGHTLY_RUN_SECONDS = Histogram(
+    "nightly_run_seconds", "Duration of run_daily_summary_and_penalties.", RUN_BUCKETS
+)
+PENALTIES_CREATED = Counter(
+    "penalties_created",
+    "Automatic penalties created from lateness records.",
+    {"rule_type": ["per_minute", "fixed", "percent_of_salary", "custom"]},
+)
+TELEGRAM_SENDS = Counter("telegram_sends", "Telegram sendMessage attempts by result.", {"result": ["ok", "failed", "rate_limited"]})
+
+
+def _raw_events_by_status():
+    from django.db.models import Count
+
+    from integrations.models import RawDeviceEvent
+
+    name = PREFIX + "raw_events"
+    counts = dict(RawDeviceEvent.objects.values_list("status").annotate(c=Count("id")).order_by())
+    lines = [f"# HELP {name} Raw device events by status.", f"# TYPE {name} gauge"]
+    for status, _label in RawDeviceEvent.STATUS_CHOICES:
+        lines.append(f'{name}{{status="{status}"}} {counts.get(status, 0)}')
+    return lines
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition (0.0.4)."""
+    keys = [key for metric in REGISTRY for key in metric.keys()]
+    try:
+        values = cache.get_many(keys)
+    except Exception:
+        logger.warning("metrics: cache read failed", exc_info=True)
+        values = {}
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render(values))
+    lines.extend(_raw_events_by_status())
+    return "\n".join(lines) + "\n"
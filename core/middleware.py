@@ -1,5 +1,6 @@
 """Custom middleware."""
 from django.conf import settings
+from . import profiling
 from .utils import audit_log
 
 
@@ -20,3 +21,20 @@ class AuditLogMiddleware:
                     request=request,
                 )
         return response
+
+
+class ProfilingMiddleware:
+    """
+    PROFILING_ENABLED bo'lsa: har bir so'rov uchun devor vaqti, SQL soni/vaqti va eng sekin SQL lar.
+    Gistogramma "METHOD namespace:url_name" bo'yicha yuritiladi.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with profiling.profile("view", "unresolved") as profiler:
+            response = self.get_response(request)
+            if profiler is not None:
+                match = getattr(request, "resolver_match", None)
+                profiler.name = f"{request.method} {(match.view_name if match else '') or 'unresolved'}"
+        return response
@@ -2,6 +2,7 @@
 Core models: system-wide settings and audit.
 """
 from django.db import models
+from django.utils import timezone
 
 
 class SystemSettings(models.Model):
@@ -33,7 +34,8 @@ class AuditLog(models.Model):
     object_id = models.CharField(max_length=100, blank=True)
     message = models.TextField(blank=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # auto_now_add emas: buferlangan yozuvchi bulk_create da hodisa vaqtini saqlashi kerak
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ["-created_at"]
@@ -0,0 +1,249 @@
+"""
+Ixtiyoriy (PROFILING_ENABLED) profiling: Django so'rovlari va Celery tasklari uchun devor vaqti,
+so'rovlar soni/vaqti va eng sekin N ta SQL (chaqiruv joyi bilan). Chegaradan sekin bo'lganlari
+"worktrack.slow" loggeriga bitta JSON qator sifatida yoziladi.
+Davomiylik gistogrammasi keshda (barcha processlar uchun umumiy) vaqt oynalari bo'yicha saqlanadi:
+admin sahifasi oxirgi PROFILING_WINDOWS oyna yig'indisidan p50/p95/p99 ni hisoblaydi.
+"""
+import bisect
+import hashlib
+import heapq
+import json
+import logging
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger("worktrack.slow")
+
+# Gistogramma chegaralari (ms): oxirgi bucket — undan kattalar
+BUCKETS_MS = [5, 10, 25, 50, 75, 100, 150, 250, 400, 600, 1000, 1500, 2500, 4000, 6000, 10000, 20000, 60000]
+_names_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "PROFILING_ENABLED", False)
+
+
+def _call_site():
+    """Loyiha ichidagi eng yaqin chaqiruvchi (file:line function), site-packages va shu modul tashqari."""
+    base = str(Path(settings.BASE_DIR).resolve())
+    this_file = str(Path(__file__).resolve())
+    for frame in reversed(traceback.extract_stack()[:-3]):
+        if frame.filename.startswith(base) and "site-packages" not in frame.filename and frame.filename != this_file:
+            return f"{Path(frame.filename).relative_to(base)}:{frame.lineno} {frame.name}"
+    return ""
+
+
+class QueryProfiler:
+    """execute_wrapper: so'rovlar soni, umumiy vaqt va eng sekin top_n ta SQL."""
+
+    def __init__(self, top_n: int = 5, name: str = ""):
+        self.top_n = top_n
+        # Blok ichida aniqlanadigan nom (masalan, view nomi so'rov resolve bo'lgandan keyin)
+        self.name = name
+        self.count = 0
+        self.total_ms = 0.0
+        self._slowest = []  # min-heap: (ms, seq, sql, call_site)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            ms = (time.perf_counter() - started) * 1000
+            self.count += 1
+            self.total_ms += ms
+            if len(self._slowest) < self.top_n or ms > self._slowest[0][0]:
+                item = (ms, self.count, sql[:500], _call_site())
+                if len(self._slowest) < self.top_n:
+                    heapq.heappush(self._slowest, item)
+                else:
+                    heapq.heapreplace(self._slowest, item)
+
+    def slowest(self):
+        return [
+            {"ms": round(ms, 2), "sql": sql, "call_site": site}
+            for ms, _seq, sql, site in sorted(self._slowest, reverse=True)
+        ]
+
+
+@contextmanager
+def profile(kind: str, name: str):
+    """
+    Blokni profil qiladi; yoqilmagan bo'lsa hech narsa qilmaydi (None beradi).
+    Natija gistogrammaga yoziladi, chegaradan sekin bo'lsa slow-path log qilinadi.
+    """
+    if not is_enabled():
+        yield None
+        return
+    profiler = QueryProfiler(top_n=getattr(settings, "PROFILING_TOP_SQL", 5), name=name)
+    started = time.perf_counter()
+    try:
+        with connection.execute_wrapper(profiler):
+            yield profiler
+    finally:
+        wall_ms = (time.perf_counter() - started) * 1000
+        try:
+            record(kind, profiler.name or name, wall_ms, profiler)
+        except Exception:
+            logger.exception("profiling record failed kind=%s name=%s", kind, profiler.name or name)
+
+
+def record(kind: str, name: str, wall_ms: float, profiler: QueryProfiler = None):
+    observe(kind, name, wall_ms)
+    threshold = getattr(settings, "PROFILING_SLOW_MS", {}).get(kind, 1000)
+    if wall_ms < threshold:
+        return
+    entry = {
+        "kind": kind,
+        "name": name,
+        "wall_ms": round(wall_ms, 2),
+        "threshold_ms": threshold,
+    }
+    if profiler is not None:
+        entry.update(
+            queries=profiler.count,
+            query_ms=round(profiler.total_ms, 2),
+            slowest_sql=profiler.slowest(),
+        )
+    slow_logger.warning(json.dumps(entry, ensure_ascii=False))
+
+
+# ——— Keshdagi gistogramma ———
+
+def _window(now=None) -> int:
+    return int((now or time.time()) // settings.PROFILING_WINDOW_SECONDS)
+
+
+def _ttl() -> int:
+    return settings.PROFILING_WINDOW_SECONDS * (settings.PROFILING_WINDOWS + 1)
+
+
+def _name_id(kind, name):
+    # Kesh kalitida bo'sh joy/maxsus belgilar bo'lmasligi uchun nom hashlanadi
+    return hashlib.md5(f"{kind}|{name}".encode("utf-8")).hexdigest()[:16]
+
+
+def _bucket_key(window, kind, name, index):
+    return f"prof:{window}:{_name_id(kind, name)}:{index}"
+
+
+def _names_key(window):
+    return f"prof:{window}:names"
+
+
+def _incr(key, ttl):
+    cache.add(key, 0, timeout=ttl)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Kalit add va incr orasida muddati tugagan bo'lsa
+        cache.set(key, 1, timeout=ttl)
+
+
+def observe(kind: str, name: str, wall_ms: float):
+    """Joriy oynadagi (kind, name) gistogrammasiga bitta qiymat qo'shadi."""
+    window = _window()
+    ttl = _ttl()
+    index = bisect.bisect_left(BUCKETS_MS, wall_ms)
+    _incr(_bucket_key(window, kind, name, index), ttl)
+    # Nomlar ro'yxati: yangi nom oynada birinchi marta ko'rilganda qo'shiladi (kamdan-kam yoziladi)
+    if cache.add(f"prof:{window}:seen:{_name_id(kind, name)}", 1, timeout=ttl):
+        with _names_lock:
+            names = cache.get(_names_key(window)) or []
+            if [kind, name] not in names:
+                names.append([kind, name])
+                cache.set(_names_key(window), names, timeout=ttl)
+
+
+def _percentile(counts, total, q):
+    """Bucket sanoqlaridan q-percentil (bucket ichida chiziqli interpolyatsiya)."""
+    target = q * total
+    running = 0
+    for index, count in enumerate(counts):
+        if not count:
+            continue
+        if running + count >= target:
+            low = BUCKETS_MS[index - 1] if index > 0 else 0
+            high = BUCKETS_MS[index] if index < len(BUCKETS_MS) else BUCKETS_MS[-1] * 2
+            return round(low + (high - low) * ((target - running) / count), 1)
+        running += count
+    return float(BUCKETS_MS[-1])
+
+
+def summary(windows=None):
+    """
+    Oxirgi oynalar bo'yicha har bir (kind, name) uchun: count, p50, p95, p99 (ms).
+    Returns p95 bo'yicha kamayish tartibida ro'yxat.
+    """
+    windows = windows or settings.PROFILING_WINDOWS
+    current = _window()
+    window_ids = list(range(current - windows + 1, current + 1))
+    names = set()
+    for names_list in cache.get_many([_names_key(w) for w in window_ids]).values():
+        names.update(tuple(n) for n in names_list)
+    rows = []
+    n_buckets = len(BUCKETS_MS) + 1
+    for kind, name in names:
+        keys = [_bucket_key(w, kind, name, i) for w in window_ids for i in range(n_buckets)]
+        values = cache.get_many(keys)
+        counts = [0] * n_buckets
+        for w in window_ids:
+            for i in range(n_buckets):
+                counts[i] += values.get(_bucket_key(w, kind, name, i), 0)
+        total = sum(counts)
+        if not total:
+            continue
+        rows.append(
+            {
+                "kind": kind,
+                "name": name,
+                "count": total,
+                "p50": _percentile(counts, total, 0.50),
+                "p95": _percentile(counts, total, 0.95),
+                "p99": _percentile(counts, total, 0.99),
+            }
+        )
+    rows.sort(key=lambda r: (-r["p95"], r["kind"], r["name"]))
+    return rows
+
+
+# ——— Celery ———
+
+_task_state = threading.local()
+
+
+def _task_prerun(task_id=None, task=None, **kwargs):
+    if not is_enabled():
+        return
+    cm = profile("task", task.name if task else "unknown")
+    cm.__enter__()
+    stack = getattr(_task_state, "stack", None)
+    if stack is None:
+        stack = _task_state.stack = {}
+    stack[task_id] = cm
+
+
+def _task_postrun(task_id=None, **kwargs):
+    stack = getattr(_task_state, "stack", None)
+    cm = stack.pop(task_id, None) if stack else None
+    if cm is not None:
+        cm.__exit__(None, None, None)
+
+
+def connect_celery_signals():
+    """CoreConfig.ready dan chaqiriladi; Celery bo'lmasa jim o'tadi."""
+    try:
+        from celery.signals import task_postrun, task_prerun
+    except ImportError:
+        return
+    task_prerun.connect(_task_prerun, weak=False, dispatch_uid="core.profiling.task_prerun")
+    task_postrun.connect(_task_postrun, weak=False, dispatch_uid="core.profiling.task_postrun")
@@ -0,0 +1,14 @@
+"""Signal handlers: tizim sozlamalari keshini yangilash."""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import SystemSettings
+from .system_settings import invalidate_system_settings_cache
+
+
+@receiver(post_save, sender=SystemSettings, dispatch_uid="core_system_settings_cache_save")
+@receiver(post_delete, sender=SystemSettings, dispatch_uid="core_system_settings_cache_delete")
+def invalidate_system_settings_cache_on_change(sender, **kwargs):
+    # Commitdan keyin: boshqa processlar eski qiymatni qayta keshlab qolmasligi uchun
+    transaction.on_commit(invalidate_system_settings_cache)
@@ -0,0 +1,149 @@
+"""
+SystemSettings uchun tiplangan registr va process keshi. Kalit-qiymat qatorlari bir marta o'qiladi va
+tiplarga (time, int, Decimal) aylantiriladi; yozilganda umumiy kesh versiyasi oshiriladi, boshqa
+processlar versiyani SYSTEM_SETTINGS_CHECK_SECONDS da bir marta tekshiradi (employees.schedules bilan bir xil;
+LocMemCache da esa versiyadan qat'i nazar shu muddatda qayta yuklanadi).
+"""
+import threading
+import time as _time
+from dataclasses import dataclass
+from datetime import datetime, time
+from decimal import Decimal, InvalidOperation
+
+from .cache_versions import bump_version, get_version, is_process_local_cache
+
+VERSION_CACHE_KEY = "system_settings_cache_version"
+SYSTEM_SETTINGS_CHECK_SECONDS = 30
+
+
+def _parse_time(value: str) -> time:
+    return datetime.strptime(value.strip()[:5], "%H:%M").time()
+
+
+def _parse_int(value: str) -> int:
+    number = int(value.strip())
+    if number < 0:
+        raise ValueError("must be >= 0")
+    return number
+
+
+def _parse_decimal(value: str) -> Decimal:
+    try:
+        number = Decimal(value.strip())
+    except InvalidOperation:
+        raise ValueError(f"invalid decimal: {value!r}")
+    # NaN/Infinity bilan solishtirish InvalidOperation beradi — avval chekli ekanini tekshiramiz
+    if not number.is_finite() or number < 0:
+        raise ValueError("must be a finite number >= 0")
+    return number
+
+
+def _format_time(value: time) -> str:
+    return value.strftime("%H:%M")
+
+
+@dataclass(frozen=True)
+class SettingSpec:
+    key: str
+    parse: callable
+    default: str
+    format: callable = str
+    description: str = ""
+
+
+REGISTRY = {
+    spec.key: spec
+    for spec in [
+        SettingSpec("default_work_start", _parse_time, "09:00", _format_time, "Standart ish boshlanish vaqti"),
+        SettingSpec("default_work_end", _parse_time, "18:00", _format_time, "Standart ish tugash vaqti"),
+        SettingSpec("default_grace_period", _parse_int, "5", str, "Standart muhlat (daqiqa)"),
+        SettingSpec("default_penalty_per_minute", _parse_decimal, "0", str, "Standart jarima har daqiqaga"),
+    ]
+}
+
+
+class _SettingsCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = None  # key -> tiplangan qiymat
+        self._version = None
+        self._checked_at = 0.0
+
+    def _load(self):
+        from .models import SystemSettings
+
+        stored = dict(SystemSettings.objects.filter(key__in=list(REGISTRY)).values_list("key", "value"))
+        values = {}
+        for key, spec in REGISTRY.items():
+            try:
+                values[key] = spec.parse(stored[key]) if stored.get(key, "").strip() else spec.parse(spec.default)
+            except ValueError:
+                # Admin orqali noto'g'ri qiymat yozilgan bo'lsa — standart qiymat
+                values[key] = spec.parse(spec.default)
+        return values
+
+    def get_all(self):
+        now = _time.monotonic()
+        if self._values is not None and now - self._checked_at < SYSTEM_SETTINGS_CHECK_SECONDS:
+            return self._values
+        with self._lock:
+            version = get_version(VERSION_CACHE_KEY)
+            # Process ichidagi keshda versiya boshqa processlarga yetmaydi — muddat bo'yicha qayta yuklanadi
+            if self._values is None or version != self._version or is_process_local_cache():
+                self._values = self._load()
+                self._version = version
+            self._checked_at = now
+            return self._values
+
+    def clear(self):
+        with self._lock:
+            self._values = None
+            self._version = None
+            self._checked_at = 0.0
+
+
+_cache = _SettingsCache()
+
+
+def invalidate_system_settings_cache():
+    """Lokal keshni tozalaydi va umumiy versiyani oshiradi (boshqa processlar ham qayta yuklaydi)."""
+    _cache.clear()
+    bump_version(VERSION_CACHE_KEY)
+
+
+def get_system_settings() -> dict:
+    """Barcha registrdagi sozlamalar tiplangan holda: {"default_work_start": time(9, 0), ...}."""
+    return dict(_cache.get_all())
+
+
+def get_setting(key: str):
+    return _cache.get_all()[key]
+
+
+def format_setting(key: str, value) -> str:
+    return REGISTRY[key].format(value)
+
+
+def set_system_settings(raw_values: dict):
+    """
+    {key: satr} ni tekshiradi va saqlaydi. Bo'sh satr — standart qiymat.
+    Noto'g'ri qiymatlar bo'lsa hech narsa yozilmaydi; Returns {key: xato matni} (bo'sh dict — muvaffaqiyat).
+    """
+    from .models import SystemSettings
+
+    parsed, errors = {}, {}
+    for key, raw in raw_values.items():
+        spec = REGISTRY[key]
+        raw = (raw or "").strip() or spec.default
+        try:
+            parsed[key] = spec.format(spec.parse(raw))
+        except ValueError as e:
+            errors[key] = str(e)
+    if errors:
+        return errors
+    for key, value in parsed.items():
+        SystemSettings.objects.update_or_create(
+            key=key, defaults={"value": value, "description": REGISTRY[key].description}
+        )
+    invalidate_system_settings_cache()
+    return {}
@@ -0,0 +1,140 @@
+"""
+Testlar uchun so'rov byudjeti yordamchilari va loyiha test runneri.
+QueryRecorder har bir SQL ni loyiha ichidagi chaqiruv steki bilan yozadi; bir xil shakldagi so'rov
+(literal qiymatlarsiz) ko'p marta takrorlansa — N+1 deb, qaysi koddan chaqirilgani bilan ko'rsatiladi.
+"""
+import re
+import traceback
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.test.runner import DiscoverRunner
+
+_NUMBER_RE = re.compile(r"\b\d+(\.\d+)?\b")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_IN_LIST_RE = re.compile(r"\bIN \((?:\s*(?:\?|%s)\s*,?)+\)", re.IGNORECASE)
+_SAVEPOINT_RE = re.compile(r'"s\d+_x\d+"')
+
+
+def normalize_sql(sql: str) -> str:
+    """Literal va parametrlarni ? bilan almashtiradi — bir xil shakldagi so'rovlar bitta kalitga tushadi."""
+    sql = _SAVEPOINT_RE.sub('"savepoint"', sql)
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    return " ".join(sql.split())
+
+
+def _project_stack(limit=8):
+    """Faqat loyiha fayllaridagi freymlar (site-packages va shu modul tashqari)."""
+    base = str(Path(settings.BASE_DIR).resolve())
+    this_file = str(Path(__file__).resolve())
+    frames = [
+        f
+        for f in traceback.extract_stack()[:-2]
+        if f.filename.startswith(base) and "site-packages" not in f.filename and f.filename != this_file
+    ]
+    return traceback.format_list(frames[-limit:])
+
+
+class QueryRecorder:
+    """connection.execute_wrapper: (sql, stack) ro'yxatini yig'adi."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((sql, _project_stack()))
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def repeated(self, threshold: int):
+        """threshold va undan ko'p marta takrorlangan so'rov shakllari: [(shape, count, first_stack), ...]."""
+        groups = defaultdict(list)
+        for sql, stack in self.queries:
+            groups[normalize_sql(sql)].append(stack)
+        return sorted(
+            ((shape, len(stacks), stacks[0]) for shape, stacks in groups.items() if len(stacks) >= threshold),
+            key=lambda item: -item[1],
+        )
+
+    def report(self, threshold: int) -> str:
+        lines = []
+        for shape, count, stack in self.repeated(threshold):
+            lines.append(f"\n{count}x {shape[:300]}\n" + "".join(stack))
+        return "".join(lines)
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin:
+      with self.assertQueryBudget(12): ...  — so'rovlar soni chegaradan oshmasligi va N+1 bo'lmasligi kerak.
+      self.assertQueryCountStable(run, grow) — grow() dan keyin ham run() dagi so'rovlar soni o'zgarmaydi.
+    """
+
+    n_plus_one_threshold = 5
+
+    @contextmanager
+    def recordQueries(self):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            yield recorder
+
+    @contextmanager
+    def assertQueryBudget(self, budget: int, n_plus_one_threshold=None):
+        threshold = n_plus_one_threshold or self.n_plus_one_threshold
+        with self.recordQueries() as recorder:
+            yield recorder
+        problems = []
+        if len(recorder) > budget:
+            problems.append(f"{len(recorder)} queries executed, budget is {budget}.")
+        repeated = recorder.report(threshold)
+        if repeated:
+            problems.append(f"Possible N+1 (same query shape >= {threshold} times):{repeated}")
+        if problems:
+            self.fail("\n".join(problems))
+
+    def assertQueryCountStable(self, run, grow, budget: int = None, warmup: bool = True):
+        """
+        run() ni ikki marta o'lchaydi (orasida grow()); so'rovlar soni qator soniga qarab o'smasligi kerak.
+        warmup: birinchi chaqiruv o'lchanmaydi (sessiya, grafik keshi va h.k. bir martalik so'rovlari).
+        """
+        if warmup:
+            run()
+        with self.recordQueries() as before:
+            run()
+        grow()
+        with self.recordQueries() as after:
+            run()
+        if len(after) > len(before):
+            shapes_before = {shape: count for shape, count, _ in before.repeated(1)}
+            grown = [
+                (shape, count, stack)
+                for shape, count, stack in after.repeated(1)
+                if count > shapes_before.get(shape, 0)
+            ]
+            details = "".join(
+                f"\n{shapes_before.get(shape, 0)} -> {count}x {shape[:300]}\n" + "".join(stack)
+                for shape, count, stack in grown
+            )
+            self.fail(f"Query count grew with row count: {len(before)} -> {len(after)}.{details}")
+        if budget is not None and len(after) > budget:
+            self.fail(f"{len(after)} queries executed, budget is {budget}.")
+        return len(after)
+
+
+class WorkTrackTestRunner(DiscoverRunner):
+    """
+    Testlar bitta tranzaksiyada ishlaydi — audit fon thread ulanishi ularni ko'rmaydi,
+    shuning uchun test muhitida audit yozuvlari sync yoziladi.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.AUDIT_LOG_BUFFERED = False
@@ -0,0 +1,61 @@
+"""Buferlangan audit log: so'rov yo'lida INSERT yo'q, flush bulk_create bilan, xato bo'lsa fallback fayl."""
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from core import audit
+from core.audit import AuditLogWriter
+from core.models import AuditLog
+
+
+class AuditLogWriterTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.fallback = Path(self.tmp.name) / "audit" / "fallback.jsonl"
+        # Katta interval: fon thread testda o'zi flush qilmaydi
+        self.writer = AuditLogWriter(batch_size=50, interval=3600, fallback_path=self.fallback)
+        self.user = User.objects.create_user(username="aud", password="x", role="admin")
+
+    def _entry(self, n, created_at=None):
+        return {
+            "user_id": self.user.pk,
+            "action": "POST",
+            "model_name": "",
+            "object_id": "",
+            "message": f"POST /x/{n}",
+            "ip_address": "127.0.0.1",
+            "created_at": created_at or timezone.now(),
+        }
+
+    def test_flush_bulk_creates_with_original_time(self):
+        earlier = timezone.now() - timedelta(minutes=5)
+        for n in range(10):
+            self.writer.enqueue(self._entry(n, created_at=earlier))
+        self.assertFalse(AuditLog.objects.exists())
+        with self.assertNumQueries(1):
+            self.assertEqual(self.writer.flush(), 10)
+        self.assertEqual(AuditLog.objects.filter(created_at=earlier).count(), 10)
+
+    def test_failed_flush_falls_back_to_file(self):
+        self.writer.enqueue(self._entry(1))
+        with mock.patch.object(AuditLog.objects, "bulk_create", side_effect=RuntimeError("db down")):
+            self.writer.flush()
+        lines = self.fallback.read_text(encoding="utf-8").splitlines()
+        self.assertEqual(json.loads(lines[0])["message"], "POST /x/1")
+
+    def test_middleware_enqueues_instead_of_writing(self):
+        client = Client()
+        client.force_login(self.user)
+        with override_settings(AUDIT_LOG_BUFFERED=True), mock.patch.object(audit, "_writer", self.writer):
+            client.post(reverse("core:dashboard"))
+            self.assertFalse(AuditLog.objects.exists())
+            self.writer.flush()
+        self.assertEqual(AuditLog.objects.get().message, f"POST {reverse('core:dashboard')}")
@@ -0,0 +1,35 @@
+"""benchmark: o'lchov, rollback va baseline solishtiruvi."""
+from django.test import TestCase, override_settings
+
+from core.benchmark import compare_to_baseline, run_benchmarks
+from employees.models import Employee
+
+
+@override_settings(USE_TZ=True, TIME_ZONE="Asia/Tashkent")
+class BenchmarkTests(TestCase):
+    def test_run_measures_and_rolls_back(self):
+        report = run_benchmarks(employees=5, days=3, repeat=1, only=["webhook_single", "dashboard", "export_penalty"])
+        names = [r["name"] for r in report["results"]]
+        self.assertEqual(names, ["webhook_single", "export_penalty_excel", "dashboard_view"])
+        for r in report["results"]:
+            self.assertGreater(r["wall_ms"], 0)
+            self.assertGreater(r["queries"], 0)
+            self.assertGreater(r["peak_kb"], 0)
+        self.assertEqual(report["dataset"]["employees"], 5)
+        # Generatsiya va o'lchovlar rollback qilingan
+        self.assertFalse(Employee.objects.exists())
+
+    def test_compare_flags_slowdown_and_extra_queries(self):
+        baseline = {"results": [
+            {"name": "a", "wall_ms": 100.0, "queries": 10},
+            {"name": "b", "wall_ms": 2.0, "queries": 3},
+            {"name": "c", "wall_ms": 50.0, "queries": 5},
+        ]}
+        report = {"results": [
+            {"name": "a", "wall_ms": 130.0, "queries": 10},  # +30%
+            {"name": "b", "wall_ms": 4.0, "queries": 3},  # +100%, lekin < 5 ms farq — shovqin
+            {"name": "c", "wall_ms": 50.0, "queries": 6},
+            {"name": "new", "wall_ms": 999.0, "queries": 99},
+        ]}
+        regressions = compare_to_baseline(report, baseline, threshold=0.25)
+        self.assertEqual(regressions, ["a: 100.0 ms -> 130.0 ms", "c: 5 -> 6 so'rov"])
@@ -0,0 +1,64 @@
+"""generate_dataset: determinizm va Hikvision payload shakllari."""
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from attendance.models import AttendanceLog
+from core.dataset import generate_dataset, reset_dataset
+from employees.models import Employee
+from integrations.models import RawDeviceEvent
+
+
+def _snapshot():
+    return list(
+        AttendanceLog.objects.order_by("employee__employee_id", "timestamp", "event_type").values_list(
+            "employee__employee_id", "event_type", "timestamp", "source_id"
+        )
+    )
+
+
+@override_settings(USE_TZ=True, TIME_ZONE="Asia/Tashkent")
+class GenerateDatasetTests(TestCase):
+    def test_same_seed_gives_same_rows(self):
+        kwargs = dict(employees=6, days=10, end=date(2026, 5, 31), seed=3)
+        first_counts = generate_dataset(**kwargs)
+        first = _snapshot()
+        reset_dataset()
+        self.assertFalse(Employee.objects.exists())
+        second_counts = generate_dataset(**kwargs)
+        self.assertEqual(first, _snapshot())
+        self.assertEqual(first_counts, second_counts)
+        self.assertGreater(first_counts["logs"], 0)
+
+    def test_raw_events_match_logs_and_pipeline_shape(self):
+        counts = generate_dataset(employees=4, days=7, end=date(2026, 5, 31), unmatched_ratio=0.2)
+        processed = RawDeviceEvent.objects.filter(status=RawDeviceEvent.STATUS_PROCESSED)
+        self.assertEqual(processed.count(), counts["logs"])
+        self.assertEqual(
+            set(processed.values_list("external_event_id", flat=True)),
+            set(AttendanceLog.objects.values_list("source_id", flat=True)),
+        )
+        raw = processed.first()
+        self.assertEqual(set(raw.payload_json), {"employee_id", "event_type", "timestamp", "event_id"})
+        self.assertEqual(raw.device_identifier, raw.payload_json["employee_id"])
+        self.assertEqual(
+            RawDeviceEvent.objects.filter(status=RawDeviceEvent.STATUS_UNMATCHED).count(), counts["unmatched"]
+        )
+
+    def test_command_prints_summary(self):
+        out = StringIO()
+        call_command("generate_dataset", "--employees", "3", "--days", "3", "--end", "2026-05-31", stdout=out)
+        self.assertEqual(Employee.objects.filter(employee_id__startswith="GEN").count(), 3)
+        self.assertIn("qator/s", out.getvalue())
+
+    def test_reset_without_employees_only_deletes(self):
+        call_command("generate_dataset", "--employees", "2", "--days", "2", "--end", "2026-05-31", stdout=StringIO())
+        call_command("generate_dataset", "--reset", stdout=StringIO())
+        self.assertFalse(Employee.objects.exists())
+
+        call_command(
+            "generate_dataset", "--reset", "--employees", "2", "--days", "2", "--end", "2026-05-31", stdout=StringIO()
+        )
+        self.assertEqual(Employee.objects.count(), 2)
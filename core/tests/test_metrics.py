@@ -0,0 +1,61 @@
+"""Prometheus /metrics: keshdagi hisoblagichlar, gistogramma va token."""
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from integrations.models import IntegrationSettings
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _scrape(self, **headers):
+        response = self.client.get(reverse("core:metrics"), **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        return response.content.decode()
+
+    def test_counter_and_histogram_render(self):
+        metrics.TELEGRAM_SENDS.inc(result="ok")
+        metrics.TELEGRAM_SENDS.inc(result="ok")
+        metrics.TELEGRAM_SENDS.inc(result="bogus")  # noma'lum label e'tiborsiz qoldiriladi
+        metrics.NIGHTLY_RUN_SECONDS.observe(3)
+        metrics.NIGHTLY_RUN_SECONDS.observe(100)
+        body = self._scrape()
+        self.assertIn('worktrack_telegram_sends_total{result="ok"} 2', body)
+        self.assertIn('worktrack_telegram_sends_total{result="failed"} 0', body)
+        self.assertIn('worktrack_nightly_run_seconds_bucket{le="1"} 0', body)
+        self.assertIn('worktrack_nightly_run_seconds_bucket{le="5"} 1', body)
+        self.assertIn('worktrack_nightly_run_seconds_bucket{le="+Inf"} 2', body)
+        self.assertIn("worktrack_nightly_run_seconds_sum 103", body)
+        self.assertIn('worktrack_raw_events{status="received"} 0', body)
+
+    def test_webhook_results_and_queue_are_counted(self):
+        url = reverse("integrations:webhook")
+        secret = (IntegrationSettings.get_settings().webhook_secret or "").strip()
+        headers = {"HTTP_X_WEBHOOK_SECRET": secret} if secret else {}
+        body = json.dumps(
+            [
+                {"employee_id": "X1", "event_type": "check_in", "timestamp": "2024-01-02T09:00:00+05:00", "event_id": "m1"},
+                {"employee_id": "X1", "event_type": "check_out", "timestamp": "2024-01-02T18:00:00+05:00", "event_id": "m2"},
+            ]
+        )
+        with mock.patch("integrations.views.process_raw_device_event.delay"):
+            self.assertEqual(self.client.post(url, data=body, content_type="application/json", **headers).status_code, 202)
+            self.client.post(url, data="{bad", content_type="application/json", **headers)
+        text = self._scrape()
+        self.assertIn('worktrack_webhook_requests_total{result="accepted"} 1', text)
+        self.assertIn('worktrack_webhook_requests_total{result="bad_request"} 1', text)
+        self.assertIn("worktrack_webhook_events_queued_total 2", text)
+        self.assertIn('worktrack_device_lag_seconds_bucket{le="+Inf"} 2', text)
+        self.assertIn('worktrack_raw_events{status="received"} 2', text)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_token_required_when_configured(self):
+        self.assertEqual(self.client.get(reverse("core:metrics")).status_code, 401)
+        self.assertIn("worktrack_", self._scrape(HTTP_AUTHORIZATION="Bearer s3cret"))
@@ -0,0 +1,62 @@
+"""Profiling middleware, slow-path log va keshdagi p50/p95/p99."""
+import json
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from core import profiling
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_SLOW_MS={"view": 60000, "task": 60000})
+class ProfilingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="prof", password="x", role="admin")
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_percentiles_from_histogram(self):
+        for ms in [1] * 50 + [30] * 45 + [700] * 5:
+            profiling.observe("task", "demo", ms)
+        row = next(r for r in profiling.summary() if r["name"] == "demo")
+        self.assertEqual(row["count"], 100)
+        self.assertLessEqual(row["p50"], 5)
+        self.assertTrue(25 <= row["p95"] <= 50)
+        self.assertTrue(600 <= row["p99"] <= 1000)
+
+    def test_middleware_records_view_name(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get(reverse("core:dashboard")).status_code, 200)
+        names = {(r["kind"], r["name"]): r["count"] for r in profiling.summary()}
+        self.assertEqual(names[("view", "GET core:dashboard")], 3)
+
+    @override_settings(PROFILING_SLOW_MS={"view": 0, "task": 0})
+    def test_slow_request_logs_structured_record(self):
+        with self.assertLogs("worktrack.slow", level="WARNING") as logs:
+            self.client.get(reverse("core:dashboard"))
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(entry["name"], "GET core:dashboard")
+        self.assertGreater(entry["queries"], 0)
+        self.assertTrue(entry["slowest_sql"])
+        self.assertIn("core/views.py", entry["slowest_sql"][0]["call_site"])
+
+    def test_celery_signals_record_task(self):
+        task = SimpleNamespace(name="attendance.tasks.demo")
+        profiling._task_prerun(task_id="t1", task=task)
+        User.objects.count()
+        profiling._task_postrun(task_id="t1", task=task)
+        self.assertIn(("task", "attendance.tasks.demo"), {(r["kind"], r["name"]) for r in profiling.summary()})
+
+    def test_admin_page(self):
+        profiling.observe("view", "GET core:dashboard", 12)
+        response = self.client.get(reverse("core:profiling"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "GET core:dashboard")
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled_records_nothing(self):
+        self.client.get(reverse("core:dashboard"))
+        self.assertEqual(profiling.summary(), [])
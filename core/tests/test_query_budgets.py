@@ -0,0 +1,144 @@
+"""
+So'rov byudjeti: issiq sahifa va tasklar qatorlar soniga bog'liq bo'lmagan, cheklangan sonda so'rov qiladi.
+Har bir testda ma'lumot ko'paytiriladi (grow) va so'rovlar soni o'zgarmasligi tekshiriladi.
+"""
+import json
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from attendance.models import AttendanceLog, DailySummary, DirtyDay, LatenessRecord
+from attendance.tasks import run_daily_summary_and_penalties
+from core.testing import QueryBudgetMixin
+from employees.models import Employee, WorkSchedule
+from integrations.models import RawDeviceEvent
+from penalties.models import Penalty, PenaltyExemption, PenaltyRule
+
+
+@override_settings(USE_TZ=True, TIME_ZONE="Asia/Tashkent", WEBHOOK_RATE_LIMIT=10**6)
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.schedule = WorkSchedule.objects.create(
+            name="Du-Ju", work_start_time=time(9, 0), work_end_time=time(18, 0), working_days="0,1,2,3,4"
+        )
+        self.rule = PenaltyRule.objects.create(name="Per minute", rule_type="per_minute", amount_per_unit=100)
+        self.user = User.objects.create_user(username="budget", password="x", role="admin")
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.seq = 0
+        self.employees = []
+        self.grow(3)
+
+    def grow(self, n=5):
+        """n ta xodim qo'shadi: har biriga bir necha kunlik log, xulosa, kechikish, jarima, ozod va raw event."""
+        for _ in range(n):
+            self.seq += 1
+            emp = Employee.objects.create(
+                employee_id=f"Q{self.seq:03d}",
+                first_name="Q",
+                last_name=str(self.seq),
+                work_start_time=time(9, 0),
+                work_end_time=time(18, 0),
+                work_schedule=self.schedule if self.seq % 2 else None,
+            )
+            self.employees.append(emp)
+            for offset in range(3):
+                day = self.today - timedelta(days=offset)
+                check_in = timezone.make_aware(datetime.combine(day, time(9, 30)))
+                AttendanceLog.objects.create(employee=emp, event_type="check_in", timestamp=check_in, source_id=f"q{self.seq}-{offset}")
+                AttendanceLog.objects.create(
+                    employee=emp, event_type="check_in", timestamp=check_in + timedelta(minutes=1), source_id=f"q{self.seq}-{offset}d"
+                )
+                DailySummary.objects.create(employee=emp, date=day, status=DailySummary.STATUS_LATE, minutes_late=25, check_in_time=check_in)
+                lateness = LatenessRecord.objects.create(
+                    employee=emp, date=day, minutes_late=25, check_in_time=check_in, expected_start=time(9, 0)
+                )
+                Penalty.objects.create(employee=emp, amount=Decimal("2500"), rule=self.rule, lateness_record=lateness, penalty_date=day)
+                Penalty.objects.create(employee=emp, amount=Decimal("1000"), penalty_date=day, reason="auto")
+                RawDeviceEvent.objects.create(
+                    status=RawDeviceEvent.STATUS_PROCESSED,
+                    external_event_id=f"q{self.seq}-{offset}",
+                    payload_json={"employee_id": emp.employee_id, "event_type": "check_in", "timestamp": check_in.isoformat()},
+                )
+            PenaltyExemption.objects.create(employee=emp, date_from=self.today - timedelta(days=10), date_to=self.today - timedelta(days=9))
+
+    def _get(self, url):
+        def run():
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+        return run
+
+    def _range(self, name):
+        start = self.today - timedelta(days=7)
+        return reverse(name) + f"?date_from={start.isoformat()}&date_to={self.today.isoformat()}"
+
+    def test_dashboard(self):
+        self.assertQueryCountStable(self._get(reverse("core:dashboard")), self.grow, budget=10)
+
+    def test_report_pages(self):
+        for name, budget in (
+            ("reports:attendance", 6),
+            ("reports:lateness", 6),
+            ("reports:penalty", 6),
+            ("reports:reconciliation", 14),
+        ):
+            with self.subTest(report=name):
+                self.assertQueryCountStable(self._get(self._range(name)), self.grow, budget=budget)
+
+    def test_employee_detail(self):
+        emp = self.employees[0]
+        self.assertQueryCountStable(self._get(reverse("employees:detail", args=[emp.pk])), self.grow, budget=10)
+
+    def test_webhook_array(self):
+        url = reverse("integrations:webhook")
+        size = {"n": 3}
+
+        def run():
+            body = [
+                {"employee_id": "Q001", "event_type": "check_in", "timestamp": "2026-05-04T09:00:00+05:00", "event_id": f"w{size['n']}-{i}"}
+                for i in range(size["n"])
+            ]
+            with patch("integrations.views.process_raw_device_event.delay"):
+                response = self.client.post(url, data=json.dumps(body), content_type="application/json")
+            self.assertEqual(response.status_code, 202)
+
+        def grow():
+            size["n"] = 20
+
+        self.assertQueryCountStable(run, grow, budget=6)
+
+    def test_nightly_task_penalizes_latenesses(self):
+        day = self.today  # grow() shu kun uchun har bir xodimga kechikish qo'shadi
+
+        def run():
+            # Har o'lchovda kechikishlar jarimasiz — jarima yaratish yo'li ham o'lchanadi
+            Penalty.objects.filter(penalty_date=day, lateness_record__isnull=False).delete()
+            with patch("attendance.tasks.dispatch_notification_outbox.delay"):
+                run_daily_summary_and_penalties(day=day)
+            self.assertEqual(
+                Penalty.objects.filter(penalty_date=day, lateness_record__isnull=False).count(), len(self.employees)
+            )
+
+        def grow():
+            self.grow()
+            # grow() signallari DirtyDay yozadi — bu test ledger bo'sh holatni o'lchaydi
+            DirtyDay.objects.all().delete()
+
+        DirtyDay.objects.all().delete()
+        self.assertQueryCountStable(run, grow, budget=20)
+
+    def test_budget_reports_n_plus_one_stack(self):
+        self.grow()
+        with self.assertRaises(AssertionError) as ctx:
+            with self.assertQueryBudget(100):
+                for emp in Employee.objects.all():
+                    list(emp.attendance_logs.all())
+        message = str(ctx.exception)
+        self.assertIn("Possible N+1", message)
+        self.assertIn("test_query_budgets.py", message)
@@ -0,0 +1,84 @@
+"""Tiplangan SystemSettings: process keshi, versiya bo'yicha yangilanish va platforma sozlamalari sahifasi."""
+from datetime import time
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from accounts.models import User
+from core.models import SystemSettings
+from core.checks import shared_cache_check
+from core.system_settings import (
+    SYSTEM_SETTINGS_CHECK_SECONDS,
+    _SettingsCache,
+    get_setting,
+    get_system_settings,
+    invalidate_system_settings_cache,
+    set_system_settings,
+)
+from employees.forms import EmployeeForm
+
+
+class SystemSettingsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_system_settings_cache()
+
+    def test_typed_defaults_and_cached_reads(self):
+        values = get_system_settings()
+        self.assertEqual(values["default_work_start"], time(9, 0))
+        self.assertEqual(values["default_grace_period"], 5)
+        self.assertEqual(values["default_penalty_per_minute"], Decimal("0"))
+        with self.assertNumQueries(0):
+            for _ in range(100):
+                get_setting("default_work_end")
+
+    def test_write_invalidates_and_rejects_bad_values(self):
+        get_system_settings()
+        self.assertEqual(set_system_settings({"default_work_start": "08:30", "default_grace_period": "10"}), {})
+        self.assertEqual(get_setting("default_work_start"), time(8, 30))
+        self.assertEqual(get_setting("default_grace_period"), 10)
+
+        errors = set_system_settings({"default_work_end": "17:00", "default_grace_period": "abc"})
+        self.assertIn("default_grace_period", errors)
+        self.assertEqual(get_setting("default_work_end"), time(18, 0))  # hech narsa yozilmadi
+
+        # Admin orqali to'g'ridan-to'g'ri o'zgartirish ham signal bilan keshni yangilaydi
+        row = SystemSettings.objects.get(key="default_grace_period")
+        row.value = "7"
+        with self.captureOnCommitCallbacks(execute=True):
+            row.save()
+        self.assertEqual(get_setting("default_grace_period"), 7)
+
+    def test_other_process_reloads_after_ttl_without_shared_cache(self):
+        other = _SettingsCache()  # boshqa process keshi
+        self.assertEqual(other.get_all()["default_grace_period"], 5)
+        SystemSettings.objects.update_or_create(key="default_grace_period", defaults={"value": "12"})
+        later = other._checked_at + SYSTEM_SETTINGS_CHECK_SECONDS + 1
+        with mock.patch("core.system_settings._time.monotonic", return_value=later):
+            self.assertEqual(other.get_all()["default_grace_period"], 12)
+        self.assertEqual([w.id for w in shared_cache_check(None)], ["core.W001"])
+
+    def test_non_finite_decimal_is_rejected(self):
+        for raw in ("NaN", "sNaN", "Infinity", "-Infinity"):
+            errors = set_system_settings({"default_penalty_per_minute": raw})
+            self.assertIn("default_penalty_per_minute", errors, raw)
+        # Admin orqali yozilgan bo'lsa ham o'qish yiqilmaydi — standart qiymat
+        SystemSettings.objects.update_or_create(key="default_penalty_per_minute", defaults={"value": "NaN"})
+        invalidate_system_settings_cache()
+        self.assertEqual(get_setting("default_penalty_per_minute"), Decimal("0"))
+
+    def test_platform_page_and_employee_form_use_registry(self):
+        user = User.objects.create_user(username="ps", password="x", role="admin")
+        client = Client()
+        client.force_login(user)
+        url = reverse("integrations:platform_settings")
+        client.post(url, {"default_work_start": "10:00", "default_work_end": "19:00", "default_grace_period": "3", "default_penalty_per_minute": "500"})
+        response = client.get(url)
+        self.assertEqual(response.context["default_work_start"], "10:00")
+        self.assertEqual(response.context["default_penalty_per_minute"], "500")
+        form = EmployeeForm()
+        self.assertEqual(form.fields["work_start_time"].initial, time(10, 0))
+        self.assertEqual(form.fields["grace_period_minutes"].initial, 3)
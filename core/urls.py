@@ -7,4 +7,6 @@ urlpatterns = [
     path("", views.DashboardView.as_view(), name="dashboard"),
     path("settings/", views.SettingsRedirectView.as_view(), name="settings_redirect"),
     path("support/", views.SupportView.as_view(), name="support"),
+    path("profiling/", views.ProfilingView.as_view(), name="profiling"),
+    path("metrics", views.MetricsView.as_view(), name="metrics"),
 ]
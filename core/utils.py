@@ -1,18 +1,31 @@
 """Reusable utilities."""
+from django.conf import settings
+from django.utils import timezone
+
 from .models import AuditLog
 
 
 def audit_log(user=None, action="", model_name="", object_id="", message="", request=None):
-    """Create an audit log entry."""
+    """
+    Create an audit log entry. AUDIT_LOG_BUFFERED bo'lsa so'rov yo'lida yozilmaydi —
+    core.audit yozuvchisi navbatiga qo'shiladi va fon threadda bulk_create bilan yoziladi.
+    """
     ip = None
     if request:
         xff = request.META.get("HTTP_X_FORWARDED_FOR")
         ip = (xff.split(",")[0].strip() if xff else None) or request.META.get("REMOTE_ADDR")
-    AuditLog.objects.create(
-        user=user,
-        action=action,
-        model_name=model_name,
-        object_id=str(object_id) if object_id else "",
-        message=message[:2000] if message else "",
-        ip_address=ip,
-    )
+    entry = {
+        "user_id": user.pk if user else None,
+        "action": action,
+        "model_name": model_name,
+        "object_id": str(object_id) if object_id else "",
+        "message": message[:2000] if message else "",
+        "ip_address": ip,
+        "created_at": timezone.now(),
+    }
+    if getattr(settings, "AUDIT_LOG_BUFFERED", False):
+        from .audit import get_writer
+
+        get_writer().enqueue(entry)
+        return
+    AuditLog.objects.create(**entry)
@@ -1,13 +1,20 @@
 """Core views: dashboard and settings redirect."""
 import json
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import method_decorator
+from django.views import View
 from django.views.generic import TemplateView, RedirectView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, Sum
+from django.db.models import Count, Exists, OuterRef, Q, Sum
 from django.utils import timezone
 from django.utils.translation import gettext
 from datetime import date, timedelta
 
+from . import metrics, profiling
+from .decorators import admin_required
 from employees.models import Employee
 from attendance.models import AttendanceLog, DailySummary
 from penalties.models import Penalty
@@ -21,78 +28,87 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         today = timezone.now().date()
 
-        # One query for today's summaries
-        summaries_list = list(
-            DailySummary.objects.filter(date=today).select_related("employee").order_by("employee__employee_id")
+        # Bugungi holatlar bitta aggregate bilan
+        today_qs = DailySummary.objects.filter(date=today)
+        counts = today_qs.aggregate(
+            present=Count("id", filter=Q(status=DailySummary.STATUS_PRESENT)),
+            late=Count("id", filter=Q(status=DailySummary.STATUS_LATE)),
         )
-        present_ids = [s.employee_id for s in summaries_list if s.status == DailySummary.STATUS_PRESENT]
-        late_ids = [s.employee_id for s in summaries_list if s.status == DailySummary.STATUS_LATE]
-        present_ids.extend(late_ids)
-        absent_ids = list(
-            Employee.objects.filter(is_active=True).exclude(id__in=present_ids).values_list("id", flat=True)
+        # Kelmaganlar: faol xodimlar minus bugun kelgan/kechikkan/ruxsatdagilar — absent qatorlari
+        # hali materialize qilinmagan bo'lsa ham (00:05 dan oldin yoki job ishlamagan kuni) to'g'ri
+        accounted = today_qs.filter(
+            employee=OuterRef("pk"),
+            status__in=[DailySummary.STATUS_PRESENT, DailySummary.STATUS_LATE, DailySummary.STATUS_LEAVE],
         )
+        absent_count = Employee.objects.filter(is_active=True).exclude(Exists(accounted)).count()
 
         context["today"] = today
-        context["present_count"] = sum(
-            1 for s in summaries_list if s.status == DailySummary.STATUS_PRESENT
-        )
-        context["late_count"] = len(late_ids)
-        context["absent_count"] = len(absent_ids)
-        pen_today = Penalty.objects.filter(penalty_date=today)
-        context["total_penalties_today"] = pen_today.aggregate(s=Sum("amount"))["s"] or 0
-        context["percent_penalties_today_count"] = pen_today.filter(penalty_percent__isnull=False).count()
-        context["summaries_today"] = summaries_list[:20]
-
-        # Chart: oxirgi 30 kun (1 oy) — har kuni kelganlar soni (present + late)
+        context["present_count"] = counts["present"]
+        context["late_count"] = counts["late"]
+        context["absent_count"] = absent_count
+        # Jarimalar: bugun / hafta / oy — bitta aggregate (oy boshi haftadan keyin bo'lishi mumkin, shuning uchun min)
+        week_ago = today - timedelta(days=6)
+        month_start = today.replace(day=1)
         month_ago = today - timedelta(days=29)
+        pen = Penalty.objects.filter(penalty_date__gte=min(week_ago, month_start), penalty_date__lte=today).aggregate(
+            today_sum=Sum("amount", filter=Q(penalty_date=today)),
+            today_percent=Count("id", filter=Q(penalty_date=today, penalty_percent__isnull=False)),
+            week_sum=Sum("amount", filter=Q(penalty_date__gte=week_ago)),
+            week_percent=Count("id", filter=Q(penalty_date__gte=week_ago, penalty_percent__isnull=False)),
+            month_sum=Sum("amount", filter=Q(penalty_date__gte=month_start)),
+            month_count=Count("id", filter=Q(penalty_date__gte=month_start)),
+            month_percent=Count("id", filter=Q(penalty_date__gte=month_start, penalty_percent__isnull=False)),
+        )
+        context["total_penalties_today"] = pen["today_sum"] or 0
+        context["percent_penalties_today_count"] = pen["today_percent"]
+        context["summaries_today"] = list(
+            today_qs.select_related("employee").order_by("employee__employee_id")[:20]
+        )
+
+        # Chart: oxirgi 30 kun (1 oy) — har kuni kelganlar soni (present + late), bitta GROUP BY
+        came = [DailySummary.STATUS_PRESENT, DailySummary.STATUS_LATE]
+        came_by_day = dict(
+            DailySummary.objects.filter(date__gte=month_ago, date__lte=today, status__in=came)
+            .values_list("date")
+            .annotate(c=Count("id"))
+            .order_by()
+        )
         chart_labels = []
         chart_data = []
         for i in range(30):
             d = month_ago + timedelta(days=i)
             chart_labels.append(d.strftime("%d.%m"))
-            cnt = DailySummary.objects.filter(
-                date=d,
-                status__in=[DailySummary.STATUS_PRESENT, DailySummary.STATUS_LATE],
-            ).count()
-            chart_data.append(cnt)
+            chart_data.append(came_by_day.get(d, 0))
         context["chart_labels_json"] = json.dumps(chart_labels)
         context["chart_data_json"] = json.dumps(chart_data)
         context["chart_dataset_label"] = gettext("Kelganlar")
 
         # Kechikkanlar (bugun)
-        context["late_today"] = [s for s in summaries_list if s.status == DailySummary.STATUS_LATE]
+        context["late_today"] = list(
+            today_qs.filter(status=DailySummary.STATUS_LATE).select_related("employee").order_by("employee__employee_id")
+        )
 
-        # Haftalik (oxirgi 7 kun)
-        week_ago = today - timedelta(days=6)
-        context["week_came_count"] = DailySummary.objects.filter(
-            date__gte=week_ago, date__lte=today,
-            status__in=[DailySummary.STATUS_PRESENT, DailySummary.STATUS_LATE],
-        ).count()
-        context["week_late_count"] = DailySummary.objects.filter(
-            date__gte=week_ago, date__lte=today, status=DailySummary.STATUS_LATE,
-        ).count()
-        w_pen = Penalty.objects.filter(penalty_date__gte=week_ago, penalty_date__lte=today)
-        context["week_penalties_sum"] = int(w_pen.aggregate(s=Sum("amount"))["s"] or 0)
-        context["week_percent_penalties_count"] = w_pen.filter(penalty_percent__isnull=False).count()
-
-        # Oylik (joriy oy)
-        month_start = today.replace(day=1)
-        context["month_came_count"] = DailySummary.objects.filter(
-            date__gte=month_start, date__lte=today,
-            status__in=[DailySummary.STATUS_PRESENT, DailySummary.STATUS_LATE],
-        ).count()
-        context["month_late_count"] = DailySummary.objects.filter(
-            date__gte=month_start, date__lte=today, status=DailySummary.STATUS_LATE,
-        ).count()
-        m_pen_qs = Penalty.objects.filter(penalty_date__gte=month_start, penalty_date__lte=today)
-        m_pen = m_pen_qs.aggregate(s=Sum("amount"), c=Count("id"))
-        context["month_penalties_sum"] = int(m_pen["s"] or 0)
-        context["month_penalties_count"] = m_pen["c"] or 0
-        context["month_percent_penalties_count"] = m_pen_qs.filter(penalty_percent__isnull=False).count()
+        # Haftalik (oxirgi 7 kun) va oylik (joriy oy)
+        period = DailySummary.objects.filter(date__gte=min(week_ago, month_start), date__lte=today).aggregate(
+            week_came=Count("id", filter=Q(date__gte=week_ago, status__in=came)),
+            week_late=Count("id", filter=Q(date__gte=week_ago, status=DailySummary.STATUS_LATE)),
+            month_came=Count("id", filter=Q(date__gte=month_start, status__in=came)),
+            month_late=Count("id", filter=Q(date__gte=month_start, status=DailySummary.STATUS_LATE)),
+        )
+        context["week_came_count"] = period["week_came"]
+        context["week_late_count"] = period["week_late"]
+        context["week_penalties_sum"] = int(pen["week_sum"] or 0)
+        context["week_percent_penalties_count"] = pen["week_percent"]
+        context["month_came_count"] = period["month_came"]
+        context["month_late_count"] = period["month_late"]
+        context["month_penalties_sum"] = int(pen["month_sum"] or 0)
+        context["month_penalties_count"] = pen["month_count"]
+        context["month_percent_penalties_count"] = pen["month_percent"]
 
         # Xodimlar
-        context["employees_active_count"] = Employee.objects.filter(is_active=True).count()
-        context["employees_total_count"] = Employee.objects.count()
+        emp_counts = Employee.objects.aggregate(total=Count("id"), active=Count("id", filter=Q(is_active=True)))
+        context["employees_active_count"] = emp_counts["active"]
+        context["employees_total_count"] = emp_counts["total"]
 
         return context
 
@@ -103,6 +119,32 @@ class SettingsRedirectView(LoginRequiredMixin, RedirectView):
     permanent = False
 
 
+@method_decorator(admin_required, name="dispatch")
+class ProfilingView(LoginRequiredMixin, TemplateView):
+    """View va tasklar bo'yicha p50/p95/p99 (keshdagi gistogrammadan, oxirgi PROFILING_WINDOWS oyna)."""
+    template_name = "core/profiling.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["profiling_enabled"] = profiling.is_enabled()
+        context["rows"] = profiling.summary()
+        context["window_minutes"] = settings.PROFILING_WINDOW_SECONDS * settings.PROFILING_WINDOWS // 60
+        context["slow_ms"] = settings.PROFILING_SLOW_MS
+        return context
+
+
+class MetricsView(View):
+    """Prometheus scrape endpointi. METRICS_TOKEN sozlangan bo'lsa Authorization: Bearer <token> majburiy."""
+
+    def get(self, request):
+        token = getattr(settings, "METRICS_TOKEN", "")
+        if token:
+            auth = request.META.get("HTTP_AUTHORIZATION", "")
+            if not constant_time_compare(auth, f"Bearer {token}"):
+                return HttpResponse("unauthorized\n", status=401, content_type="text/plain")
+        return HttpResponse(metrics.render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 class SupportView(LoginRequiredMixin, TemplateView):
     """Yordam: qo‘llanma va bog‘lanish."""
     template_name = "core/support.html"
@@ -5,3 +5,6 @@ class EmployeesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "employees"
     verbose_name = "Employees"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -1,5 +1,6 @@
 from django import forms
 from django.utils.translation import gettext_lazy as _
+from core.system_settings import get_system_settings
 from .models import Employee, WorkSchedule
 
 # 0=Dushanba, 1=Seshanba, ... 6=Yakshanba (Python weekday)
@@ -107,3 +108,12 @@ class EmployeeForm(forms.ModelForm):
             "device_person_id": forms.TextInput(attrs={"class": input_class}),
             "telegram_username": forms.TextInput(attrs={"class": input_class, "placeholder": _("username (@ siz)")}),
         }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.instance.pk:
+            # Yangi xodim: platforma sozlamalaridagi standart ish vaqti va muhlat
+            defaults = get_system_settings()
+            self.fields["work_start_time"].initial = defaults["default_work_start"]
+            self.fields["work_end_time"].initial = defaults["default_work_end"]
+            self.fields["grace_period_minutes"].initial = defaults["default_grace_period"]
@@ -92,13 +92,7 @@ class Employee(models.Model):
         Agar xodimda ish grafigi tayinlangan va bu kun grafikda ish kuni bo‘lsa — grafikdagi vaqtlar.
         Aks holda — xodimning o‘z vaqtlari; ish grafigi bo‘yicha bu kun ish kuni emas bo‘lsa is_working_day=False.
         """
-        if self.work_schedule and self.work_schedule.is_active:
-            s = self.work_schedule
-            is_working = s.is_working_day(day)
-            return (s.work_start_time, s.work_end_time, s.grace_period_minutes, is_working)
-        return (
-            self.work_start_time,
-            self.work_end_time,
-            self.grace_period_minutes,
-            True,
-        )
+        # Grafik process keshidan olinadi (employees.schedules) — work_schedule FK so'rovi va CSV parse yo'q
+        from .schedules import resolve_work_params
+
+        return resolve_work_params(self, day)
@@ -0,0 +1,170 @@
+"""
+Ish grafiklari keshi: har bir grafik bir marta kompilyatsiya qilinadi (hafta kunlari bitmask + vaqtlar)
+va process ichida saqlanadi. WorkSchedule saqlanganda/o'chirilganda kesh versiyasi oshiriladi;
+boshqa processlar versiyani SCHEDULE_CACHE_CHECK_SECONDS da bir marta tekshiradi. Kesh backendi process ichida
+bo'lsa (LocMemCache) versiya boshqa processlarga yetmaydi — unda grafiklar har SCHEDULE_CACHE_CHECK_SECONDS da
+versiyadan qat'i nazar qayta yuklanadi.
+Xodim ma'lumotlari keshlanmaydi: grafik tayinlovi (work_schedule_id) xodim qatorining o'zida keladi.
+"""
+import threading
+import time as _time
+from dataclasses import dataclass
+from datetime import date, time, timedelta
+
+from core.cache_versions import bump_version, get_version, is_process_local_cache
+
+VERSION_CACHE_KEY = "work_schedule_cache_version"
+SCHEDULE_CACHE_CHECK_SECONDS = 30
+ALL_WEEKDAYS_MASK = 0b1111111
+
+
+@dataclass(frozen=True)
+class CompiledSchedule:
+    pk: int
+    work_start_time: time
+    work_end_time: time
+    grace_period_minutes: int
+    weekday_mask: int
+
+    def is_working_day(self, day: date) -> bool:
+        return bool(self.weekday_mask & (1 << day.weekday()))
+
+
+def weekday_mask_from_string(working_days: str) -> int:
+    """'0,1,2,3,4' -> bitmask (bit 0 = Dushanba). Bo'sh satr — barcha kunlar (get_working_weekdays bilan bir xil)."""
+    if not working_days:
+        return ALL_WEEKDAYS_MASK
+    mask = 0
+    for part in working_days.split(","):
+        part = part.strip()
+        if part.isdigit():
+            mask |= 1 << int(part)
+    return mask
+
+
+def compile_schedule(schedule) -> CompiledSchedule:
+    return CompiledSchedule(
+        pk=schedule.pk,
+        work_start_time=schedule.work_start_time,
+        work_end_time=schedule.work_end_time,
+        grace_period_minutes=schedule.grace_period_minutes,
+        weekday_mask=weekday_mask_from_string(schedule.working_days),
+    )
+
+
+class _ScheduleCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._schedules = None  # pk -> CompiledSchedule, faol bo'lmagan grafik uchun None
+        self._version = None
+        self._checked_at = 0.0
+
+    def _shared_version(self):
+        return get_version(VERSION_CACHE_KEY)
+
+    def _load(self):
+        from .models import WorkSchedule
+
+        schedules = {}
+        for s in WorkSchedule.objects.only(
+            "pk", "work_start_time", "work_end_time", "grace_period_minutes", "working_days", "is_active"
+        ):
+            schedules[s.pk] = compile_schedule(s) if s.is_active else None
+        return schedules
+
+    def get_all(self, force_check=False):
+        now = _time.monotonic()
+        if self._schedules is not None and not force_check and now - self._checked_at < SCHEDULE_CACHE_CHECK_SECONDS:
+            return self._schedules
+        with self._lock:
+            version = self._shared_version()
+            if self._schedules is None or version != self._version or is_process_local_cache():
+                self._schedules = self._load()
+                self._version = version
+            self._checked_at = now
+            return self._schedules
+
+    def get(self, schedule_pk):
+        schedules = self.get_all()
+        if schedule_pk not in schedules:
+            # Boshqa processda yaratilgan yangi grafik — bir marta qayta yuklaymiz
+            schedules = self.get_all(force_check=True)
+            if schedule_pk not in schedules:
+                with self._lock:
+                    self._schedules = self._load()
+                    schedules = self._schedules
+        return schedules.get(schedule_pk)
+
+    def clear(self):
+        with self._lock:
+            self._schedules = None
+            self._version = None
+            self._checked_at = 0.0
+
+
+_cache = _ScheduleCache()
+
+
+def invalidate_schedule_cache():
+    """Lokal keshni tozalaydi va umumiy versiyani oshiradi (boshqa processlar ham qayta yuklaydi)."""
+    _cache.clear()
+    bump_version(VERSION_CACHE_KEY)
+
+
+def get_compiled_schedule(schedule_pk):
+    """Faol grafik uchun CompiledSchedule, aks holda None."""
+    if not schedule_pk:
+        return None
+    return _cache.get(schedule_pk)
+
+
+def resolve_work_params(employee, day: date):
+    """
+    Employee.get_work_params_for_date bilan bir xil natija, lekin work_schedule FK so'rovisiz:
+    (work_start_time, work_end_time, grace_period_minutes, is_working_day).
+    """
+    compiled = get_compiled_schedule(employee.work_schedule_id)
+    if compiled is not None:
+        return (
+            compiled.work_start_time,
+            compiled.work_end_time,
+            compiled.grace_period_minutes,
+            compiled.is_working_day(day),
+        )
+    return (employee.work_start_time, employee.work_end_time, employee.grace_period_minutes, True)
+
+
+def non_working_schedule_ids(day: date):
+    """Shu kun ish kuni bo'lmagan faol grafiklar pk lari (set-based SQL filtrlar uchun)."""
+    return sorted(
+        pk for pk, compiled in _cache.get_all().items() if compiled is not None and not compiled.is_working_day(day)
+    )
+
+
+def build_work_calendar(employees, start: date, end: date):
+    """
+    (xodim, sana oralig'i) ni oldindan hisoblangan kalendarga yoyadi — batch recompute va hisobotlar uchun.
+    Returns (days, calendar): days — [start..end] sanalar ro'yxati,
+    calendar — {employee_pk: [(work_start, work_end, grace, is_working_day), ...]} (days bilan bir xil tartibda).
+    """
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    schedules = _cache.get_all()
+    calendar = {}
+    for employee in employees:
+        compiled = schedules.get(employee.work_schedule_id) if employee.work_schedule_id else None
+        if compiled is None and employee.work_schedule_id and employee.work_schedule_id not in schedules:
+            compiled = get_compiled_schedule(employee.work_schedule_id)
+        if compiled is None:
+            own = (employee.work_start_time, employee.work_end_time, employee.grace_period_minutes, True)
+            calendar[employee.pk] = [own] * len(days)
+        else:
+            calendar[employee.pk] = [
+                (
+                    compiled.work_start_time,
+                    compiled.work_end_time,
+                    compiled.grace_period_minutes,
+                    bool(compiled.weekday_mask & (1 << d.weekday())),
+                )
+                for d in days
+            ]
+    return days, calendar
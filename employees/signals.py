@@ -0,0 +1,14 @@
+"""Signal handlers: ish grafigi keshini yangilash."""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import WorkSchedule
+from .schedules import invalidate_schedule_cache
+
+
+@receiver(post_save, sender=WorkSchedule, dispatch_uid="employees_schedule_cache_save")
+@receiver(post_delete, sender=WorkSchedule, dispatch_uid="employees_schedule_cache_delete")
+def invalidate_schedule_cache_on_change(sender, **kwargs):
+    # Commitdan keyin: boshqa processlar eski qiymatni qayta keshlab qolmasligi uchun
+    transaction.on_commit(invalidate_schedule_cache)
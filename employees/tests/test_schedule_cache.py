@@ -0,0 +1,92 @@
+"""Compiled work schedule cache tests."""
+from datetime import date, time
+from unittest import mock
+
+from django.test import TestCase
+
+from employees.models import Employee, WorkSchedule
+from employees.schedules import (
+    SCHEDULE_CACHE_CHECK_SECONDS,
+    _ScheduleCache,
+    build_work_calendar,
+    invalidate_schedule_cache,
+    weekday_mask_from_string,
+)
+
+
+class ScheduleCacheTests(TestCase):
+    def setUp(self):
+        invalidate_schedule_cache()
+        self.sched = WorkSchedule.objects.create(
+            name="Du-Ju",
+            work_start_time=time(8, 0),
+            work_end_time=time(17, 0),
+            grace_period_minutes=10,
+            working_days="0,1,2,3,4",
+        )
+        self.emp = Employee.objects.create(
+            employee_id="S001",
+            first_name="A",
+            last_name="B",
+            work_start_time=time(9, 0),
+            work_end_time=time(18, 0),
+            grace_period_minutes=5,
+            work_schedule=self.sched,
+        )
+
+    def test_weekday_mask_matches_working_weekdays(self):
+        for value in ("0,1,2,3,4", "5,6", "", "1, 3,x"):
+            ws = WorkSchedule(working_days=value)
+            mask = weekday_mask_from_string(value)
+            self.assertEqual({d for d in range(7) if mask & (1 << d)}, ws.get_working_weekdays())
+
+    def test_warm_cache_resolves_without_queries(self):
+        emp = Employee.objects.get(pk=self.emp.pk)
+        emp.get_work_params_for_date(date(2026, 6, 1))
+        with self.assertNumQueries(0):
+            params = emp.get_work_params_for_date(date(2026, 6, 6))  # Shanba
+        self.assertEqual(params, (time(8, 0), time(17, 0), 10, False))
+
+    def test_schedule_save_invalidates(self):
+        self.emp.get_work_params_for_date(date(2026, 6, 1))
+        self.sched.grace_period_minutes = 15
+        self.sched.is_active = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sched.save()
+        self.assertEqual(self.emp.get_work_params_for_date(date(2026, 6, 1))[2], 15)
+        self.sched.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sched.save()
+        self.assertEqual(self.emp.get_work_params_for_date(date(2026, 6, 6)), (time(9, 0), time(18, 0), 5, True))
+
+    def test_other_process_reloads_after_ttl_without_shared_cache(self):
+        other = _ScheduleCache()  # boshqa process (gunicorn/Celery worker) keshi
+        self.assertEqual(other.get(self.sched.pk).grace_period_minutes, 10)
+        # Boshqa processdagi tahrir: LocMemCache da versiya bu processga yetib kelmaydi
+        WorkSchedule.objects.filter(pk=self.sched.pk).update(grace_period_minutes=20)
+        later = other._checked_at + SCHEDULE_CACHE_CHECK_SECONDS + 1
+        with mock.patch("employees.schedules._time.monotonic", return_value=later):
+            self.assertEqual(other.get(self.sched.pk).grace_period_minutes, 20)
+
+        # Umumiy (Redis) keshda esa versiya o'zgarmaguncha qayta yuklanmaydi
+        WorkSchedule.objects.filter(pk=self.sched.pk).update(grace_period_minutes=25)
+        later += SCHEDULE_CACHE_CHECK_SECONDS + 1
+        with (
+            mock.patch("employees.schedules.is_process_local_cache", return_value=False),
+            mock.patch("employees.schedules._time.monotonic", return_value=later),
+        ):
+            self.assertEqual(other.get(self.sched.pk).grace_period_minutes, 20)
+
+    def test_build_work_calendar(self):
+        own = Employee.objects.create(
+            employee_id="S002",
+            first_name="C",
+            last_name="D",
+            work_start_time=time(9, 30),
+            work_end_time=time(18, 0),
+            grace_period_minutes=0,
+        )
+        days, calendar = build_work_calendar([self.emp, own], date(2026, 6, 5), date(2026, 6, 8))
+        self.assertEqual(len(days), 4)
+        self.assertEqual([c[3] for c in calendar[self.emp.pk]], [True, False, False, True])
+        self.assertEqual(calendar[own.pk][1], (time(9, 30), time(18, 0), 0, True))
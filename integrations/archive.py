@@ -0,0 +1,223 @@
+"""
+RawDeviceEvent retention: eski qayta ishlangan eventlarni gzip JSONL arxivga ko'chirish.
+
+Arxiv tuzilishi (sana = received_at ning mahalliy sanasi):
+  <RAW_EVENT_ARCHIVE_DIR>/YYYY/MM/YYYY-MM-DD.NNNNNN.jsonl.gz — har batch uchun alohida segment, qatorda bitta event
+  <RAW_EVENT_ARCHIVE_DIR>/YYYY/MM/YYYY-MM-DD.index.json      — trace_id / external_event_id -> [segment, qator]
+
+Segment vaqtinchalik fayl + rename bilan to'liq yoziladi. Indeks yozilishidan oldin to'xtab qolinsa, indeksda
+yo'q segmentlar keyingi o'qishda qayta indekslanadi; allaqachon arxivdagi trace_id lar qayta yozilmaydi
+(DELETE dan oldin to'xtagan batch keyingi safar takrorlanmaydi).
+"""
+import gzip
+import json
+import logging
+import os
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.conf import settings as django_settings
+from django.utils import timezone
+
+from .models import RawDeviceEvent
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FIELDS = [
+    "id",
+    "trace_id",
+    "device_ip",
+    "external_event_id",
+    "payload_json",
+    "event_time_device",
+    "received_at",
+    "processed_at",
+    "status",
+    "retry_count",
+    "error_code",
+    "error_message",
+]
+
+
+def get_archive_root() -> Path:
+    return Path(getattr(django_settings, "RAW_EVENT_ARCHIVE_DIR", Path(django_settings.BASE_DIR) / "archive" / "raw_events"))
+
+
+INDEX_VERSION = 2
+
+
+def _partition_paths(root: Path, day: date):
+    folder = root / f"{day.year:04d}" / f"{day.month:02d}"
+    return folder, folder / f"{day.isoformat()}.index.json"
+
+
+def _segment_names(folder: Path, day: date):
+    """Diskdagi segmentlar; eski formatdagi bitta YYYY-MM-DD.jsonl.gz fayl ham segment sifatida."""
+    names = sorted(p.name for p in folder.glob(f"{day.isoformat()}.*.jsonl.gz"))
+    legacy = f"{day.isoformat()}.jsonl.gz"
+    if (folder / legacy).exists():
+        names.insert(0, legacy)
+    return names
+
+
+def _serialize(row: dict) -> dict:
+    out = {}
+    for key in ARCHIVE_FIELDS:
+        value = row.get(key)
+        if hasattr(value, "isoformat"):
+            value = value.isoformat()
+        elif key == "trace_id" and value is not None:
+            value = str(value)
+        out[key] = value
+    return out
+
+
+def _add_to_index(index: dict, segment: str, line_no: int, record: dict):
+    index["trace_id"][record["trace_id"]] = [segment, line_no]
+    if record["external_event_id"]:
+        index["external_event_id"].setdefault(record["external_event_id"], []).append([segment, line_no])
+
+
+def _load_index(folder: Path, day: date) -> dict:
+    """
+    Partitsiya indeksi. Indeksda yo'q segmentlar (indeks yozilishidan oldin to'xtab qolgan batch) o'qilib
+    qo'shiladi — qator raqamlari har doim segment faylning o'zidan olinadi.
+    """
+    index_path = folder / f"{day.isoformat()}.index.json"
+    index = {"version": INDEX_VERSION, "segments": [], "trace_id": {}, "external_event_id": {}}
+    if index_path.exists():
+        with open(index_path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored.get("version") == INDEX_VERSION:
+            index = stored
+        # Eski format (bitta fayl, {trace_id: qator}) — qayta indekslanadi
+    for segment in _segment_names(folder, day):
+        if segment in index["segments"]:
+            continue
+        with gzip.open(folder / segment, "rb") as f:
+            for line_no, line in enumerate(f):
+                _add_to_index(index, segment, line_no, json.loads(line))
+        index["segments"].append(segment)
+    return index
+
+
+def _write_partition(root: Path, day: date, rows: list) -> int:
+    """
+    Batchni partitsiyaga yangi segment sifatida yozadi (tmp + rename), keyin indeksni atomik yangilaydi.
+    Arxivda allaqachon bor trace_id lar o'tkazib yuboriladi. Returns yozilgan qatorlar soni.
+    """
+    folder, index_path = _partition_paths(root, day)
+    folder.mkdir(parents=True, exist_ok=True)
+    for stale in folder.glob(f"{day.isoformat()}.*.tmp"):
+        stale.unlink(missing_ok=True)
+    index = _load_index(folder, day)
+    records, seen = [], set()
+    for row in rows:
+        record = _serialize(row)
+        if record["trace_id"] in index["trace_id"] or record["trace_id"] in seen:
+            continue
+        seen.add(record["trace_id"])
+        records.append(record)
+    if records:
+        numbered = [name for name in index["segments"] if name != f"{day.isoformat()}.jsonl.gz"]
+        sequence = int(numbered[-1].split(".")[1]) + 1 if numbered else 1
+        segment = f"{day.isoformat()}.{sequence:06d}.jsonl.gz"
+        tmp_segment = folder / f"{segment}.tmp"
+        with gzip.open(tmp_segment, "wb") as f:
+            for line_no, record in enumerate(records):
+                f.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+                _add_to_index(index, segment, line_no, record)
+        os.replace(tmp_segment, folder / segment)
+        index["segments"].append(segment)
+    tmp_path = index_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+    return len(records)
+
+
+def archive_processed_events(older_than_days=None, batch_size=None, dry_run=False, root=None):
+    """
+    received_at bo'yicha older_than_days kundan eski "processed" eventlarni arxivga yozib, bazadan o'chiradi.
+    Har bir batch avval diskka yoziladi, keyin bitta DELETE bilan o'chiriladi.
+    Returns {"archived": n, "partitions": [...]}.
+    """
+    if older_than_days is None:
+        older_than_days = getattr(django_settings, "RAW_EVENT_RETENTION_DAYS", 90)
+    if batch_size is None:
+        batch_size = getattr(django_settings, "RAW_EVENT_ARCHIVE_BATCH_SIZE", 5000)
+    root = Path(root) if root else get_archive_root()
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+
+    base = RawDeviceEvent.objects.filter(
+        status=RawDeviceEvent.STATUS_PROCESSED,
+        received_at__lt=cutoff,
+    )
+    if dry_run:
+        return {"archived": 0, "would_archive": base.count(), "partitions": []}
+
+    archived = 0
+    partitions = set()
+    last_pk = 0
+    while True:
+        rows = list(base.filter(pk__gt=last_pk).order_by("pk").values(*ARCHIVE_FIELDS)[:batch_size])
+        if not rows:
+            break
+        by_day = {}
+        for row in rows:
+            day = timezone.localtime(row["received_at"]).date()
+            by_day.setdefault(day, []).append(row)
+        for day, day_rows in by_day.items():
+            # Oldingi to'xtagan ishda arxivlangan (lekin o'chirilmagan) qatorlar qayta yozilmaydi
+            _write_partition(root, day, day_rows)
+            partitions.add(day.isoformat())
+        pks = [row["id"] for row in rows]
+        RawDeviceEvent.objects.filter(pk__in=pks).delete()
+        archived += len(rows)
+        last_pk = pks[-1]
+
+    if archived:
+        logger.info("archive_processed_events: archived=%s partitions=%s", archived, len(partitions))
+    return {"archived": archived, "partitions": sorted(partitions)}
+
+
+def _read_line(data_path: Path, line_no: int):
+    with gzip.open(data_path, "rb") as f:
+        for i, line in enumerate(f):
+            if i == line_no:
+                return json.loads(line)
+    return None
+
+
+def find_archived_event(trace_id=None, external_event_id=None, day=None, root=None):
+    """
+    Arxivdan eventni trace_id yoki external_event_id bo'yicha topadi (audit uchun).
+    day berilsa faqat shu partitsiya, aks holda eng yangisidan boshlab indekslar ko'riladi.
+    Topilmasa None.
+    """
+    if not trace_id and not external_event_id:
+        return None
+    root = Path(root) if root else get_archive_root()
+    if day is not None:
+        days = [day]
+    else:
+        # Indeksi hali yozilmagan (faqat segmenti bor) partitsiyalar ham ko'riladi
+        names = {p.name.split(".")[0] for p in root.glob("*/*/*.jsonl.gz")}
+        names |= {p.name.split(".")[0] for p in root.glob("*/*/*.index.json")}
+        days = sorted((date.fromisoformat(name) for name in names), reverse=True)
+    for partition_day in days:
+        folder = _partition_paths(root, partition_day)[0]
+        if not folder.exists():
+            continue
+        index = _load_index(folder, partition_day)
+        entry = None
+        if trace_id:
+            entry = index["trace_id"].get(str(trace_id))
+        if entry is None and external_event_id:
+            entries = index["external_event_id"].get(str(external_event_id)) or []
+            entry = entries[-1] if entries else None
+        if entry is None:
+            continue
+        segment, line_no = entry
+        return _read_line(folder / segment, line_no)
+    return None
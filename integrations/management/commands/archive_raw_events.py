@@ -0,0 +1,46 @@
+"""
+Eski qayta ishlangan RawDeviceEvent larni gzip JSONL arxivga ko'chirish va arxivdan qidirish.
+
+Ishlatish:
+  python manage.py archive_raw_events
+  python manage.py archive_raw_events --days 30 --batch-size 2000
+  python manage.py archive_raw_events --dry-run
+  python manage.py archive_raw_events --find <trace_id yoki external_event_id>
+"""
+import json
+
+from django.core.management.base import BaseCommand
+
+from integrations.archive import archive_processed_events, find_archived_event
+
+
+class Command(BaseCommand):
+    help = "Eski processed raw eventlarni arxivga ko'chiradi yoki arxivdan eventni topadi."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="Necha kundan eski (default: RAW_EVENT_RETENTION_DAYS)")
+        parser.add_argument("--batch-size", type=int, default=None, help="Bir batchda nechta event")
+        parser.add_argument("--dry-run", action="store_true", help="Faqat sanash, hech narsa yozmaslik")
+        parser.add_argument("--find", default="", help="trace_id yoki external_event_id bo'yicha arxivdan qidirish")
+
+    def handle(self, *args, **options):
+        if options["find"]:
+            key = options["find"].strip()
+            record = find_archived_event(trace_id=key) or find_archived_event(external_event_id=key)
+            if not record:
+                self.stderr.write(self.style.WARNING("Arxivda topilmadi."))
+                return
+            self.stdout.write(json.dumps(record, ensure_ascii=False, indent=2))
+            return
+
+        result = archive_processed_events(
+            older_than_days=options["days"],
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+        )
+        if options["dry_run"]:
+            self.stdout.write(f"Arxivlanadi (dry-run): {result['would_archive']}")
+            return
+        self.stdout.write(
+            self.style.SUCCESS(f"Arxivlandi: {result['archived']} event, {len(result['partitions'])} partitsiya.")
+        )
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integrations', '0004_deviceimportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rawdeviceevent',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='rawdeviceevent',
+            name='status',
+            field=models.CharField(choices=[('received', 'Received'), ('processed', 'Processed'), ('unmatched', 'Unmatched'), ('failed', 'Failed'), ('poison', 'Poison')], db_index=True, default='received', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='rawdeviceevent',
+            index=models.Index(fields=['status', 'received_at'], name='rawevent_status_received_idx'),
+        ),
+    ]
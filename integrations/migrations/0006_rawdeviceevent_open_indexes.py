@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integrations', '0005_rawdeviceevent_sweeper'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='rawdeviceevent',
+            name='status',
+            field=models.CharField(choices=[('received', 'Received'), ('processed', 'Processed'), ('unmatched', 'Unmatched'), ('failed', 'Failed'), ('poison', 'Poison')], default='received', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='rawdeviceevent',
+            index=models.Index(fields=['received_at'], name='rawevent_received_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rawdeviceevent',
+            index=models.Index(condition=models.Q(('status__in', ['unmatched', 'failed', 'poison'])), fields=['-received_at'], name='rawevent_open_received_idx'),
+        ),
+    ]
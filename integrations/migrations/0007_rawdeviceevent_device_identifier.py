@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:10
+
+from django.db import migrations, models
+
+
+def backfill_device_identifier(apps, schema_editor):
+    """Faqat hali qayta ishlanmagan/ochiq eventlar uchun (processed eventlarga kerak emas)."""
+    RawDeviceEvent = apps.get_model("integrations", "RawDeviceEvent")
+    qs = RawDeviceEvent.objects.exclude(status="processed").only("pk", "payload_json")
+    batch = []
+    for e in qs.iterator(chunk_size=2000):
+        payload = e.payload_json if isinstance(e.payload_json, dict) else {}
+        value = payload.get("employee_id") or payload.get("person_id") or payload.get("card_no") or ""
+        e.device_identifier = str(value).strip()[:100]
+        batch.append(e)
+        if len(batch) >= 2000:
+            RawDeviceEvent.objects.bulk_update(batch, ["device_identifier"])
+            batch = []
+    if batch:
+        RawDeviceEvent.objects.bulk_update(batch, ["device_identifier"])
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integrations', '0006_rawdeviceevent_open_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rawdeviceevent',
+            name='device_identifier',
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.RunPython(backfill_device_identifier, noop),
+    ]
@@ -1,6 +1,7 @@
 """Integration settings and device ingestion models."""
 import uuid
 from django.db import models
+from django.db.models import Q
 
 
 class IntegrationSettings(models.Model):
@@ -28,6 +29,17 @@ class IntegrationSettings(models.Model):
         return obj
 
 
+def device_identifier_from_payload(payload) -> str:
+    """
+    Payload dan xodim identifikatorini normallashtirilgan ko'rinishda oladi
+    (process_device_event bilan bir xil tartib: employee_id, person_id, card_no).
+    """
+    if not isinstance(payload, dict):
+        return ""
+    value = payload.get("employee_id") or payload.get("person_id") or payload.get("card_no") or ""
+    return str(value).strip()[:100]
+
+
 class RawDeviceEvent(models.Model):
     """Durable raw ingress event from webhook/device."""
 
@@ -35,34 +47,61 @@ class RawDeviceEvent(models.Model):
     STATUS_PROCESSED = "processed"
     STATUS_UNMATCHED = "unmatched"
     STATUS_FAILED = "failed"
+    # Sweeper N marta urinib ko'rgan, lekin qayta ishlanmagan event (qo'lda Replay kerak)
+    STATUS_POISON = "poison"
 
     STATUS_CHOICES = [
         (STATUS_RECEIVED, "Received"),
         (STATUS_PROCESSED, "Processed"),
         (STATUS_UNMATCHED, "Unmatched"),
         (STATUS_FAILED, "Failed"),
+        (STATUS_POISON, "Poison"),
     ]
+    # Admin e'tiborini talab qiladigan holatlar (unmatched sahifasi, health panel)
+    OPEN_STATUSES = [STATUS_UNMATCHED, STATUS_FAILED, STATUS_POISON]
 
     trace_id = models.UUIDField(default=uuid.uuid4, db_index=True, editable=False)
     device_ip = models.CharField(max_length=64, blank=True)
     external_event_id = models.CharField(max_length=255, blank=True, db_index=True)
     payload_json = models.JSONField(default=dict)
+    # payload dagi xodim identifikatori (normallashtirilgan) — unmatched eventlarni guruhlash va qayta moslash uchun
+    device_identifier = models.CharField(max_length=100, blank=True, db_index=True)
     event_time_device = models.DateTimeField(null=True, blank=True)
     received_at = models.DateTimeField(auto_now_add=True)
     processed_at = models.DateTimeField(null=True, blank=True)
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_RECEIVED, db_index=True)
+    # Alohida status indeksi yo'q: (status, received_at) kompozit indeksi uni qoplaydi
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_RECEIVED)
     retry_count = models.PositiveIntegerField(default=0)
+    # Sweeper keyingi urinishni shu vaqtdan oldin qilmaydi (exponential backoff)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
     error_code = models.CharField(max_length=64, blank=True)
     error_message = models.TextField(blank=True)
 
     class Meta:
         ordering = ["-received_at"]
+        indexes = [
+            models.Index(fields=["status", "received_at"], name="rawevent_status_received_idx"),
+            models.Index(fields=["received_at"], name="rawevent_received_idx"),
+            # Partial: faqat ochiq holatdagi (kichik) qism — unmatched sahifasi va health sanoqlari
+            models.Index(
+                fields=["-received_at"],
+                name="rawevent_open_received_idx",
+                condition=Q(status__in=["unmatched", "failed", "poison"]),
+            ),
+        ]
         verbose_name = "Raw Device Event"
         verbose_name_plural = "Raw Device Events"
 
     def __str__(self):
         return f"{self.trace_id} {self.status}"
 
+    def save(self, *args, **kwargs):
+        self.device_identifier = device_identifier_from_payload(self.payload_json)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "payload_json" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"device_identifier"}
+        super().save(*args, **kwargs)
+
 
 class DeviceImportJob(models.Model):
     """Track historical import job from device API."""
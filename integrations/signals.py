@@ -0,0 +1,38 @@
+"""Signal handlers: xodim saqlanganda unmatched eventlarni qayta moslash."""
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from employees.models import Employee
+
+from .models import RawDeviceEvent
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Employee, dispatch_uid="integrations_rematch_unmatched_events")
+def enqueue_rematch_on_employee_save(sender, instance, raw=False, **kwargs):
+    """Faqat mos unmatched eventlar bo'lsa task navbatga qo'yiladi (indekslangan exists so'rovi)."""
+    if raw or not instance.is_active:
+        return
+    from .tasks import rematch_unmatched_events, unmatched_identifiers_for_employee
+
+    identifiers = unmatched_identifiers_for_employee(instance)
+    if not identifiers:
+        return
+    if not RawDeviceEvent.objects.filter(
+        status=RawDeviceEvent.STATUS_UNMATCHED,
+        device_identifier__in=identifiers,
+    ).exists():
+        return
+
+    def _enqueue():
+        try:
+            rematch_unmatched_events.delay(instance.pk)
+        except Exception as exc:
+            # Broker ishlamasa ham xodimni saqlash buzilmasin
+            logger.warning("rematch_unmatched_events enqueue failed employee=%s: %s", instance.pk, exc)
+
+    transaction.on_commit(_enqueue)
@@ -3,24 +3,24 @@ Celery tasks: process device webhook event (save log, recompute summary).
 Jarima kun oxirida run_daily_summary_and_penalties taskida (masalan 20:00) qo'llanadi.
 """
 import logging
+import random
 from celery import shared_task
+from django.conf import settings as django_settings
+from django.db.models import Q
 from django.utils import timezone
 from datetime import date, timedelta
 
 from attendance.services import create_log_idempotent, recompute_daily_summary
+from core import metrics
+from employees.models import Employee
 from .hikvision_client import HikvisionClient
-from .models import RawDeviceEvent, DeviceImportJob, IntegrationSettings
+from .models import RawDeviceEvent, DeviceImportJob, IntegrationSettings, device_identifier_from_payload
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task(bind=True, max_retries=3)
-def process_device_event(self, payload: dict):
-    """
-    Idempotent processing of one device event.
-    Log yoziladi, kunlik xulosa qayta hisoblanadi (birinchi kelish / oxirgi ketish).
-    Jarima va Telegram xabarlari kun oxirida run_daily_summary_and_penalties da bajariladi.
-    """
+def _log_from_payload(payload: dict):
+    """Payload dan AttendanceLog yaratadi (idempotent). Returns (log, created); xodim topilmasa (None, False)."""
     employee_id = payload.get("employee_id") or payload.get("person_id") or payload.get("card_no")
     event_type = payload.get("event_type", "").lower().replace(" ", "_")
     if event_type not in ("check_in", "check_out"):
@@ -40,12 +40,28 @@ def process_device_event(self, payload: dict):
             "process_device_event: employee_not_found employee_id=%s",
             repr(employee_id),
         )
+    return log, created
+
+
+def _log_day(log):
+    return log.timestamp.date() if hasattr(log.timestamp, "date") else date.fromisoformat(str(log.timestamp)[:10])
+
+
+@shared_task(bind=True, max_retries=3)
+def process_device_event(self, payload: dict):
+    """
+    Idempotent processing of one device event.
+    Log yoziladi, kunlik xulosa qayta hisoblanadi (birinchi kelish / oxirgi ketish).
+    Jarima va Telegram xabarlari kun oxirida run_daily_summary_and_penalties da bajariladi.
+    """
+    log, created = _log_from_payload(payload)
+    if not log:
         return {"ok": False, "reason": "employee_not_found"}
 
-    day = log.timestamp.date() if hasattr(log.timestamp, "date") else date.fromisoformat(str(log.timestamp)[:10])
+    day = _log_day(log)
     recompute_daily_summary(log.employee, day)
 
-    return {"ok": True, "created": created, "log_id": log.pk}
+    return {"ok": True, "created": created, "log_id": log.pk, "day": day}
 
 
 @shared_task(bind=True, max_retries=3)
@@ -59,7 +75,12 @@ def process_raw_device_event(self, raw_event_id: int):
         return {"ok": False, "reason": "raw_event_not_found"}
 
     payload = raw_event.payload_json or {}
-    result = process_device_event(payload)
+    try:
+        result = process_device_event(payload)
+    except Exception as exc:
+        # Xato eventni "received" da qoldirmaymiz — sweeper backoff bilan qayta urinadi
+        logger.exception("process_raw_device_event raw_event=%s: %s", raw_event.pk, exc)
+        result = {"ok": False, "reason": "processing_exception", "error": str(exc)}
 
     raw_event.retry_count = max(raw_event.retry_count, self.request.retries)
     raw_event.processed_at = timezone.now()
@@ -75,6 +96,9 @@ def process_raw_device_event(self, raw_event_id: int):
         raw_event.status = RawDeviceEvent.STATUS_FAILED
         raw_event.error_code = result.get("reason", "processing_failed")
         raw_event.error_message = str(result)
+        raw_event.next_attempt_at = timezone.now() + timedelta(
+            seconds=_retry_backoff_seconds(raw_event.retry_count)
+        )
     raw_event.save(
         update_fields=[
             "retry_count",
@@ -82,11 +106,201 @@ def process_raw_device_event(self, raw_event_id: int):
             "status",
             "error_code",
             "error_message",
+            "next_attempt_at",
         ]
     )
+    metrics.RAW_EVENT_PROCESSING_SECONDS.observe((raw_event.processed_at - raw_event.received_at).total_seconds())
+    # Kechikib qayta ishlangan (sweeper, qo'lda replay) eski kunlar reconciliation snapshotlari eskiradi
+    days = {timezone.localtime(raw_event.received_at).date(), result.get("day")}
+    if min(day for day in days if day) < timezone.localdate():
+        from reports.reconciliation import invalidate_snapshots
+
+        invalidate_snapshots(days)
     return {"ok": True, "raw_event_id": raw_event.pk, "status": raw_event.status}
 
 
+def assign_employee_to_event(raw_event, employee_id):
+    """Payload dagi employee_id ni almashtiradi va device_identifier ni yangilaydi (saqlamaydi)."""
+    payload = dict(raw_event.payload_json or {})
+    payload["employee_id"] = employee_id
+    raw_event.payload_json = payload
+    raw_event.device_identifier = device_identifier_from_payload(payload)
+
+
+def _replay_raw_events(raw_events, employee_id=None):
+    """
+    Bir nechta raw eventni bitta batch sifatida qayta ishlaydi: loglar yoziladi, statuslar bulk_update bilan
+    saqlanadi, kunlik xulosa esa har bir (xodim, kun) uchun oxirida bir marta qayta hisoblanadi.
+    employee_id berilsa, har bir payload dagi employee_id shu qiymatga almashtiriladi (guruhni tayinlash).
+    """
+    now = timezone.now()
+    affected = {}
+    counts = {"processed": 0, "unmatched": 0, "failed": 0}
+    update_fields = ["status", "processed_at", "next_attempt_at", "error_code", "error_message"]
+    if employee_id:
+        update_fields += ["payload_json", "device_identifier"]
+    for raw_event in raw_events:
+        if employee_id:
+            assign_employee_to_event(raw_event, employee_id)
+        raw_event.processed_at = now
+        raw_event.next_attempt_at = None
+        try:
+            log, _created = _log_from_payload(raw_event.payload_json or {})
+        except Exception as exc:
+            logger.exception("replay raw_event=%s: %s", raw_event.pk, exc)
+            raw_event.status = RawDeviceEvent.STATUS_FAILED
+            raw_event.error_code = "processing_exception"
+            raw_event.error_message = str(exc)
+            counts["failed"] += 1
+            continue
+        if not log:
+            raw_event.status = RawDeviceEvent.STATUS_UNMATCHED
+            raw_event.error_code = "employee_not_found"
+            raw_event.error_message = "Employee mapping not found for incoming event."
+            counts["unmatched"] += 1
+            continue
+        raw_event.status = RawDeviceEvent.STATUS_PROCESSED
+        raw_event.error_code = ""
+        raw_event.error_message = ""
+        affected[(log.employee_id, _log_day(log))] = log.employee
+        counts["processed"] += 1
+
+    RawDeviceEvent.objects.bulk_update(raw_events, update_fields, batch_size=500)
+    for (_employee_pk, day), employee in affected.items():
+        try:
+            recompute_daily_summary(employee, day)
+        except Exception as exc:
+            logger.exception("replay recompute employee=%s day=%s: %s", employee.pk, day, exc)
+    from reports.reconciliation import invalidate_snapshots
+
+    invalidate_snapshots({timezone.localtime(e.received_at).date() for e in raw_events} | {day for _pk, day in affected})
+    counts["employee_days"] = len(affected)
+    return counts
+
+
+@shared_task(bind=True)
+def replay_raw_events_batch(self, raw_event_ids, employee_id=None):
+    """
+    Berilgan raw eventlarni bitta batch sifatida qayta ishlash (bitta task, bitta recompute har kun uchun).
+    employee_id berilsa — barcha eventlar shu xodimga tayinlanadi.
+    """
+    raw_events = list(RawDeviceEvent.objects.filter(pk__in=raw_event_ids).order_by("pk"))
+    counts = _replay_raw_events(raw_events, employee_id=employee_id)
+    return {"ok": True, "events": len(raw_events), **counts}
+
+
+@shared_task(bind=True)
+def rematch_unmatched_events(self, employee_pk: int):
+    """
+    Xodim qo'shilgan/tahrirlangandan keyin: uning employee_id / device_person_id siga mos keladigan
+    barcha unmatched raw eventlarni bitta batch qilib qayta ishlaydi.
+    """
+    employee = Employee.objects.filter(pk=employee_pk, is_active=True).first()
+    if not employee:
+        return {"ok": False, "reason": "employee_not_found"}
+    identifiers = unmatched_identifiers_for_employee(employee)
+    if not identifiers:
+        return {"ok": True, "events": 0}
+    raw_events = list(
+        RawDeviceEvent.objects.filter(
+            status=RawDeviceEvent.STATUS_UNMATCHED,
+            device_identifier__in=identifiers,
+        ).order_by("pk")
+    )
+    if not raw_events:
+        return {"ok": True, "events": 0}
+    counts = _replay_raw_events(raw_events)
+    logger.info(
+        "rematch_unmatched_events employee=%s events=%s processed=%s",
+        employee.pk,
+        len(raw_events),
+        counts["processed"],
+    )
+    return {"ok": True, "events": len(raw_events), **counts}
+
+
+def unmatched_identifiers_for_employee(employee):
+    """Xodimni qurilmada aniqlashi mumkin bo'lgan normallashtirilgan identifikatorlar."""
+    return [
+        v
+        for v in {str(employee.employee_id or "").strip(), str(employee.device_person_id or "").strip()}
+        if v
+    ]
+
+
+def _retry_backoff_seconds(retry_count: int) -> int:
+    """Exponential backoff with jitter: base * 2**retry_count, max bilan cheklangan, 50–100% oralig'ida."""
+    base = getattr(django_settings, "RAW_EVENT_RETRY_BASE_SECONDS", 60)
+    cap = getattr(django_settings, "RAW_EVENT_RETRY_MAX_SECONDS", 6 * 60 * 60)
+    delay = min(cap, base * (2 ** min(retry_count, 20)))
+    return int(delay * random.uniform(0.5, 1.0))
+
+
+@shared_task(bind=True)
+def sweep_stuck_raw_events(self, batch_size=None):
+    """
+    Yo'qolgan ("received" da qotib qolgan) va "failed" raw eventlarni qayta navbatga qo'yadi.
+    Har bir urinishda retry_count oshadi va keyingi urinish exponential backoff bilan kechiktiriladi;
+    RAW_EVENT_MAX_ATTEMPTS dan keyin event "poison" bo'ladi va faqat qo'lda Replay qilinadi.
+    """
+    now = timezone.now()
+    batch_size = batch_size or getattr(django_settings, "RAW_EVENT_SWEEP_BATCH_SIZE", 500)
+    stale_before = now - timedelta(minutes=getattr(django_settings, "RAW_EVENT_STALE_MINUTES", 10))
+    max_attempts = getattr(django_settings, "RAW_EVENT_MAX_ATTEMPTS", 5)
+
+    due = Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now)
+    # (status, received_at) indeksi bo'yicha: eng eski eventlar birinchi
+    events = list(
+        RawDeviceEvent.objects.filter(
+            (Q(status=RawDeviceEvent.STATUS_RECEIVED) & Q(received_at__lt=stale_before))
+            | Q(status=RawDeviceEvent.STATUS_FAILED),
+        )
+        .filter(due)
+        .order_by("received_at")
+        .only("pk", "status", "retry_count", "error_code", "error_message", "next_attempt_at")[:batch_size]
+    )
+
+    requeue = []
+    poisoned = []
+    for raw_event in events:
+        if raw_event.retry_count >= max_attempts:
+            raw_event.status = RawDeviceEvent.STATUS_POISON
+            raw_event.error_code = "poison"
+            raw_event.error_message = (
+                f"Gave up after {raw_event.retry_count} attempts. Last error: {raw_event.error_message}"
+            )[:2000]
+            raw_event.next_attempt_at = None
+            poisoned.append(raw_event)
+            continue
+        raw_event.retry_count += 1
+        raw_event.status = RawDeviceEvent.STATUS_RECEIVED
+        raw_event.next_attempt_at = now + timedelta(seconds=_retry_backoff_seconds(raw_event.retry_count))
+        requeue.append(raw_event)
+
+    if poisoned:
+        RawDeviceEvent.objects.bulk_update(
+            poisoned, ["status", "error_code", "error_message", "next_attempt_at"], batch_size=batch_size
+        )
+        logger.warning("sweep_stuck_raw_events: %s events marked poison", len(poisoned))
+    if requeue:
+        RawDeviceEvent.objects.bulk_update(
+            requeue, ["status", "retry_count", "next_attempt_at"], batch_size=batch_size
+        )
+        for raw_event in requeue:
+            process_raw_device_event.delay(raw_event.pk)
+
+    return {"ok": True, "requeued": len(requeue), "poisoned": len(poisoned)}
+
+
+@shared_task(bind=True)
+def archive_raw_device_events(self, older_than_days=None):
+    """Eski "processed" raw eventlarni sana bo'yicha gzip JSONL arxivga ko'chirib, bazadan o'chiradi."""
+    from .archive import archive_processed_events
+
+    result = archive_processed_events(older_than_days=older_than_days)
+    return {"ok": True, "archived": result["archived"], "partitions": len(result["partitions"])}
+
+
 def _acs_item_to_payload(item: dict):
     """Map one Hikvision AcsEvent InfoList item to internal payload."""
     ts = item.get("time") or ""
@@ -0,0 +1,95 @@
+"""Tests for raw device event retention archive."""
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.test import TestCase
+from django.utils import timezone
+
+from integrations.archive import (
+    ARCHIVE_FIELDS,
+    _partition_paths,
+    _write_partition,
+    archive_processed_events,
+    find_archived_event,
+)
+from integrations.models import RawDeviceEvent
+
+
+class RawEventArchiveTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def _event(self, status, age_days, event_id):
+        raw = RawDeviceEvent.objects.create(
+            status=status,
+            external_event_id=event_id,
+            payload_json={"employee_id": "EMP1", "event_type": "check_in", "event_id": event_id},
+        )
+        RawDeviceEvent.objects.filter(pk=raw.pk).update(received_at=timezone.now() - timedelta(days=age_days))
+        return raw
+
+    def test_archives_only_old_processed_events(self):
+        old = self._event(RawDeviceEvent.STATUS_PROCESSED, 120, "old-1")
+        self._event(RawDeviceEvent.STATUS_PROCESSED, 5, "new-1")
+        self._event(RawDeviceEvent.STATUS_UNMATCHED, 120, "old-unmatched")
+
+        result = archive_processed_events(older_than_days=90, batch_size=10, root=self.root)
+
+        self.assertEqual(result["archived"], 1)
+        self.assertFalse(RawDeviceEvent.objects.filter(pk=old.pk).exists())
+        self.assertEqual(RawDeviceEvent.objects.count(), 2)
+
+    def test_lookup_by_trace_id_and_external_id(self):
+        a = self._event(RawDeviceEvent.STATUS_PROCESSED, 100, "evt-a")
+        b = self._event(RawDeviceEvent.STATUS_PROCESSED, 101, "evt-b")
+        archive_processed_events(older_than_days=90, batch_size=1, root=self.root)
+
+        rec = find_archived_event(trace_id=a.trace_id, root=self.root)
+        self.assertEqual(rec["id"], a.pk)
+        self.assertEqual(rec["payload_json"]["event_id"], "evt-a")
+        rec = find_archived_event(external_event_id="evt-b", root=self.root)
+        self.assertEqual(rec["trace_id"], str(b.trace_id))
+        self.assertIsNone(find_archived_event(external_event_id="missing", root=self.root))
+
+    def test_appends_to_existing_partition(self):
+        first = self._event(RawDeviceEvent.STATUS_PROCESSED, 100, "evt-1")
+        archive_processed_events(older_than_days=90, root=self.root)
+        second = self._event(RawDeviceEvent.STATUS_PROCESSED, 100, "evt-2")
+        archive_processed_events(older_than_days=90, root=self.root)
+
+        self.assertEqual(find_archived_event(trace_id=first.trace_id, root=self.root)["id"], first.pk)
+        self.assertEqual(find_archived_event(trace_id=second.trace_id, root=self.root)["id"], second.pk)
+
+    def test_missing_index_is_rebuilt_from_segments(self):
+        """Segment yozilib, indeks yozilmasdan to'xtagan holat: qator raqamlari segmentning o'zidan olinadi."""
+        first = self._event(RawDeviceEvent.STATUS_PROCESSED, 100, "evt-1")
+        archive_processed_events(older_than_days=90, root=self.root)
+        day = timezone.localtime(timezone.now() - timedelta(days=100)).date()
+        _partition_paths(Path(self.root), day)[1].unlink()
+        second = self._event(RawDeviceEvent.STATUS_PROCESSED, 100, "evt-2")
+        archive_processed_events(older_than_days=90, root=self.root)
+
+        self.assertEqual(find_archived_event(trace_id=first.trace_id, root=self.root)["id"], first.pk)
+        self.assertEqual(find_archived_event(trace_id=second.trace_id, root=self.root)["id"], second.pk)
+
+    def test_rows_already_archived_are_not_written_twice(self):
+        """DELETE dan oldin to'xtagan batch qayta ishlanganda trace_id bo'yicha takrorlanmaydi."""
+        event = self._event(RawDeviceEvent.STATUS_PROCESSED, 100, "evt-1")
+        row = RawDeviceEvent.objects.filter(pk=event.pk).values(*ARCHIVE_FIELDS).get()
+        day = timezone.localtime(row["received_at"]).date()
+        self.assertEqual(_write_partition(Path(self.root), day, [row]), 1)
+        result = archive_processed_events(older_than_days=90, root=self.root)
+
+        self.assertEqual(result["archived"], 1)
+        self.assertFalse(RawDeviceEvent.objects.filter(pk=event.pk).exists())
+        self.assertEqual(len(list(_partition_paths(Path(self.root), day)[0].glob("*.jsonl.gz"))), 1)
+        self.assertEqual(find_archived_event(external_event_id="evt-1", root=self.root)["id"], event.pk)
+
+    def test_dry_run_writes_nothing(self):
+        self._event(RawDeviceEvent.STATUS_PROCESSED, 120, "old-1")
+        result = archive_processed_events(older_than_days=90, dry_run=True, root=self.root)
+        self.assertEqual(result["would_archive"], 1)
+        self.assertEqual(RawDeviceEvent.objects.count(), 1)
@@ -0,0 +1,93 @@
+"""Tests for stuck raw event sweeper (backoff and poison)."""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from integrations.models import RawDeviceEvent
+from integrations.tasks import sweep_stuck_raw_events, _retry_backoff_seconds
+
+
+@override_settings(
+    RAW_EVENT_STALE_MINUTES=10,
+    RAW_EVENT_MAX_ATTEMPTS=3,
+    RAW_EVENT_RETRY_BASE_SECONDS=60,
+    RAW_EVENT_RETRY_MAX_SECONDS=3600,
+)
+class RawEventSweeperTests(TestCase):
+    def _event(self, status, age_minutes=30, **kwargs):
+        raw = RawDeviceEvent.objects.create(
+            status=status,
+            payload_json={"employee_id": "X", "event_type": "check_in", "timestamp": "2026-04-15T09:00:00Z"},
+            **kwargs,
+        )
+        # received_at auto_now_add — eskirgan eventni simulyatsiya qilish
+        RawDeviceEvent.objects.filter(pk=raw.pk).update(received_at=timezone.now() - timedelta(minutes=age_minutes))
+        return raw
+
+    @patch("integrations.tasks.process_raw_device_event.delay")
+    def test_requeues_stale_received_and_failed(self, mock_delay):
+        stale = self._event(RawDeviceEvent.STATUS_RECEIVED)
+        fresh = self._event(RawDeviceEvent.STATUS_RECEIVED, age_minutes=1)
+        failed = self._event(RawDeviceEvent.STATUS_FAILED, age_minutes=1)
+        self._event(RawDeviceEvent.STATUS_UNMATCHED)
+
+        result = sweep_stuck_raw_events()
+
+        self.assertEqual(result["requeued"], 2)
+        queued = sorted(call.args[0] for call in mock_delay.call_args_list)
+        self.assertEqual(queued, sorted([stale.pk, failed.pk]))
+        stale.refresh_from_db()
+        self.assertEqual(stale.retry_count, 1)
+        self.assertGreater(stale.next_attempt_at, timezone.now())
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.retry_count, 0)
+
+    @patch("integrations.tasks.process_raw_device_event.delay")
+    def test_backoff_defers_next_attempt(self, mock_delay):
+        self._event(
+            RawDeviceEvent.STATUS_FAILED,
+            retry_count=1,
+            next_attempt_at=timezone.now() + timedelta(minutes=5),
+        )
+        result = sweep_stuck_raw_events()
+        self.assertEqual(result["requeued"], 0)
+        mock_delay.assert_not_called()
+
+    @patch("integrations.tasks.process_raw_device_event.delay")
+    def test_marks_poison_after_max_attempts(self, mock_delay):
+        raw = self._event(RawDeviceEvent.STATUS_FAILED, retry_count=3, error_message="bad timestamp")
+        result = sweep_stuck_raw_events()
+        self.assertEqual(result["poisoned"], 1)
+        mock_delay.assert_not_called()
+        raw.refresh_from_db()
+        self.assertEqual(raw.status, RawDeviceEvent.STATUS_POISON)
+        self.assertIn("bad timestamp", raw.error_message)
+
+    @patch("integrations.tasks.process_raw_device_event.delay")
+    def test_respects_batch_size(self, mock_delay):
+        for _ in range(5):
+            self._event(RawDeviceEvent.STATUS_FAILED)
+        result = sweep_stuck_raw_events(batch_size=2)
+        self.assertEqual(result["requeued"], 2)
+        self.assertEqual(mock_delay.call_count, 2)
+
+    def test_backoff_grows_and_is_capped(self):
+        self.assertLessEqual(_retry_backoff_seconds(0), 60)
+        self.assertGreaterEqual(_retry_backoff_seconds(3), 240)
+        self.assertLessEqual(_retry_backoff_seconds(30), 3600)
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True)
+    def test_processing_exception_marks_failed(self):
+        from integrations.tasks import process_raw_device_event
+
+        raw = RawDeviceEvent.objects.create(
+            payload_json={"employee_id": "X", "event_type": "check_in", "timestamp": "not-a-date"},
+        )
+        with patch("integrations.tasks.process_device_event", side_effect=ValueError("boom")):
+            process_raw_device_event(raw.pk)
+        raw.refresh_from_db()
+        self.assertEqual(raw.status, RawDeviceEvent.STATUS_FAILED)
+        self.assertEqual(raw.error_code, "processing_exception")
+        self.assertIsNotNone(raw.next_attempt_at)
@@ -0,0 +1,74 @@
+"""Tests for bulk auto-rematch of unmatched raw events on employee save."""
+from datetime import time
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from attendance.models import AttendanceLog, DailySummary
+from attendance.services import recompute_daily_summary
+from employees.models import Employee
+from integrations.models import RawDeviceEvent
+from integrations.tasks import rematch_unmatched_events
+
+
+@override_settings(
+    CELERY_TASK_ALWAYS_EAGER=True,
+    CELERY_TASK_EAGER_PROPAGATES=True,
+)
+class RematchUnmatchedEventsTests(TestCase):
+    def _unmatched(self, identifier, event_id, ts, event_type="check_in"):
+        return RawDeviceEvent.objects.create(
+            status=RawDeviceEvent.STATUS_UNMATCHED,
+            payload_json={
+                "employee_id": identifier,
+                "event_type": event_type,
+                "timestamp": ts,
+                "event_id": event_id,
+            },
+        )
+
+    def _employee(self, **kwargs):
+        return Employee.objects.create(
+            first_name="Ali",
+            last_name="Valiyev",
+            work_start_time=time(9, 0),
+            work_end_time=time(18, 0),
+            **kwargs,
+        )
+
+    def test_device_identifier_is_normalized(self):
+        raw = self._unmatched("  HV42 ", "e1", "2026-04-15T09:00:00+05:00")
+        self.assertEqual(raw.device_identifier, "HV42")
+
+    def test_rematch_replays_matching_events_as_batch(self):
+        a = self._unmatched("HV42", "e1", "2026-04-15T09:20:00+05:00")
+        b = self._unmatched("HV42", "e2", "2026-04-15T18:05:00+05:00", event_type="check_out")
+        other = self._unmatched("OTHER", "e3", "2026-04-15T09:00:00+05:00")
+        emp = self._employee(employee_id="EMP042", device_person_id="HV42")
+
+        with patch("integrations.tasks.recompute_daily_summary", wraps=recompute_daily_summary) as mock_recompute:
+            result = rematch_unmatched_events(emp.pk)
+
+        self.assertEqual(result["processed"], 2)
+        # Ikki event bitta kunga tegishli — xulosa bir marta qayta hisoblanadi
+        self.assertEqual(mock_recompute.call_count, 1)
+        for raw in (a, b):
+            raw.refresh_from_db()
+            self.assertEqual(raw.status, RawDeviceEvent.STATUS_PROCESSED)
+        other.refresh_from_db()
+        self.assertEqual(other.status, RawDeviceEvent.STATUS_UNMATCHED)
+        self.assertEqual(AttendanceLog.objects.filter(employee=emp).count(), 2)
+        self.assertTrue(DailySummary.objects.filter(employee=emp).exists())
+
+    def test_employee_save_enqueues_rematch(self):
+        self._unmatched("EMP050", "e1", "2026-04-15T09:00:00+05:00")
+        with patch("integrations.tasks.rematch_unmatched_events.delay") as mock_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                emp = self._employee(employee_id="EMP050")
+        mock_delay.assert_called_once_with(emp.pk)
+
+    def test_employee_save_without_backlog_does_not_enqueue(self):
+        with patch("integrations.tasks.rematch_unmatched_events.delay") as mock_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self._employee(employee_id="EMP051")
+        mock_delay.assert_not_called()
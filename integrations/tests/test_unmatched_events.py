@@ -1,11 +1,14 @@
 """Tests for unmatched raw event admin workflow."""
-from datetime import time
+from datetime import time, timedelta
+from unittest import mock
 
 from django.test import TestCase, Client, override_settings
+from django.utils import timezone
 
 from accounts.models import User
 from employees.models import Employee
 from integrations.models import RawDeviceEvent
+from integrations.tasks import sweep_stuck_raw_events
 
 
 @override_settings(
@@ -69,3 +72,85 @@ class UnmatchedEventsTests(TestCase):
         raw.refresh_from_db()
         # Replayed event has no matching employee, should end up unmatched.
         self.assertEqual(raw.status, RawDeviceEvent.STATUS_UNMATCHED)
+
+    def test_unmatched_page_groups_by_identifier(self):
+        for i in range(3):
+            RawDeviceEvent.objects.create(
+                status=RawDeviceEvent.STATUS_UNMATCHED,
+                payload_json={"employee_id": "HV7", "event_type": "check_in", "event_id": f"g-{i}"},
+            )
+        RawDeviceEvent.objects.create(
+            status=RawDeviceEvent.STATUS_UNMATCHED,
+            payload_json={"employee_id": "HV8", "event_type": "check_in", "event_id": "g-x"},
+        )
+        r = self.client.get("/integrations/events/unmatched/")
+        groups = {g["device_identifier"]: g["count"] for g in r.context["unmatched_groups"]}
+        self.assertEqual(groups, {"HV7": 3, "HV8": 1})
+
+    def test_resolve_group_assigns_all_events(self):
+        emp = Employee.objects.create(
+            employee_id="EMP300",
+            first_name="Ali",
+            last_name="Valiyev",
+            work_start_time=time(9, 0),
+            work_end_time=time(18, 0),
+        )
+        group = [
+            RawDeviceEvent.objects.create(
+                status=RawDeviceEvent.STATUS_UNMATCHED,
+                payload_json={
+                    "employee_id": "HV300",
+                    "event_type": "check_in",
+                    "timestamp": f"2026-04-{15 + i}T09:10:00+05:00",
+                    "event_id": f"grp-{i}",
+                },
+            )
+            for i in range(3)
+        ]
+        other = RawDeviceEvent.objects.create(
+            status=RawDeviceEvent.STATUS_UNMATCHED,
+            payload_json={"employee_id": "HV301", "event_type": "check_in", "event_id": "grp-other"},
+        )
+        r = self.client.post(
+            "/integrations/events/unmatched/resolve/",
+            data={"device_identifier": "HV300", "employee_id": emp.employee_id},
+        )
+        self.assertEqual(r.status_code, 302)
+        for raw in group:
+            raw.refresh_from_db()
+            self.assertEqual(raw.status, RawDeviceEvent.STATUS_PROCESSED)
+            self.assertEqual(raw.payload_json["employee_id"], "EMP300")
+            self.assertEqual(raw.device_identifier, "EMP300")
+        other.refresh_from_db()
+        self.assertEqual(other.status, RawDeviceEvent.STATUS_UNMATCHED)
+        self.assertEqual(emp.attendance_logs.count(), 3)
+
+    def test_sweeper_before_group_batch_keeps_assignment(self):
+        emp = Employee.objects.create(
+            employee_id="EMP301",
+            first_name="Ali",
+            last_name="Valiyev",
+            work_start_time=time(9, 0),
+            work_end_time=time(18, 0),
+        )
+        raw = RawDeviceEvent.objects.create(
+            status=RawDeviceEvent.STATUS_UNMATCHED,
+            payload_json={
+                "employee_id": "HV310",
+                "event_type": "check_in",
+                "timestamp": "2026-04-15T09:10:00+05:00",
+                "event_id": "grp-sweep",
+            },
+        )
+        RawDeviceEvent.objects.filter(pk=raw.pk).update(received_at=timezone.now() - timedelta(days=1))
+        # Batch task kechikdi (yoki xabari yo'qoldi) — sweeper undan oldin ishlaydi
+        with mock.patch("integrations.views.replay_raw_events_batch.delay"):
+            self.client.post(
+                "/integrations/events/unmatched/resolve/",
+                data={"device_identifier": "HV310", "employee_id": emp.employee_id},
+            )
+        self.assertEqual(sweep_stuck_raw_events.delay().get()["requeued"], 1)
+        raw.refresh_from_db()
+        self.assertEqual(raw.status, RawDeviceEvent.STATUS_PROCESSED)
+        self.assertEqual(raw.payload_json["employee_id"], "EMP301")
+        self.assertEqual(emp.attendance_logs.count(), 1)
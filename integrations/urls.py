@@ -8,6 +8,7 @@ urlpatterns = [
     path("settings/", views.IntegrationSettingsView.as_view(), name="settings"),
     path("settings/platform/", views.PlatformSettingsView.as_view(), name="platform_settings"),
     path("events/unmatched/", views.UnmatchedEventsView.as_view(), name="unmatched_events"),
+    path("events/unmatched/resolve/", views.ResolveRawEventGroupView.as_view(), name="resolve_raw_event_group"),
     path("events/<int:pk>/resolve/", views.ResolveRawEventView.as_view(), name="resolve_raw_event"),
     path("events/<int:pk>/replay/", views.ReplayRawEventView.as_view(), name="replay_raw_event"),
 ]
@@ -11,13 +11,22 @@ from django.shortcuts import redirect
 from django.contrib import messages
 from django.conf import settings as django_settings
 from django.core.cache import cache
+from django.db.models import Count, Max, Min
 from django.utils import timezone
+from core import metrics
+from core.system_settings import (
+    REGISTRY as SYSTEM_SETTINGS_REGISTRY,
+    format_setting,
+    get_system_settings,
+    set_system_settings,
+)
 from core.decorators import admin_required
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-from .models import IntegrationSettings, RawDeviceEvent, DeviceImportJob
-from .tasks import process_raw_device_event, run_device_import_job
+from .models import IntegrationSettings, RawDeviceEvent, DeviceImportJob, device_identifier_from_payload
+from .tasks import assign_employee_to_event, process_raw_device_event, replay_raw_events_batch, run_device_import_job
 from employees.models import Employee
+from reports.reconciliation import invalidate_snapshots
 
 logger = logging.getLogger(__name__)
 
@@ -111,7 +120,17 @@ class DeviceWebhookView(View):
     CSRF exempt; rate limit per IP. Agar webhook_secret sozlangan bo‘lsa,
     X-Webhook-Secret sarlavhasi yoki ?secret= majburiy.
     """
+    # Javob status kodi -> webhook_requests metrikasidagi result label
+    METRIC_RESULTS = {202: "accepted", 429: "rate_limited", 401: "unauthorized", 503: "disabled", 400: "bad_request"}
+
     def post(self, request):
+        response = self._handle(request)
+        result = self.METRIC_RESULTS.get(response.status_code)
+        if result:
+            metrics.WEBHOOK_REQUESTS.inc(result=result)
+        return response
+
+    def _handle(self, request):
         integration = IntegrationSettings.get_settings()
         if not integration.webhook_enabled:
             return JsonResponse({"ok": False, "reason": "webhook_disabled"}, status=503)
@@ -172,22 +191,31 @@ class DeviceWebhookView(View):
             return JsonResponse({"ok": False, "reason": "rate_limit_exceeded"}, status=429)
         cache.set(cache_key, current + 1, timeout=120)
 
-        results = []
+        # Massiv payload bitta INSERT bilan yoziladi (bulk_create save() ni chaqirmaydi — device_identifier shu yerda)
+        rows = []
         for item in items:
             payload = item if isinstance(item, dict) else {"raw": item}
-            raw_event = RawDeviceEvent.objects.create(
-                device_ip=ip,
-                external_event_id=str(
-                    payload.get("event_id")
-                    or payload.get("id")
-                    or payload.get("serial_no")
-                    or ""
-                ),
-                payload_json=payload,
-                event_time_device=_parse_event_time(payload.get("timestamp")),
+            rows.append(
+                RawDeviceEvent(
+                    device_ip=ip,
+                    external_event_id=str(
+                        payload.get("event_id")
+                        or payload.get("id")
+                        or payload.get("serial_no")
+                        or ""
+                    ),
+                    payload_json=payload,
+                    device_identifier=device_identifier_from_payload(payload),
+                    event_time_device=_parse_event_time(payload.get("timestamp")),
+                )
             )
+        results = []
+        for raw_event in RawDeviceEvent.objects.bulk_create(rows):
             process_raw_device_event.delay(raw_event.pk)
             results.append({"queued": True, "raw_event_id": raw_event.pk, "trace_id": str(raw_event.trace_id)})
+            if raw_event.event_time_device:
+                metrics.DEVICE_LAG_SECONDS.observe((raw_event.received_at - raw_event.event_time_device).total_seconds())
+        metrics.WEBHOOK_EVENTS_QUEUED.inc(len(results))
 
         return JsonResponse({"ok": True, "processed": len(results), "results": results}, status=202)
 
@@ -207,6 +235,7 @@ class IntegrationSettingsView(LoginRequiredMixin, TemplateView):
             "received_24h": RawDeviceEvent.objects.filter(received_at__gte=timezone.now() - timedelta(hours=24)).count(),
             "unmatched_open": RawDeviceEvent.objects.filter(status=RawDeviceEvent.STATUS_UNMATCHED).count(),
             "failed_open": RawDeviceEvent.objects.filter(status=RawDeviceEvent.STATUS_FAILED).count(),
+            "poison_open": RawDeviceEvent.objects.filter(status=RawDeviceEvent.STATUS_POISON).count(),
             "running_imports": DeviceImportJob.objects.filter(status=DeviceImportJob.STATUS_RUNNING).count(),
         }
         return context
@@ -249,37 +278,25 @@ class IntegrationSettingsView(LoginRequiredMixin, TemplateView):
         return super().get(request, *args, **kwargs)
 
 
-def _get_or_set_system_setting(key, value=None):
-    from core.models import SystemSettings
-    obj, _ = SystemSettings.objects.get_or_create(key=key, defaults={"value": value or ""})
-    if value is not None:
-        obj.value = value
-        obj.save()
-    return obj.value
-
-
 @method_decorator(admin_required, name="dispatch")
 class PlatformSettingsView(LoginRequiredMixin, TemplateView):
     template_name = "integrations/platform_settings.html"
 
     def get_context_data(self, **kwargs):
-        from core.models import SystemSettings
         context = super().get_context_data(**kwargs)
-        defaults = {o.key: o.value for o in SystemSettings.objects.all()}
+        # Tiplangan process keshidan (so'rovsiz); input qiymatlari uchun satrga formatlanadi
+        defaults = {key: format_setting(key, value) for key, value in get_system_settings().items()}
         context["defaults"] = defaults
-        context["default_work_start"] = defaults.get("default_work_start", "09:00")
-        context["default_work_end"] = defaults.get("default_work_end", "18:00")
-        context["default_grace_period"] = defaults.get("default_grace_period", "5")
-        context["default_penalty_per_minute"] = defaults.get("default_penalty_per_minute", "0")
+        context.update(defaults)
         return context
 
     def post(self, request, *args, **kwargs):
         if getattr(request.user, "role", None) != "admin":
             return redirect("core:dashboard")
-        _get_or_set_system_setting("default_work_start", request.POST.get("default_work_start", "").strip() or "09:00")
-        _get_or_set_system_setting("default_work_end", request.POST.get("default_work_end", "").strip() or "18:00")
-        _get_or_set_system_setting("default_grace_period", request.POST.get("default_grace_period", "").strip() or "5")
-        _get_or_set_system_setting("default_penalty_per_minute", request.POST.get("default_penalty_per_minute", "").strip() or "0")
+        errors = set_system_settings({key: request.POST.get(key, "") for key in SYSTEM_SETTINGS_REGISTRY})
+        if errors:
+            for key, error in errors.items():
+                messages.error(request, f"{key}: {error}")
         return redirect("integrations:platform_settings")
 
     def get(self, request, *args, **kwargs):
@@ -294,15 +311,77 @@ class UnmatchedEventsView(LoginRequiredMixin, TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        # Unmatched eventlar qurilma identifikatori bo'yicha guruhlanadi (bitta GROUP BY so'rov)
+        context["unmatched_groups"] = list(
+            RawDeviceEvent.objects.filter(status=RawDeviceEvent.STATUS_UNMATCHED)
+            .values("device_identifier")
+            .annotate(count=Count("id"), first_seen=Min("received_at"), last_seen=Max("received_at"))
+            .order_by("-last_seen")[:200]
+        )
         context["events"] = (
-            RawDeviceEvent.objects.filter(
-                status__in=[RawDeviceEvent.STATUS_UNMATCHED, RawDeviceEvent.STATUS_FAILED]
-            )
+            RawDeviceEvent.objects.filter(status__in=RawDeviceEvent.OPEN_STATUSES)
+            .exclude(status=RawDeviceEvent.STATUS_UNMATCHED, device_identifier__gt="")
             .order_by("-received_at")[:200]
         )
         return context
 
 
+@method_decorator(admin_required, name="dispatch")
+class ResolveRawEventGroupView(LoginRequiredMixin, View):
+    """Bir identifikatorli barcha unmatched eventlarni xodimga tayinlash va bitta batch qilib qayta ishlash."""
+
+    def post(self, request, *args, **kwargs):
+        identifier = (request.POST.get("device_identifier") or "").strip()
+        if not identifier:
+            messages.error(request, "Qurilma identifikatori ko'rsatilmagan.")
+            return redirect("integrations:unmatched_events")
+
+        employee_id = (request.POST.get("employee_id") or "").strip()
+        employee = Employee.objects.filter(employee_id=employee_id, is_active=True).first()
+        if not employee:
+            messages.error(request, "Xodim ID topilmadi yoki faol emas.")
+            return redirect("integrations:unmatched_events")
+
+        group = RawDeviceEvent.objects.filter(
+            status=RawDeviceEvent.STATUS_UNMATCHED,
+            device_identifier=identifier,
+        )
+        events = list(group.only("pk", "payload_json", "device_identifier", "received_at"))
+        if not events:
+            messages.error(request, "Bu identifikator bo'yicha unmatched eventlar topilmadi.")
+            return redirect("integrations:unmatched_events")
+
+        # Tayinlov payload ga yoziladi: batch task kechiksa yoki yo'qolsa, sweeper ham eventni
+        # shu xodim bilan qayta ishlaydi. Guruh "received" ga o'tadi, keyin bitta batch task qayta ishlaydi
+        for raw_event in events:
+            assign_employee_to_event(raw_event, employee.employee_id)
+            raw_event.status = RawDeviceEvent.STATUS_RECEIVED
+            raw_event.error_code = ""
+            raw_event.error_message = ""
+            raw_event.processed_at = None
+            raw_event.retry_count = 0
+            raw_event.next_attempt_at = None
+        RawDeviceEvent.objects.bulk_update(
+            events,
+            [
+                "payload_json",
+                "device_identifier",
+                "status",
+                "error_code",
+                "error_message",
+                "processed_at",
+                "retry_count",
+                "next_attempt_at",
+            ],
+            batch_size=500,
+        )
+        invalidate_snapshots({timezone.localtime(raw_event.received_at).date() for raw_event in events})
+        ids = [raw_event.pk for raw_event in events]
+        replay_raw_events_batch.delay(ids)
+        messages.success(request, f"{len(ids)} ta event {employee.employee_id} ga tayinlandi va qayta ishlashga yuborildi.")
+        return redirect("integrations:unmatched_events")
+
+
 @method_decorator(admin_required, name="dispatch")
 class ResolveRawEventView(LoginRequiredMixin, View):
     """Assign employee_id to raw event payload and replay processing."""
@@ -326,8 +405,18 @@ class ResolveRawEventView(LoginRequiredMixin, View):
         raw_event.error_code = ""
         raw_event.error_message = ""
         raw_event.processed_at = None
+        raw_event.retry_count = 0
+        raw_event.next_attempt_at = None
         raw_event.save(
-            update_fields=["payload_json", "status", "error_code", "error_message", "processed_at"]
+            update_fields=[
+                "payload_json",
+                "status",
+                "error_code",
+                "error_message",
+                "processed_at",
+                "retry_count",
+                "next_attempt_at",
+            ]
         )
         process_raw_device_event.delay(raw_event.pk)
         messages.success(request, "Raw event yangilandi va qayta ishlashga yuborildi.")
@@ -348,7 +437,12 @@ class ReplayRawEventView(LoginRequiredMixin, View):
         raw_event.error_code = ""
         raw_event.error_message = ""
         raw_event.processed_at = None
-        raw_event.save(update_fields=["status", "error_code", "error_message", "processed_at"])
+        # Qo'lda replay: sweeper hisoblagichi va backoff qaytadan boshlanadi
+        raw_event.retry_count = 0
+        raw_event.next_attempt_at = None
+        raw_event.save(
+            update_fields=["status", "error_code", "error_message", "processed_at", "retry_count", "next_attempt_at"]
+        )
         process_raw_device_event.delay(raw_event.pk)
         messages.success(request, "Raw event qayta ishlashga yuborildi.")
         return redirect("integrations:unmatched_events")
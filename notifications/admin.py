@@ -1,7 +1,14 @@
 from django.contrib import admin
-from .models import TelegramSettings
+from .models import NotificationOutbox, TelegramSettings
 
 
 @admin.register(TelegramSettings)
 class TelegramSettingsAdmin(admin.ModelAdmin):
     list_display = ["enabled", "updated_at"]
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ["id", "kind", "status", "attempts", "created_at", "sent_at"]
+    list_filter = ["status", "kind"]
+    search_fields = ["text"]
@@ -0,0 +1,153 @@
+"""
+Umumiy Telegram Bot API klienti: process bo'yicha bitta pooled requests.Session, chat bo'yicha
+tezlik cheklovi va 429 javobidagi parameters.retry_after ga rioya qilish.
+Cheklov holati Django keshida (productionda Redis) — barcha gunicorn/Celery processlari bitta
+chat uchun bitta byudjetni bo'lishadi.
+"""
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Process uchun yagona Session (keep-alive ulanishlar qayta ishlatiladi)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=settings.TELEGRAM_POOL_SIZE, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+class ChatRateLimiter:
+    """
+    Chat bo'yicha sirpanuvchi oyna (sliding window counter): joriy oyna hisoblagichi + oldingi oyna
+    hisoblagichi o'tgan ulushga qarab og'irlik bilan. Oyna chegarasida capacity ikki marta o'tib ketmaydi
+    (oddiy oyna hisoblagichi chegaraning ikki tomonida 2× capacity ni ~1 soniyada o'tkazib yuborardi).
+    incr atomik, shuning uchun bir nechta process bitta chat byudjetini to'g'ri bo'lishadi.
+    429 dan keyin chat cooldown kaliti retry_after tugaguncha hammani kutdiradi.
+    """
+
+    def __init__(self, capacity: int, window: int, clock=time.time):
+        self.capacity = capacity
+        self.window = window
+        self.clock = clock
+
+    def _cooldown_key(self, chat_id):
+        return f"tg:cooldown:{chat_id}"
+
+    def _window_key(self, chat_id, window_id):
+        return f"tg:rate:{chat_id}:{window_id}"
+
+    def set_cooldown(self, chat_id, seconds: float):
+        until = self.clock() + seconds
+        cache.set(self._cooldown_key(chat_id), until, timeout=int(seconds) + 1)
+
+    def _wait(self, previous, current, elapsed) -> float:
+        """Yana bitta xabar uchun taxminiy hisob previous*w + current + 1 <= capacity bo'lguncha kutish."""
+        free = self.capacity - 1 - current
+        if free < 0:
+            # Joriy oyna to'la: keyingi oynada shu oyna og'irligi yetarlicha kamayguncha
+            return (self.window - elapsed) + max(0.0, self.window * (1 - (self.capacity - 1) / current))
+        return max(0.0, (self.window - elapsed) - self.window * free / previous)
+
+    def try_acquire(self, chat_id) -> float:
+        """0 — yuborish mumkin (slot olindi); aks holda necha soniya kutish kerakligi."""
+        now = self.clock()
+        until = cache.get(self._cooldown_key(chat_id))
+        if until and until > now:
+            return until - now
+        window_id = int(now // self.window)
+        elapsed = now - window_id * self.window
+        weight = (self.window - elapsed) / self.window
+        previous = cache.get(self._window_key(chat_id, window_id - 1), 0)
+        key = self._window_key(chat_id, window_id)
+        current = cache.get(key, 0)
+        if previous * weight + current + 1 > self.capacity:
+            return self._wait(previous, current, elapsed)
+        cache.add(key, 0, timeout=self.window * 2)
+        try:
+            used = cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=self.window * 2)
+            used = 1
+        if previous * weight + used <= self.capacity:
+            return 0.0
+        # Boshqa process oldinroq oldi — slotni qaytaramiz
+        cache.decr(key)
+        return self._wait(previous, used - 1, elapsed)
+
+
+class TelegramClient:
+    def __init__(self, token: str, limiter: ChatRateLimiter = None, sleep=time.sleep):
+        self.token = token
+        capacity, window = settings.TELEGRAM_RATE_LIMIT
+        self.limiter = limiter or ChatRateLimiter(capacity, window)
+        self.sleep = sleep
+
+    def send_message(self, chat_id, text: str, max_wait: float = None) -> dict:
+        """
+        sendMessage. Cheklov yoki 429 tufayli jami max_wait soniyagacha kutadi; undan ko'p kerak bo'lsa
+        {"ok": False, "retry_after": n} qaytaradi (Celery task shu qiymat bilan retry qiladi).
+        Returns {"ok": True} / {"ok": False, "error": "..."} / {"ok": False, "retry_after": n, "error": "..."}.
+        """
+        max_wait = settings.TELEGRAM_MAX_WAIT_SECONDS if max_wait is None else max_wait
+        waited = 0.0
+        while True:
+            delay = self.limiter.try_acquire(chat_id)
+            if delay:
+                if waited + delay > max_wait:
+                    metrics.TELEGRAM_SENDS.inc(result="rate_limited")
+                    return {"ok": False, "retry_after": delay, "error": "rate_limited"}
+                self.sleep(delay)
+                waited += delay
+                continue
+            result = self._post(chat_id, text)
+            retry_after = result.get("retry_after")
+            if retry_after is None:
+                metrics.TELEGRAM_SENDS.inc(result="ok" if result["ok"] else "failed")
+                return result
+            self.limiter.set_cooldown(chat_id, retry_after)
+            if waited + retry_after > max_wait:
+                metrics.TELEGRAM_SENDS.inc(result="rate_limited")
+                return result
+            logger.info("telegram: 429 for chat %s, waiting %ss", chat_id, retry_after)
+            self.sleep(retry_after)
+            waited += retry_after
+
+    def _post(self, chat_id, text):
+        url = f"{settings.TELEGRAM_API_URL}/bot{self.token}/sendMessage"
+        payload = {"chat_id": chat_id, "text": text[:4096], "disable_web_page_preview": True}
+        try:
+            r = get_session().post(url, json=payload, timeout=settings.TELEGRAM_TIMEOUT_SECONDS)
+        except requests.RequestException as e:
+            return {"ok": False, "error": str(e)}
+        if r.status_code == 429:
+            try:
+                retry_after = int((r.json().get("parameters") or {}).get("retry_after") or 1)
+            except ValueError:
+                retry_after = 1
+            return {"ok": False, "retry_after": retry_after, "error": "too_many_requests"}
+        if r.status_code >= 400:
+            try:
+                description = r.json().get("description") or r.reason
+            except ValueError:
+                description = r.reason
+            return {"ok": False, "error": f"{r.status_code} {description}"}
+        return {"ok": True}
@@ -21,3 +21,50 @@ class TelegramSettings(models.Model):
     def get_settings(cls):
         obj, _ = cls.objects.get_or_create(pk=1)
         return obj
+
+
+class NotificationOutbox(models.Model):
+    """
+    Yuborilishi kerak bo'lgan Telegram xabarlari navbati. Dispatcher pending qatorlarni
+    4096 belgigacha digest xabarlarga birlashtirib, nazorat qilingan tezlikda yuboradi.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    # Telegram sozlanmagan — xabar yuborilmaydi (avvalgi telegram_not_configured xatti-harakati)
+    STATUS_SKIPPED = "skipped"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+        (STATUS_SKIPPED, "Skipped"),
+    ]
+
+    KIND_LATENESS = "lateness"
+    KIND_OTHER = "other"
+
+    KIND_CHOICES = [
+        (KIND_LATENESS, "Lateness"),
+        (KIND_OTHER, "Other"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=KIND_OTHER)
+    text = models.TextField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "id"], name="outbox_status_id_idx"),
+        ]
+        verbose_name = "Notification Outbox"
+        verbose_name_plural = "Notification Outbox"
+
+    def __str__(self):
+        return f"{self.kind} {self.status} #{self.pk}"
@@ -0,0 +1,106 @@
+"""
+Telegram outbox: xabarlar avval NotificationOutbox ga yoziladi, dispatcher esa pending qatorlarni
+Telegram chegarasigacha (4096 belgi) digest xabarlarga birlashtirib, xabarlar orasida pauza bilan yuboradi.
+300 ta kechikish = bir necha digest, 300 ta task va 429 emas.
+"""
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import NotificationOutbox, TelegramSettings
+from .services import send_telegram_message_sync
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+DIGEST_SEPARATOR = "\n\n"
+_LOCK_KEY = "notifications:outbox_dispatch_lock"
+
+
+def enqueue_notification(text: str, kind: str = NotificationOutbox.KIND_OTHER) -> NotificationOutbox:
+    return NotificationOutbox.objects.create(kind=kind, text=text)
+
+
+def pack_digests(items, limit: int = TELEGRAM_MESSAGE_LIMIT):
+    """
+    items: [(pk, text), ...] tartib bo'yicha. Returns [(pks, digest_text), ...];
+    har bir digest limit dan oshmaydi, bitta juda uzun xabar limit gacha qisqartiriladi.
+    """
+    digests = []
+    pks, parts, size = [], [], 0
+    for pk, text in items:
+        text = text[:limit]
+        extra = len(text) + (len(DIGEST_SEPARATOR) if parts else 0)
+        if parts and size + extra > limit:
+            digests.append((pks, DIGEST_SEPARATOR.join(parts)))
+            pks, parts, size = [], [], 0
+            extra = len(text)
+        pks.append(pk)
+        parts.append(text)
+        size += extra
+    if parts:
+        digests.append((pks, DIGEST_SEPARATOR.join(parts)))
+    return digests
+
+
+def dispatch_outbox(batch_size: int = None, interval: float = None, sleep=time.sleep):
+    """
+    Pending xabarlarni digest qilib yuboradi. Bir vaqtda faqat bitta dispatcher ishlaydi (kesh lock).
+    Yuborish xato bersa qatorlar pending qoladi (attempts+1, NOTIFICATION_MAX_ATTEMPTS dan keyin failed)
+    va qolgan digestlar keyingi ishga qoldiriladi — API ishlamayotgan bo'lsa uni urib turmaymiz.
+    Returns {"sent": digestlar, "messages": qatorlar, "failed": qatorlar, "skipped": qatorlar} yoki locked.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_DISPATCH_BATCH_SIZE
+    interval = settings.NOTIFICATION_DIGEST_INTERVAL_SECONDS if interval is None else interval
+    token = uuid.uuid4().hex
+    if not cache.add(_LOCK_KEY, token, timeout=settings.NOTIFICATION_DISPATCH_LOCK_SECONDS):
+        return {"ok": False, "reason": "locked"}
+    try:
+        return _dispatch(batch_size, interval, sleep)
+    finally:
+        # Lock muddati o'tib, boshqa dispatcher olgan bo'lsa — uning lockini o'chirmaymiz
+        if cache.get(_LOCK_KEY) == token:
+            cache.delete(_LOCK_KEY)
+
+
+def _dispatch(batch_size, interval, sleep):
+    result = {"ok": True, "sent": 0, "messages": 0, "failed": 0, "skipped": 0}
+    pending = NotificationOutbox.objects.filter(status=NotificationOutbox.STATUS_PENDING)
+    tg = TelegramSettings.get_settings()
+    if not tg.enabled or not tg.bot_token or not tg.chat_id:
+        result["skipped"] = pending.update(
+            status=NotificationOutbox.STATUS_SKIPPED, error_message="telegram_not_configured"
+        )
+        return result
+
+    items = list(pending.order_by("id").values_list("pk", "text")[:batch_size])
+    for index, (pks, text) in enumerate(pack_digests(items)):
+        if index and interval:
+            sleep(interval)
+        response = send_telegram_message_sync(text)
+        rows = NotificationOutbox.objects.filter(pk__in=pks)
+        if response.get("ok"):
+            rows.update(status=NotificationOutbox.STATUS_SENT, sent_at=timezone.now(), error_message="")
+            result["sent"] += 1
+            result["messages"] += len(pks)
+            continue
+        if response.get("retry_after"):
+            # Chat cheklovi/429: urinish hisoblanmaydi — qatorlar keyingi ishda yuboriladi
+            logger.info("notification outbox: rate limited, retry after %ss", response["retry_after"])
+            break
+        error = response.get("error") or response.get("reason") or "send_failed"
+        logger.warning("notification outbox: digest of %s messages failed: %s", len(pks), error)
+        failed_rows = list(rows)
+        for row in failed_rows:
+            row.attempts += 1
+            row.error_message = str(error)
+            if row.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+                row.status = NotificationOutbox.STATUS_FAILED
+                result["failed"] += 1
+        NotificationOutbox.objects.bulk_update(failed_rows, ["attempts", "error_message", "status"])
+        break
+    return result
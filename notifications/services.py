@@ -1,21 +1,15 @@
 """Sync Telegram sender (no Celery)."""
-import requests
+from .client import TelegramClient
 from .models import TelegramSettings
 
 
-def send_telegram_message_sync(text: str):
+def send_telegram_message_sync(text: str, max_wait: float = None):
     """
-    Telegram xabarini sync jo'natadi (Celery kerak emas).
-    Returns {"ok": True} yoki {"ok": False, "reason": "..."} / {"ok": False, "error": "..."}.
+    Telegram xabarini sync jo'natadi (Celery kerak emas). Umumiy klient orqali: pooled session,
+    chat bo'yicha tezlik cheklovi; 429 bo'lsa retry_after kutiladi (jami max_wait soniyagacha).
+    Returns {"ok": True} yoki {"ok": False, "reason": "..."} / {"ok": False, "error": "...", "retry_after"?: n}.
     """
     settings = TelegramSettings.get_settings()
     if not settings.enabled or not settings.bot_token or not settings.chat_id:
         return {"ok": False, "reason": "telegram_not_configured"}
-    url = f"https://api.telegram.org/bot{settings.bot_token}/sendMessage"
-    payload = {"chat_id": settings.chat_id, "text": text[:4096], "disable_web_page_preview": True}
-    try:
-        r = requests.post(url, json=payload, timeout=10)
-        r.raise_for_status()
-        return {"ok": True}
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
+    return TelegramClient(settings.bot_token).send_message(settings.chat_id, text, max_wait=max_wait)
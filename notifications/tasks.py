@@ -1,22 +1,26 @@
 """Celery task: send Telegram message."""
-import requests
 from celery import shared_task
+from .client import TelegramClient
 from .models import TelegramSettings
 
 
 @shared_task(bind=True, max_retries=3)
 def send_telegram_message(self, text: str):
-    """Send text to configured Telegram chat."""
+    """Send text to configured Telegram chat. Cheklovga tushsa worker band qilinmaydi — retry_after bilan retry."""
     settings = TelegramSettings.get_settings()
     if not settings.enabled or not settings.bot_token or not settings.chat_id:
         return {"ok": False, "reason": "telegram_not_configured"}
 
-    url = f"https://api.telegram.org/bot{settings.bot_token}/sendMessage"
-    payload = {"chat_id": settings.chat_id, "text": text[:4096], "disable_web_page_preview": True}
+    result = TelegramClient(settings.bot_token).send_message(settings.chat_id, text, max_wait=0)
+    if result["ok"]:
+        return result
+    countdown = result.get("retry_after") or 60
+    raise self.retry(exc=RuntimeError(result.get("error")), countdown=countdown, max_retries=3)
 
-    try:
-        r = requests.post(url, json=payload, timeout=10)
-        r.raise_for_status()
-        return {"ok": True}
-    except Exception as exc:
-        self.retry(exc=exc, countdown=60, max_retries=3)
+
+@shared_task(bind=True)
+def dispatch_notification_outbox(self):
+    """NotificationOutbox dagi pending xabarlarni digest qilib yuboradi (beat va nightly dan keyin)."""
+    from .outbox import dispatch_outbox
+
+    return dispatch_outbox()
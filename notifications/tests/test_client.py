@@ -0,0 +1,85 @@
+"""Telegram klienti: chat bo'yicha cheklov, 429 retry_after va pooled session."""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from notifications import client as tg_client
+from notifications.client import ChatRateLimiter, TelegramClient
+from notifications.models import TelegramSettings
+from notifications.services import send_telegram_message_sync
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, data=None):
+        self.status_code = status_code
+        self._data = data or {"ok": True}
+        self.reason = "error"
+
+    def json(self):
+        return self._data
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@override_settings(TELEGRAM_RATE_LIMIT=(2, 60), TELEGRAM_MAX_WAIT_SECONDS=120)
+class TelegramClientTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = FakeClock()
+        self.limiter = ChatRateLimiter(2, 60, clock=self.clock)
+        self.client = TelegramClient("token", limiter=self.limiter, sleep=self.clock.sleep)
+
+    def test_limiter_is_per_chat_window(self):
+        self.assertEqual(self.limiter.try_acquire("a"), 0)
+        self.assertEqual(self.limiter.try_acquire("a"), 0)
+        self.assertEqual(self.limiter.try_acquire("b"), 0)
+        # Oyna 960..1020: keyingi oynada (1020) shu 2 ta xabar og'irligi 1 gacha tushishi kerak — 1050
+        self.assertEqual(self.limiter.try_acquire("a"), 50.0)
+        self.clock.now = 1050
+        self.assertEqual(self.limiter.try_acquire("a"), 0)
+
+    def test_no_double_burst_across_window_boundary(self):
+        self.clock.now = 1019  # oyna 960..1020 oxiri
+        self.assertEqual(self.limiter.try_acquire("a"), 0)
+        self.assertEqual(self.limiter.try_acquire("a"), 0)
+        self.clock.now = 1020.5  # yangi oyna boshlandi — oddiy oyna hisoblagichi bu yerda yana 2 tasini o'tkazardi
+        self.assertGreater(self.limiter.try_acquire("a"), 0)
+        self.clock.now = 1050  # oldingi oyna og'irligi 0.5 — bitta xabar
+        self.assertEqual(self.limiter.try_acquire("a"), 0)
+        self.assertGreater(self.limiter.try_acquire("a"), 0)
+
+    def test_waits_for_window_then_sends(self):
+        with mock.patch.object(tg_client.get_session(), "post", return_value=FakeResponse()) as post:
+            results = [self.client.send_message("chat", f"m{i}") for i in range(3)]
+        self.assertTrue(all(r["ok"] for r in results))
+        self.assertEqual(post.call_count, 3)
+        self.assertEqual(self.clock.now, 1050)
+
+    def test_honors_retry_after_and_shares_cooldown(self):
+        responses = [FakeResponse(429, {"ok": False, "parameters": {"retry_after": 7}}), FakeResponse()]
+        with mock.patch.object(tg_client.get_session(), "post", side_effect=responses):
+            self.assertEqual(self.client.send_message("chat", "x"), {"ok": True})
+        self.assertEqual(self.clock.now, 1007)
+
+        self.limiter.set_cooldown("chat", 30)
+        other = TelegramClient("token", limiter=ChatRateLimiter(2, 60, clock=self.clock), sleep=self.clock.sleep)
+        with mock.patch.object(tg_client.get_session(), "post") as post:
+            result = other.send_message("chat", "y", max_wait=0)
+        post.assert_not_called()
+        self.assertEqual(result["retry_after"], 30)
+
+    def test_sync_path_uses_client(self):
+        TelegramSettings.objects.update_or_create(pk=1, defaults={"enabled": True, "bot_token": "t", "chat_id": "c"})
+        with mock.patch.object(tg_client.get_session(), "post", return_value=FakeResponse(400, {"description": "chat not found"})):
+            result = send_telegram_message_sync("hi")
+        self.assertEqual(result, {"ok": False, "error": "400 chat not found"})
@@ -0,0 +1,73 @@
+"""NotificationOutbox: digest qadoqlash va dispatcher holatlari."""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from notifications.models import NotificationOutbox, TelegramSettings
+from notifications.outbox import TELEGRAM_MESSAGE_LIMIT, dispatch_outbox, enqueue_notification, pack_digests
+
+
+class PackDigestsTests(TestCase):
+    def test_packs_up_to_limit_in_order(self):
+        items = [(i, "x" * 1000) for i in range(1, 10)]
+        digests = pack_digests(items)
+        self.assertEqual([pks for pks, _ in digests], [[1, 2, 3, 4], [5, 6, 7, 8], [9]])
+        self.assertTrue(all(len(text) <= TELEGRAM_MESSAGE_LIMIT for _, text in digests))
+
+    def test_oversized_message_is_truncated(self):
+        digests = pack_digests([(1, "y" * 5000), (2, "z")])
+        self.assertEqual(len(digests[0][1]), TELEGRAM_MESSAGE_LIMIT)
+        self.assertEqual(digests[1], ([2], "z"))
+
+
+@override_settings(NOTIFICATION_MAX_ATTEMPTS=2)
+class DispatchOutboxTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        TelegramSettings.objects.update_or_create(pk=1, defaults={"enabled": True, "bot_token": "t", "chat_id": "c"})
+        for i in range(300):
+            enqueue_notification(f"⏰ Kechikish: xodim {i} — {i % 60} daqiqa kechikdi.\n💰 Jarima: 1000 so'm.", kind="lateness")
+
+    def test_sends_digests_with_pauses(self):
+        sleep = mock.Mock()
+        with mock.patch("notifications.outbox.send_telegram_message_sync", return_value={"ok": True}) as send:
+            result = dispatch_outbox(interval=3, sleep=sleep)
+        self.assertEqual(result["messages"], 300)
+        self.assertLess(send.call_count, 20)
+        self.assertEqual(sleep.call_count, send.call_count - 1)
+        self.assertFalse(NotificationOutbox.objects.exclude(status="sent").exists())
+
+    def test_failure_keeps_rows_pending_then_fails(self):
+        with mock.patch("notifications.outbox.send_telegram_message_sync", return_value={"ok": False, "error": "429"}) as send:
+            dispatch_outbox(interval=0)
+            self.assertEqual(send.call_count, 1)  # birinchi xatodan keyin to'xtaydi
+            self.assertEqual(NotificationOutbox.objects.filter(status="pending").count(), 300)
+            result = dispatch_outbox(interval=0)
+        self.assertGreater(result["failed"], 0)
+        self.assertEqual(NotificationOutbox.objects.filter(status="failed").count(), result["failed"])
+
+    def test_not_configured_marks_skipped(self):
+        TelegramSettings.objects.filter(pk=1).update(enabled=False)
+        with mock.patch("notifications.outbox.send_telegram_message_sync") as send:
+            result = dispatch_outbox()
+        send.assert_not_called()
+        self.assertEqual(result["skipped"], 300)
+
+    def test_concurrent_dispatch_is_locked(self):
+        cache.add("notifications:outbox_dispatch_lock", 1)
+        self.assertEqual(dispatch_outbox()["reason"], "locked")
+
+    def test_expired_lock_taken_by_another_dispatcher_is_kept(self):
+        def send(*args, **kwargs):
+            # Lock muddati o'tdi va boshqa dispatcher uni oldi
+            cache.set("notifications:outbox_dispatch_lock", "other")
+            return {"ok": True}
+
+        with mock.patch("notifications.outbox.send_telegram_message_sync", side_effect=send):
+            dispatch_outbox(interval=0)
+        self.assertEqual(cache.get("notifications:outbox_dispatch_lock"), "other")
+        cache.delete("notifications:outbox_dispatch_lock")
+        with mock.patch("notifications.outbox.send_telegram_message_sync", return_value={"ok": True}):
+            dispatch_outbox(interval=0)
+        self.assertIsNone(cache.get("notifications:outbox_dispatch_lock"))
@@ -1,5 +1,4 @@
 """Telegram settings UI and test button."""
-import requests
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import TemplateView
 from django.shortcuts import redirect
@@ -8,6 +7,7 @@ from core.decorators import admin_required
 from django.utils.decorators import method_decorator
 from django.utils.translation import gettext
 
+from .client import TelegramClient
 from .models import TelegramSettings
 
 
@@ -27,13 +27,11 @@ class TelegramSettingsView(LoginRequiredMixin, TemplateView):
             if not telegram.bot_token or not telegram.chat_id:
                 messages.error(request, gettext("Avval Bot token va Chat ID ni kiriting."))
                 return redirect("notifications:telegram_settings")
-            url = f"https://api.telegram.org/bot{telegram.bot_token}/sendMessage"
-            try:
-                r = requests.post(url, json={"chat_id": telegram.chat_id, "text": "WorkTrack test message."}, timeout=10)
-                r.raise_for_status()
+            result = TelegramClient(telegram.bot_token).send_message(telegram.chat_id, "WorkTrack test message.", max_wait=0)
+            if result["ok"]:
                 messages.success(request, gettext("Test xabar yuborildi."))
-            except Exception as e:
-                messages.error(request, gettext("Xatolik: %(err)s") % {"err": e})
+            else:
+                messages.error(request, gettext("Xatolik: %(err)s") % {"err": result.get("error")})
             return redirect("notifications:telegram_settings")
 
         telegram.bot_token = request.POST.get("bot_token", "").strip()
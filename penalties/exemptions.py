@@ -0,0 +1,57 @@
+"""
+Jarimadan ozodlar indeksi: sana oralig'iga tegishli barcha PenaltyExemption lar bitta so'rov bilan
+yuklanadi va xodim bo'yicha tartiblangan intervallar ro'yxatiga aylantiriladi (bisect bilan qidiruv).
+Nightly/range recompute va jarima batchlarida har bir xodim-kun uchun alohida so'rov o'rniga ishlatiladi.
+"""
+from bisect import bisect_right
+from datetime import date
+
+from .models import PenaltyExemption
+
+
+class ExemptionIndex:
+    """Per-employee sorted, merged [date_from, date_to] intervals for one loaded date range."""
+
+    def __init__(self, start: date, end: date, intervals=None):
+        self.start = start
+        self.end = end
+        # employee_pk -> (starts, ends) — kesishmaydigan, tartiblangan intervallar
+        self._intervals = intervals or {}
+
+    @classmethod
+    def load(cls, start: date, end: date, employee_ids=None):
+        """[start, end] bilan kesishadigan barcha ozodlarni bitta so'rov bilan yuklaydi."""
+        qs = PenaltyExemption.objects.filter(date_from__lte=end, date_to__gte=start)
+        if employee_ids is not None:
+            qs = qs.filter(employee_id__in=list(employee_ids))
+        raw = {}
+        for employee_id, date_from, date_to in qs.order_by("employee_id", "date_from").values_list(
+            "employee_id", "date_from", "date_to"
+        ):
+            raw.setdefault(employee_id, []).append((date_from, date_to))
+        intervals = {}
+        for employee_id, items in raw.items():
+            starts, ends = [], []
+            for date_from, date_to in items:
+                if starts and date_from <= ends[-1]:
+                    if date_to > ends[-1]:
+                        ends[-1] = date_to
+                    continue
+                starts.append(date_from)
+                ends.append(date_to)
+            intervals[employee_id] = (starts, ends)
+        return cls(start, end, intervals)
+
+    def covers(self, day: date) -> bool:
+        return self.start <= day <= self.end
+
+    def intervals(self, employee_id):
+        """(starts, ends) — xodimning birlashtirilgan intervallari (vektorlashgan kalendarlar uchun)."""
+        return self._intervals.get(employee_id, ((), ()))
+
+    def is_exempt(self, employee_id, day: date) -> bool:
+        if not self.covers(day):
+            raise ValueError(f"{day} is outside loaded exemption range {self.start}..{self.end}")
+        starts, ends = self._intervals.get(employee_id, ((), ()))
+        i = bisect_right(starts, day) - 1
+        return i >= 0 and day <= ends[i]
@@ -1,6 +1,7 @@
 from django import forms
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from core.system_settings import get_setting
 from .models import PenaltyRule, Penalty, PenaltyExemption
 
 
@@ -55,6 +56,11 @@ class PenaltyRuleForm(forms.ModelForm):
             "is_active": forms.CheckboxInput(attrs={"class": CHECKBOX_CLASS}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.instance.pk:
+            self.fields["amount_per_unit"].initial = get_setting("default_penalty_per_minute")
+
 
 class ManualPenaltyForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
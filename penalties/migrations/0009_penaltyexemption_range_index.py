@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_add_penalty_exemption'),
+        ('penalties', '0008_penaltydecisionlog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='penaltyexemption',
+            index=models.Index(fields=['employee', 'date_from', 'date_to'], name='exemption_emp_range_idx'),
+        ),
+    ]
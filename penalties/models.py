@@ -201,6 +201,9 @@ class PenaltyExemption(models.Model):
 
     class Meta:
         ordering = ["-date_from"]
+        indexes = [
+            models.Index(fields=["employee", "date_from", "date_to"], name="exemption_emp_range_idx"),
+        ]
         verbose_name = _("Jarimadan ozod")
         verbose_name_plural = _("Jarimadan ozodlar")
 
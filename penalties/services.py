@@ -1,13 +1,22 @@
 """Apply penalty from active rule for a lateness record."""
 from decimal import Decimal
+from django.db import transaction
 from django.db.models import Q, Sum
 from django.utils.translation import gettext as _
 
+from core import metrics
+
+from .exemptions import ExemptionIndex
 from .models import PenaltyRule, Penalty, PenaltyExemption, PenaltyDecisionLog
 
 
-def is_penalty_exempt(employee, date):
-    """Shu xodim va sana uchun jarimadan ozod bormi."""
+def is_penalty_exempt(employee, date, exemptions=None):
+    """
+    Shu xodim va sana uchun jarimadan ozod bormi.
+    exemptions: oldindan yuklangan ExemptionIndex (batchlarda) — bo'lsa so'rov yuborilmaydi.
+    """
+    if exemptions is not None and exemptions.covers(date):
+        return exemptions.is_exempt(employee.pk, date)
     return PenaltyExemption.objects.filter(
         employee=employee,
         date_from__lte=date,
@@ -37,49 +46,56 @@ def resolve_penalty_rule_for_employee(employee):
     )
 
 
-def apply_penalty_for_lateness(lateness_record):
+def apply_penalty_for_lateness(lateness_record, exemptions=None):
     """
     Apply penalty for a lateness record using resolved active rule for employee's department (or global).
     Kunlik maksimum (max_amount_per_day) dan oshmasligi uchun cheklanadi.
     Sababli (ta'til, kasallik, ruxsat) ozod bo'lgan kunlarda jarima yozilmaydi.
+    exemptions: ixtiyoriy ExemptionIndex (batch uchun).
     Returns created Penalty or None.
     """
-    rule = resolve_penalty_rule_for_employee(lateness_record.employee)
-    if not rule:
-        PenaltyDecisionLog.objects.create(
-            employee=lateness_record.employee,
-            lateness_record=lateness_record,
-            date=lateness_record.date,
-            decision=PenaltyDecisionLog.DECISION_SKIPPED,
-            reason_code="no_active_rule",
-            details="No active rule found for employee department/global.",
-        )
-        return None
+    return apply_penalties_for_latenesses([lateness_record], exemptions=exemptions).get(lateness_record.pk)
 
-    # Avoid duplicate penalty for the same lateness
-    if Penalty.objects.filter(lateness_record=lateness_record).exists():
-        PenaltyDecisionLog.objects.create(
-            employee=lateness_record.employee,
-            lateness_record=lateness_record,
-            date=lateness_record.date,
-            decision=PenaltyDecisionLog.DECISION_SKIPPED,
-            reason_code="already_penalized",
-            details="Penalty already exists for this lateness record.",
-        )
-        return None
 
+class _RuleIndex:
+    """Faol qoidalar bitta so'rov bilan: resolve_penalty_rule_for_employee bilan bir xil tanlov, xotirada."""
+
+    def __init__(self):
+        self.by_department = {}
+        self.global_rule = None
+        for rule in PenaltyRule.objects.filter(is_active=True).order_by("pk"):
+            dept = (rule.department or "").strip().lower()
+            if dept:
+                self.by_department.setdefault(dept, rule)
+            elif self.global_rule is None and not rule.department:
+                self.global_rule = rule
+
+    def resolve(self, employee):
+        dept = (getattr(employee, "department", None) or "").strip().lower()
+        return self.by_department.get(dept) if dept and dept in self.by_department else self.global_rule
+
+
+def _decide(lateness_record, rule, already_penalized, exempt, day_total):
+    """
+    Bitta kechikish uchun qaror (so'rovsiz): (decision, reason_code, details, penalty yoki None).
+    Penalty hali saqlanmagan obyekt.
+    """
+    if not rule:
+        return PenaltyDecisionLog.DECISION_SKIPPED, "no_active_rule", "No active rule found for employee department/global.", None
+    # Avoid duplicate penalty for the same lateness
+    if already_penalized:
+        return PenaltyDecisionLog.DECISION_SKIPPED, "already_penalized", "Penalty already exists for this lateness record.", None
     # Sababli jarima yozilmasin: shu kun uchun ozod mavjud bo'lsa
-    if is_penalty_exempt(lateness_record.employee, lateness_record.date):
-        PenaltyDecisionLog.objects.create(
-            employee=lateness_record.employee,
-            lateness_record=lateness_record,
-            date=lateness_record.date,
-            decision=PenaltyDecisionLog.DECISION_SKIPPED,
-            reason_code="penalty_exempt",
-            details="Employee has penalty exemption for this date.",
-        )
-        return None
+    if exempt:
+        return PenaltyDecisionLog.DECISION_SKIPPED, "penalty_exempt", "Employee has penalty exemption for this date.", None
 
+    common = {
+        "employee": lateness_record.employee,
+        "rule": rule,
+        "lateness_record": lateness_record,
+        "penalty_date": lateness_record.date,
+        "is_manual": False,
+    }
     # Oylikdan foiz: faqat foiz yoziladi (1% yoki 2%), summa buqalter oy oxirida hisoblaydi
     if rule.rule_type == "percent_of_salary":
         threshold = int(rule.threshold_minutes) if rule.threshold_minutes else 30
@@ -87,26 +103,13 @@ def apply_penalty_for_lateness(lateness_record):
             penalty_percent = rule.percent_if_late_le_threshold or Decimal("1")
         else:
             penalty_percent = rule.percent_if_late_gt_threshold or Decimal("2")
-        penalty = Penalty.objects.create(
-            employee=lateness_record.employee,
+        penalty = Penalty(
             amount=Decimal("0"),
             penalty_percent=penalty_percent,
-            rule=rule,
-            lateness_record=lateness_record,
-            penalty_date=lateness_record.date,
             reason=_("Kechikish %(min)s daq — oylikdan %(p)s%%") % {"min": lateness_record.minutes_late, "p": penalty_percent},
-            is_manual=False,
-        )
-        PenaltyDecisionLog.objects.create(
-            employee=lateness_record.employee,
-            lateness_record=lateness_record,
-            date=lateness_record.date,
-            decision=PenaltyDecisionLog.DECISION_CREATED,
-            reason_code="percent_of_salary",
-            details=f"Created percent penalty {penalty_percent}%.",
-            penalty=penalty,
+            **common,
         )
-        return penalty
+        return PenaltyDecisionLog.DECISION_CREATED, "percent_of_salary", f"Created percent penalty {penalty_percent}%.", penalty
 
     if rule.rule_type == "per_minute":
         amount = Decimal(lateness_record.minutes_late) * rule.amount_per_unit
@@ -116,53 +119,82 @@ def apply_penalty_for_lateness(lateness_record):
         amount = rule.amount_per_unit or Decimal("0")
 
     if amount <= 0:
-        PenaltyDecisionLog.objects.create(
-            employee=lateness_record.employee,
-            lateness_record=lateness_record,
-            date=lateness_record.date,
-            decision=PenaltyDecisionLog.DECISION_SKIPPED,
-            reason_code="non_positive_amount",
-            details=f"Computed amount is non-positive: {amount}.",
-        )
-        return None
+        return PenaltyDecisionLog.DECISION_SKIPPED, "non_positive_amount", f"Computed amount is non-positive: {amount}.", None
 
     if rule.max_amount_per_day is not None and rule.max_amount_per_day > 0:
-        existing_total = (
-            Penalty.objects.filter(
-                employee=lateness_record.employee,
-                penalty_date=lateness_record.date,
-            ).aggregate(s=Sum("amount"))["s"]
-            or Decimal("0")
-        )
-        remaining = rule.max_amount_per_day - existing_total
+        remaining = rule.max_amount_per_day - day_total
         if remaining <= 0:
-            PenaltyDecisionLog.objects.create(
-                employee=lateness_record.employee,
-                lateness_record=lateness_record,
-                date=lateness_record.date,
-                decision=PenaltyDecisionLog.DECISION_SKIPPED,
-                reason_code="daily_cap_reached",
-                details=f"Remaining daily cap is {remaining}.",
-            )
-            return None
+            return PenaltyDecisionLog.DECISION_SKIPPED, "daily_cap_reached", f"Remaining daily cap is {remaining}.", None
         amount = min(amount, remaining)
 
-    penalty = Penalty.objects.create(
-        employee=lateness_record.employee,
+    penalty = Penalty(
         amount=amount,
-        rule=rule,
-        lateness_record=lateness_record,
-        penalty_date=lateness_record.date,
         reason=_("Late %(min)s min on %(date)s") % {"min": lateness_record.minutes_late, "date": lateness_record.date},
-        is_manual=False,
+        **common,
     )
-    PenaltyDecisionLog.objects.create(
-        employee=lateness_record.employee,
-        lateness_record=lateness_record,
-        date=lateness_record.date,
-        decision=PenaltyDecisionLog.DECISION_CREATED,
-        reason_code="amount_penalty",
-        details=f"Created amount penalty {amount}.",
-        penalty=penalty,
+    return PenaltyDecisionLog.DECISION_CREATED, "amount_penalty", f"Created amount penalty {amount}.", penalty
+
+
+def apply_penalties_for_latenesses(lateness_records, exemptions=None):
+    """
+    apply_penalty_for_lateness ning batch varianti — qarorlar bir xil, so'rovlar soni yozuvlar soniga bog'liq emas:
+    faol qoidalar, mavjud jarimalar, ozodlar va kunlik yig'indilar bittadan so'rov bilan yuklanadi,
+    Penalty va PenaltyDecisionLog qatorlari bulk_create bilan yoziladi.
+    lateness_records: employee bilan (select_related) yozuvlar. Returns {lateness_pk: yaratilgan Penalty}.
+    """
+    records = list(lateness_records)
+    if not records:
+        return {}
+    rules = _RuleIndex()
+    penalized = set(
+        Penalty.objects.filter(lateness_record__in=[r.pk for r in records])
+        .order_by()
+        .values_list("lateness_record_id", flat=True)
     )
-    return penalty
+    days = [r.date for r in records]
+    if exemptions is None or not (exemptions.covers(min(days)) and exemptions.covers(max(days))):
+        exemptions = ExemptionIndex.load(min(days), max(days), employee_ids={r.employee_id for r in records})
+    day_totals = {}
+    if any(rule.max_amount_per_day for rule in [rules.global_rule, *rules.by_department.values()] if rule):
+        day_totals = {
+            (row["employee_id"], row["penalty_date"]): row["s"] or Decimal("0")
+            for row in Penalty.objects.filter(employee_id__in={r.employee_id for r in records}, penalty_date__in=set(days))
+            .values("employee_id", "penalty_date")
+            .annotate(s=Sum("amount"))
+            .order_by()
+        }
+
+    created = {}
+    logs = []
+    for record in records:
+        key = (record.employee_id, record.date)
+        rule = rules.resolve(record.employee)
+        decision, reason_code, details, penalty = _decide(
+            record,
+            rule,
+            record.pk in penalized,
+            exemptions.is_exempt(record.employee_id, record.date),
+            day_totals.get(key, Decimal("0")),
+        )
+        if penalty is not None:
+            created[record.pk] = penalty
+            penalized.add(record.pk)
+            day_totals[key] = day_totals.get(key, Decimal("0")) + penalty.amount
+        logs.append(
+            PenaltyDecisionLog(
+                employee=record.employee,
+                lateness_record=record,
+                date=record.date,
+                decision=decision,
+                reason_code=reason_code,
+                details=details,
+                penalty=penalty,
+            )
+        )
+
+    with transaction.atomic():
+        Penalty.objects.bulk_create(created.values())
+        PenaltyDecisionLog.objects.bulk_create(logs)
+    for penalty in created.values():
+        metrics.PENALTIES_CREATED.inc(rule_type=penalty.rule.rule_type)
+    return created
@@ -0,0 +1,50 @@
+"""ExemptionIndex: bitta so'rov bilan yuklash va bisect qidiruvi."""
+from datetime import date, time
+
+from django.test import TestCase
+
+from employees.models import Employee
+from penalties.exemptions import ExemptionIndex
+from penalties.models import PenaltyExemption
+from penalties.services import is_penalty_exempt
+
+
+class ExemptionIndexTests(TestCase):
+    def setUp(self):
+        self.emp = Employee.objects.create(
+            employee_id="EX001",
+            first_name="A",
+            last_name="B",
+            work_start_time=time(9, 0),
+            work_end_time=time(18, 0),
+        )
+        self.other = Employee.objects.create(
+            employee_id="EX002",
+            first_name="C",
+            last_name="D",
+            work_start_time=time(9, 0),
+            work_end_time=time(18, 0),
+        )
+        for d_from, d_to in [
+            (date(2026, 5, 1), date(2026, 5, 3)),
+            (date(2026, 5, 2), date(2026, 5, 5)),  # kesishadi — birlashtiriladi
+            (date(2026, 5, 10), date(2026, 5, 10)),
+            (date(2026, 4, 1), date(2026, 4, 2)),  # oraliqdan tashqarida
+        ]:
+            PenaltyExemption.objects.create(employee=self.emp, date_from=d_from, date_to=d_to)
+
+    def test_matches_queryset_lookup(self):
+        with self.assertNumQueries(1):
+            index = ExemptionIndex.load(date(2026, 5, 1), date(2026, 5, 31))
+        for day in range(1, 32):
+            d = date(2026, 5, day)
+            for emp in (self.emp, self.other):
+                with self.assertNumQueries(0):
+                    got = is_penalty_exempt(emp, d, exemptions=index)
+                self.assertEqual(got, is_penalty_exempt(emp, d), f"{emp.employee_id} {d}")
+
+    def test_outside_range_falls_back_to_query(self):
+        index = ExemptionIndex.load(date(2026, 5, 1), date(2026, 5, 31))
+        self.assertFalse(index.covers(date(2026, 4, 1)))
+        with self.assertNumQueries(1):
+            self.assertTrue(is_penalty_exempt(self.emp, date(2026, 4, 1), exemptions=index))
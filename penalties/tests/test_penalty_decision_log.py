@@ -55,3 +55,43 @@ class PenaltyDecisionLogTests(TestCase):
         self.assertEqual(log.decision, PenaltyDecisionLog.DECISION_CREATED)
         self.assertEqual(log.reason_code, "amount_penalty")
         self.assertEqual(log.penalty_id, p.id)
+
+    def test_batch_matches_single_decisions(self):
+        from attendance.models import LatenessRecord as LR
+        from penalties.models import Penalty, PenaltyExemption
+        from penalties.services import apply_penalties_for_latenesses
+
+        PenaltyRule.objects.create(
+            name="IT per minute",
+            rule_type="per_minute",
+            amount_per_unit=Decimal("1000"),
+            max_amount_per_day=Decimal("15000"),
+            is_active=True,
+            department="it",
+        )
+        self.emp.department = "IT"
+        self.emp.save()
+        exempt = Employee.objects.create(
+            employee_id="EMP901", first_name="A", last_name="B", work_start_time=time(9, 0), work_end_time=time(18, 0)
+        )
+        PenaltyRule.objects.create(name="Global fixed", rule_type="fixed", amount_per_unit=Decimal("500"), is_active=True)
+        day = date(2026, 4, 17)
+        PenaltyExemption.objects.create(employee=exempt, date_from=day, date_to=day)
+        common = {"date": day, "check_in_time": "2026-04-17T09:10:00+05:00", "expected_start": time(9, 0)}
+        first = LR.objects.create(employee=self.emp, minutes_late=10, **common)
+        capped = LR.objects.create(employee=self.emp, minutes_late=10, **common)
+        skipped = LR.objects.create(employee=exempt, minutes_late=10, **common)
+
+        records = list(LR.objects.filter(date=day).select_related("employee"))
+        # qoidalar, mavjud jarimalar, ozodlar, kunlik yig'indi, savepoint ichida 2 ta bulk INSERT
+        with self.assertNumQueries(8):
+            created = apply_penalties_for_latenesses(records)
+        self.assertEqual(created[first.pk].amount, Decimal("10000"))
+        self.assertEqual(created[capped.pk].amount, Decimal("5000"))  # kunlik maksimumgacha
+        self.assertNotIn(skipped.pk, created)
+        reasons = dict(PenaltyDecisionLog.objects.filter(date=day).values_list("lateness_record_id", "reason_code"))
+        self.assertEqual(reasons[skipped.pk], "penalty_exempt")
+        self.assertEqual(Penalty.objects.get(lateness_record=capped).rule.name, "IT per minute")
+
+        # Takroriy chaqiruv — "already_penalized", yangi jarima yo'q
+        self.assertEqual(apply_penalties_for_latenesses(LR.objects.filter(date=day).select_related("employee")), {})
@@ -0,0 +1,240 @@
+"""
+Yopilgan oylar uchun ustunli davomat snapshotlari. Har bir oy — alohida katalog, unda tiplangan NumPy ustunlari
+(.npy: employee, day, status, minutes_late, working_minutes) va meta.json. .npz (zip) ichidagi massivlarni
+memory-map qilib bo'lmaydi, shuning uchun ustunlar alohida .npy fayllarda — np.load(mmap_mode="r") bilan
+faqat kerakli sahifalar o'qiladi. Yil bo'yi analitika yopilgan oylarni snapshotdan, faqat ochiq (joriy) oyni
+va snapshoti yo'q oylarni DB dan oladi. Snapshotlar har kecha yangilanadi: oy bo'yicha (qatorlar soni,
+oxirgi updated_at) bitta GROUP BY bilan olinadi va faqat o'zgargan oylar qayta yoziladi.
+"""
+import json
+import logging
+import os
+import shutil
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db.models import Count, Max
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from attendance.models import DailySummary
+from employees.models import Employee
+
+from .matrix import month_bounds
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+# status kodi = ro'yxatdagi indeks
+STATUS_ORDER = [
+    DailySummary.STATUS_PRESENT,
+    DailySummary.STATUS_LATE,
+    DailySummary.STATUS_ABSENT,
+    DailySummary.STATUS_LEAVE,
+]
+COLUMN_DTYPES = {
+    "employee": np.int64,
+    "day": np.int8,
+    "status": np.int8,
+    "minutes_late": np.int32,
+    "working_minutes": np.int32,
+}
+
+
+def _root(root=None) -> Path:
+    return Path(root or settings.ATTENDANCE_SNAPSHOT_DIR)
+
+
+def month_dir(year: int, month: int, root=None) -> Path:
+    return _root(root) / f"{year:04d}-{month:02d}"
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _previous_month(day: date) -> date:
+    return (day.replace(day=1) - timedelta(days=1)).replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def iter_months(start: date, end: date):
+    current = _month_start(start)
+    while current <= end:
+        yield current
+        current = _next_month(current)
+
+
+def is_closed_month(year: int, month: int, today=None) -> bool:
+    today = today or timezone.localdate()
+    return date(year, month, 1) < _month_start(today)
+
+
+def _frame_from_rows(rows):
+    frame = pd.DataFrame.from_records(
+        list(rows), columns=["employee", "date", "status", "minutes_late", "working_minutes"]
+    )
+    codes = {status: code for code, status in enumerate(STATUS_ORDER)}
+    frame["status"] = frame["status"].map(codes).fillna(STATUS_ORDER.index(DailySummary.STATUS_ABSENT))
+    frame["date"] = pd.to_datetime(frame["date"])
+    return frame.astype({name: dtype for name, dtype in COLUMN_DTYPES.items() if name in frame})
+
+
+def _db_frame(start: date, end: date):
+    rows = (
+        DailySummary.objects.filter(date__gte=start, date__lte=end)
+        .order_by()
+        .values_list("employee_id", "date", "status", "minutes_late", "working_minutes")
+    )
+    return _frame_from_rows(rows)
+
+
+def month_stamps(start: date, end: date):
+    """{oy boshi: (qatorlar, oxirgi updated_at isoformat)} — bitta GROUP BY so'rovi."""
+    rows = (
+        DailySummary.objects.filter(date__gte=start, date__lte=end)
+        .annotate(month=TruncMonth("date"))
+        .values("month")
+        .annotate(n=Count("id"), modified=Max("updated_at"))
+        .order_by()
+    )
+    return {row["month"]: (row["n"], row["modified"].isoformat() if row["modified"] else None) for row in rows}
+
+
+def write_month_snapshot(year: int, month: int, stamp=None, root=None) -> int:
+    """Oyni ustunli snapshotga yozadi (atomar: vaqtinchalik katalog + rename). Returns qatorlar soni."""
+    start, end = month_bounds(year, month)
+    frame = _db_frame(start, end).sort_values(["employee", "date"])
+    if stamp is None:
+        stamp = month_stamps(start, end).get(start, (0, None))
+    target = month_dir(year, month, root)
+    tmp = target.with_name(target.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    columns = {
+        "employee": frame["employee"].to_numpy(),
+        "day": frame["date"].dt.day.to_numpy(),
+        "status": frame["status"].to_numpy(),
+        "minutes_late": frame["minutes_late"].to_numpy(),
+        "working_minutes": frame["working_minutes"].to_numpy(),
+    }
+    for name, dtype in COLUMN_DTYPES.items():
+        np.save(tmp / f"{name}.npy", np.ascontiguousarray(columns[name], dtype=dtype))
+    meta = {
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "month": f"{year:04d}-{month:02d}",
+        "rows": int(stamp[0]),
+        "modified": stamp[1],
+        "written_at": timezone.now().isoformat(),
+    }
+    with open(tmp / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    old = target.with_name(target.name + ".old")
+    shutil.rmtree(old, ignore_errors=True)
+    if target.exists():
+        os.replace(target, old)
+    os.replace(tmp, target)
+    shutil.rmtree(old, ignore_errors=True)
+    return len(frame)
+
+
+def read_meta(year: int, month: int, root=None):
+    try:
+        with open(month_dir(year, month, root) / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == SNAPSHOT_FORMAT_VERSION else None
+
+
+def load_month(year: int, month: int, root=None):
+    """{ustun: np.memmap} yoki snapshot bo'lmasa None. Massivlar faqat o'qish uchun."""
+    if read_meta(year, month, root) is None:
+        return None
+    directory = month_dir(year, month, root)
+    try:
+        return {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in COLUMN_DTYPES}
+    except (OSError, ValueError):
+        logger.warning("Snapshot o'qilmadi, DB ishlatiladi: %s", directory)
+        return None
+
+
+def refresh_snapshots(months: int = None, today=None, root=None):
+    """
+    Oxirgi `months` ta yopilgan oy: snapshoti yo'q yoki (qatorlar soni, oxirgi updated_at) o'zgarganlarini qayta yozadi.
+    Returns yozilgan oylar ro'yxati (YYYY-MM).
+    """
+    today = today or timezone.localdate()
+    months = months or settings.ATTENDANCE_SNAPSHOT_MONTHS
+    open_month = _month_start(today)
+    first = open_month
+    for _ in range(months):
+        first = _previous_month(first)
+    last_closed_day = open_month - timedelta(days=1)
+    stamps = month_stamps(first, last_closed_day)
+    written = []
+    for month_start in iter_months(first, last_closed_day):
+        stamp = stamps.get(month_start, (0, None))
+        meta = read_meta(month_start.year, month_start.month, root)
+        if meta is not None and (meta["rows"], meta["modified"]) == stamp:
+            continue
+        write_month_snapshot(month_start.year, month_start.month, stamp=stamp, root=root)
+        written.append(f"{month_start.year:04d}-{month_start.month:02d}")
+    return written
+
+
+def load_attendance(start: date, end: date, today=None, root=None):
+    """
+    [start, end] dagi DailySummary ustunlari DataFrame sifatida: employee, date, status (kod), minutes_late,
+    working_minutes. Yopilgan oylar snapshotdan (DB so'rovisiz), qolganlari — har bir oy uchun bitta so'rov.
+    """
+    parts = []
+    for month_start in iter_months(start, end):
+        month_end = month_bounds(month_start.year, month_start.month)[1]
+        lo, hi = max(start, month_start), min(end, month_end)
+        columns = None
+        if is_closed_month(month_start.year, month_start.month, today):
+            columns = load_month(month_start.year, month_start.month, root)
+        if columns is None:
+            parts.append(_db_frame(lo, hi))
+            continue
+        mask = (columns["day"] >= lo.day) & (columns["day"] <= hi.day)
+        frame = pd.DataFrame({name: np.asarray(columns[name][mask]) for name in COLUMN_DTYPES})
+        base = np.datetime64(month_start, "D")
+        frame.insert(1, "date", pd.to_datetime(base + (frame.pop("day").to_numpy().astype("int64") - 1)))
+        parts.append(frame)
+    if not parts:
+        return _frame_from_rows([])
+    return pd.concat(parts, ignore_index=True)
+
+
+def department_monthly_summary(start: date, end: date, today=None, root=None):
+    """
+    Oy × bo'lim bo'yicha ko'rsatkichlar (kechikish trendi, bo'limlarni solishtirish):
+    employee_days, late_days, absent_days, minutes_late, working_minutes, late_rate (%).
+    Bo'lim — xodimning joriy bo'limi (hisobotlardagi kabi).
+    """
+    frame = load_attendance(start, end, today=today, root=root)
+    columns = ["month", "department", "employee_days", "late_days", "absent_days", "minutes_late", "working_minutes", "late_rate"]
+    if frame.empty:
+        return pd.DataFrame(columns=columns)
+    departments = dict(Employee.objects.values_list("pk", "department"))
+    frame["department"] = frame["employee"].map(departments).fillna("").replace("", "—")
+    frame["month"] = frame["date"].dt.strftime("%Y-%m")
+    frame["late"] = frame["status"] == STATUS_ORDER.index(DailySummary.STATUS_LATE)
+    frame["absent"] = frame["status"] == STATUS_ORDER.index(DailySummary.STATUS_ABSENT)
+    grouped = frame.groupby(["month", "department"]).agg(
+        employee_days=("employee", "size"),
+        late_days=("late", "sum"),
+        absent_days=("absent", "sum"),
+        minutes_late=("minutes_late", "sum"),
+        working_minutes=("working_minutes", "sum"),
+    ).reset_index()
+    grouped["late_rate"] = (100 * grouped["late_days"] / grouped["employee_days"]).round(1)
+    return grouped[columns]
@@ -0,0 +1,89 @@
+"""
+Hisobot va eksportlar uchun shartli GET (ETag / Last-Modified).
+Har bir hisobot doirasi (jadval + sana oralig'i) uchun arzon "ma'lumot versiyasi" bitta aggregate so'rov bilan
+olinadi: qatorlar soni, oxirgi o'zgarish vaqti va o'zgaradigan ustun yig'indisi. Bunga xodim/qoida
+o'zgarishlarida oshiriladigan umumiy versiya hisoblagichi qo'shiladi (hisobotda ularning nomlari ko'rinadi).
+Hisoblagich faqat umumiy kesh (REDIS_CACHE_URL) bilan barcha workerlarga yetadi — LocMemCache da stampni
+o'zgartirmaydigan tahrirlar (jarima sababi, qoida) boshqa workerlarda 304 qaytaraveradi (core.checks ogohlantiradi).
+Mos kelgan so'rov hisobot so'rovini bajarmasdan va workbookni qayta yasamasdan 304 oladi.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.utils import translation
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from attendance.models import DailySummary, LatenessRecord
+from core.cache_versions import bump_version, get_version
+from penalties.models import Penalty
+
+VERSION_CACHE_KEY = "reports_data_version"
+
+
+def bump_reports_version():
+    """Xodim, jarima qoidasi kabi bog'liq ma'lumot o'zgarganda (signal) — barcha hisobot ETaglari eskiradi."""
+    bump_version(VERSION_CACHE_KEY)
+
+
+# doira -> (queryset yasovchi, oxirgi o'zgarish ustuni, o'zgaradigan ustun)
+SCOPES = {
+    "attendance": (lambda s, e: DailySummary.objects.filter(date__gte=s, date__lte=e), "updated_at", "working_minutes"),
+    "lateness": (lambda s, e: LatenessRecord.objects.filter(date__gte=s, date__lte=e), "created_at", "minutes_late"),
+    "penalty": (lambda s, e: Penalty.objects.filter(penalty_date__gte=s, penalty_date__lte=e), "created_at", "amount"),
+}
+
+
+def data_stamp(scope: str, start, end):
+    """(etag_source, last_modified) — bitta aggregate so'rov."""
+    build, modified_field, value_field = SCOPES[scope]
+    row = build(start, end).aggregate(n=Count("id"), modified=Max(modified_field), total=Sum(value_field), top=Max("id"))
+    source = f"{row['n']}|{row['modified']}|{row['total']}|{row['top']}|{get_version(VERSION_CACHE_KEY)}"
+    # created_at tahrirda o'zgarmaydi — Last-Modified faqat haqiqiy updated_at bo'lsa (aks holda faqat ETag)
+    return source, row["modified"] if modified_field == "updated_at" else None
+
+
+class ConditionalReportMixin:
+    """
+    View mixin: conditional_scope va report_dates(request) -> (start, end) ni belgilang.
+    ETag foydalanuvchi va tilni ham o'z ichiga oladi (sahifada menyu va tarjimalar bor).
+    """
+    conditional_scope = None
+    etag_per_user = True
+
+    def report_dates(self, request):
+        raise NotImplementedError
+
+    def conditional_extra(self, request):
+        """Sana oralig'idan tashqari natijaga ta'sir qiluvchi parametrlar (masalan bo'lim filtri)."""
+        return ""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or not request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        start, end = self.report_dates(request)
+        source, last_modified = data_stamp(self.conditional_scope, start, end)
+        parts = [
+            self.conditional_scope,
+            start.isoformat(),
+            end.isoformat(),
+            source,
+            self.conditional_extra(request),
+            translation.get_language() or "",
+            str(settings.REPORTS_ETAG_VERSION),
+        ]
+        if self.etag_per_user:
+            parts.append(str(request.user.pk))
+        etag = quote_etag(hashlib.md5("|".join(parts).encode("utf-8")).hexdigest())
+        last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified_ts)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified_ts is not None:
+                response["Last-Modified"] = http_date(last_modified_ts)
+            # Brauzer har safar qayta tekshiradi (eskirgan hisobot ko'rsatilmaydi), lekin tana faqat o'zgarganda keladi
+            response["Cache-Control"] = "private, no-cache"
+        return response
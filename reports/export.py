@@ -6,6 +6,7 @@ from typing import Optional
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment
 from attendance.models import DailySummary, LatenessRecord, AttendanceLog
+from core.date_range import datetime_bounds
 from penalties.models import Penalty
 
 
@@ -96,7 +97,8 @@ def export_attendance_logs_excel(
     for col, h in enumerate(headers, 1):
         ws.cell(row=1, column=col, value=h)
         ws.cell(row=1, column=col).font = Font(bold=True)
-    qs = AttendanceLog.objects.filter(timestamp__date__gte=start, timestamp__date__lte=end).select_related("employee")
+    dt_from, dt_to = datetime_bounds(start, end)
+    qs = AttendanceLog.objects.filter(timestamp__gte=dt_from, timestamp__lt=dt_to).select_related("employee")
     if employee_id:
         qs = qs.filter(employee__employee_id=employee_id)
     if event_type:
@@ -0,0 +1,46 @@
+"""
+Tarixiy kunlar uchun ReconciliationSnapshot qatorlarini yozish (nightly task faqat oxirgi
+RECONCILIATION_SNAPSHOT_DAYS kunni qayta yozadi). Oraliq bloklarga bo'linadi — har bir blok 4 ta so'rov.
+
+Ishlatish:
+  python manage.py backfill_reconciliation_snapshots --from 2025-01-01 --to 2025-12-31
+  python manage.py backfill_reconciliation_snapshots --from 2025-01-01 --to 2025-12-31 --block 31
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from reports.reconciliation import write_snapshots
+
+
+class Command(BaseCommand):
+    help = "Oraliq uchun reconciliation snapshotlarini bloklab yozadi (yopilgan kunlar, bugungacha)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", required=True, help="Boshlanish sanasi (YYYY-MM-DD)")
+        parser.add_argument("--to", dest="date_to", default="", help="Tugash sanasi (default: kecha)")
+        parser.add_argument("--block", type=int, default=31, help="Bir blokdagi kunlar soni (default: 31)")
+
+    def handle(self, *args, **options):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        try:
+            start = date.fromisoformat(options["date_from"])
+            end = date.fromisoformat(options["date_to"]) if options["date_to"] else yesterday
+        except ValueError:
+            raise CommandError("--from va --to YYYY-MM-DD formatida bo'lishi kerak.")
+        # Bugun hali yopilmagan — range_metrics uni baribir jonli hisoblaydi
+        end = min(end, yesterday)
+        if start > end:
+            raise CommandError("--from sanasi --to (yoki kecha) dan keyin bo'lmasligi kerak.")
+        block = max(1, options["block"])
+
+        total = 0
+        block_start = start
+        while block_start <= end:
+            block_end = min(end, block_start + timedelta(days=block - 1))
+            written = write_snapshots(block_start, block_end)
+            total += written
+            self.stdout.write(f"  {block_start} — {block_end}: {written} kun")
+            block_start = block_end + timedelta(days=1)
+        self.stdout.write(self.style.SUCCESS(f"Tugadi: {total} kun snapshoti yozildi ({start} — {end})."))
@@ -0,0 +1,153 @@
+"""
+Oylik davomat matritsasi: qatorlar — xodimlar, ustunlar — oy kunlari, katakda holat kodi va kechikish daqiqasi.
+Butun oy bitta DailySummary.values_list so'rovi bilan olinadi va pandas pivot bilan yig'iladi
+(5000 xodim × 31 kun ham bir necha yuz ms). HTML kataklari va Excel qatorlari shu jadvaldan yasaladi.
+"""
+import calendar
+from dataclasses import dataclass
+from datetime import date
+from io import BytesIO
+
+import pandas as pd
+from django.utils.safestring import mark_safe
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from attendance.models import DailySummary
+
+STATUSES = [
+    DailySummary.STATUS_PRESENT,
+    DailySummary.STATUS_LATE,
+    DailySummary.STATUS_ABSENT,
+    DailySummary.STATUS_LEAVE,
+]
+# Katak kodi: kechikkan kunda kodga daqiqa qo'shiladi (K15)
+STATUS_CODES = {
+    DailySummary.STATUS_PRESENT: "+",
+    DailySummary.STATUS_LATE: "K",
+    DailySummary.STATUS_ABSENT: "Y",
+    DailySummary.STATUS_LEAVE: "R",
+}
+STATUS_CSS = {
+    DailySummary.STATUS_PRESENT: "bg-emerald-50 text-emerald-800",
+    DailySummary.STATUS_LATE: "bg-amber-100 text-amber-900",
+    DailySummary.STATUS_ABSENT: "bg-rose-100 text-rose-800",
+    DailySummary.STATUS_LEAVE: "bg-sky-50 text-sky-800",
+}
+COLUMNS = ["pk", "employee_id", "first_name", "last_name", "department", "date", "status", "minutes_late"]
+
+
+def month_bounds(year: int, month: int):
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+@dataclass
+class AttendanceMatrix:
+    start: date
+    end: date
+    days: list
+    employees: pd.DataFrame  # index: employee pk; employee_id, name, department, jami ustunlari
+    statuses: pd.DataFrame  # index: employee pk; ustunlar: kun raqami; qiymat: status yoki ""
+    labels: pd.DataFrame  # xuddi shu shakl; katak matni
+
+    def __len__(self):
+        return len(self.employees)
+
+    def html_rows(self, limit=None):
+        """Shablon uchun qatorlar: xodim ustunlari + tayyor (xavfsiz) kun kataklari HTMLi."""
+        employees = self.employees if limit is None else self.employees.iloc[:limit]
+        if employees.empty:
+            return []
+        statuses = self.statuses.loc[employees.index]
+        labels = self.labels.loc[employees.index]
+        css = statuses.apply(lambda col: col.map(STATUS_CSS).fillna(""))
+        cells = '<td class="px-1 py-1 text-center text-xs border-l border-slate-100 ' + css + '">' + labels + "</td>"
+        joined = cells.agg("".join, axis=1)
+        rows = []
+        for pk, emp in employees.iterrows():
+            rows.append({
+                "pk": pk,
+                "employee_id": emp["employee_id"],
+                "name": emp["name"],
+                "department": emp["department"],
+                "cells": mark_safe(joined[pk]),
+                "totals": [emp[status] for status in STATUSES],
+                "minutes_late": emp["minutes_late_total"],
+            })
+        return rows
+
+
+def build_attendance_matrix(year: int, month: int, department: str | None = None) -> AttendanceMatrix:
+    start, end = month_bounds(year, month)
+    days = list(range(1, end.day + 1))
+    qs = DailySummary.objects.filter(date__gte=start, date__lte=end)
+    if department:
+        qs = qs.filter(employee__department=department)
+    rows = qs.order_by().values_list(
+        "employee_id",
+        "employee__employee_id",
+        "employee__first_name",
+        "employee__last_name",
+        "employee__department",
+        "date",
+        "status",
+        "minutes_late",
+    )
+    frame = pd.DataFrame.from_records(list(rows), columns=COLUMNS)
+    if frame.empty:
+        employees = pd.DataFrame(
+            columns=["employee_id", "name", "department", *STATUSES, "minutes_late_total"], index=pd.Index([], name="pk")
+        )
+        grid = pd.DataFrame(index=employees.index, columns=days, dtype=object)
+        return AttendanceMatrix(start, end, days, employees, grid, grid)
+
+    frame["day"] = pd.to_datetime(frame["date"]).dt.day
+    statuses = frame.pivot(index="pk", columns="day", values="status").reindex(columns=days).fillna("")
+    late = frame.pivot(index="pk", columns="day", values="minutes_late").reindex(columns=days).fillna(0).astype(int)
+    labels = statuses.apply(lambda col: col.map(STATUS_CODES).fillna("")).astype(object)
+    late_mask = (statuses == DailySummary.STATUS_LATE) & (late > 0)
+    labels = labels.mask(late_mask, "K" + late.astype(str))
+
+    employees = frame.drop_duplicates("pk").set_index("pk")[["employee_id", "first_name", "last_name", "department"]]
+    employees["name"] = (employees["first_name"] + " " + employees["last_name"]).str.strip()
+    counts = pd.crosstab(frame["pk"], frame["status"]).reindex(columns=STATUSES, fill_value=0)
+    employees = employees[["employee_id", "name", "department"]].join(counts)
+    employees["minutes_late_total"] = frame.groupby("pk")["minutes_late"].sum()
+    employees = employees.sort_values(["department", "employee_id"])
+    return AttendanceMatrix(
+        start,
+        end,
+        days,
+        employees,
+        statuses.loc[employees.index].astype(object),
+        labels.loc[employees.index].astype(object),
+    )
+
+
+def export_attendance_matrix_excel(matrix: AttendanceMatrix):
+    """Write-only workbook: qatorlar to'g'ridan-to'g'ri oqimga yoziladi (katta oylar uchun xotira tejamli)."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Matrix")
+    ws.freeze_panes = "D2"
+    headers = ["Employee ID", "Name", "Department", *matrix.days, "Present", "Late", "Absent", "Leave", "Minutes Late"]
+    header_cells = []
+    for value in headers:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = Font(bold=True)
+        header_cells.append(cell)
+    ws.append(header_cells)
+    labels = matrix.labels.to_numpy()
+    for position, emp in enumerate(matrix.employees.itertuples(index=False)):
+        ws.append([
+            emp.employee_id,
+            emp.name,
+            emp.department,
+            *labels[position].tolist(),
+            *(int(getattr(emp, status)) for status in STATUSES),
+            int(emp.minutes_late_total),
+        ])
+    buf = BytesIO()
+    wb.save(buf)
+    buf.seek(0)
+    return buf
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReconciliationSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('raw_total', models.PositiveIntegerField(default=0)),
+                ('raw_unmatched', models.PositiveIntegerField(default=0)),
+                ('raw_failed', models.PositiveIntegerField(default=0)),
+                ('processed_without_log', models.PositiveIntegerField(default=0)),
+                ('processed_without_external_id', models.PositiveIntegerField(default=0)),
+                ('lateness_without_penalty', models.PositiveIntegerField(default=0)),
+                ('auto_penalty_without_lateness', models.PositiveIntegerField(default=0)),
+                ('duplicate_checkins', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Reconciliation Snapshot',
+                'verbose_name_plural': 'Reconciliation Snapshots',
+                'ordering': ['-date'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_reconciliation_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reconciliationsnapshot',
+            name='is_stale',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1 +1,29 @@
-# Reports use attendance and penalties models; no dedicated report models.
+"""Reports mostly read attendance and penalties models; snapshots below are precomputed aggregates."""
+from django.db import models
+
+
+class ReconciliationSnapshot(models.Model):
+    """
+    Bitta kun uchun reconciliation ko'rsatkichlari (nightly task yozadi).
+    Oraliq hisobotlari yopilgan kunlar uchun shu qatorlarni yig'adi, faqat bugun va snapshoti yo'q kunlar jonli hisoblanadi.
+    """
+    date = models.DateField(unique=True)
+    raw_total = models.PositiveIntegerField(default=0)
+    raw_unmatched = models.PositiveIntegerField(default=0)
+    raw_failed = models.PositiveIntegerField(default=0)
+    processed_without_log = models.PositiveIntegerField(default=0)
+    processed_without_external_id = models.PositiveIntegerField(default=0)
+    lateness_without_penalty = models.PositiveIntegerField(default=0)
+    auto_penalty_without_lateness = models.PositiveIntegerField(default=0)
+    duplicate_checkins = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField(auto_now=True)
+    # Manba ma'lumoti snapshotdan keyin o'zgargan: hisobotlarda jonli hisoblanadi, kechasi qayta yoziladi
+    is_stale = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["-date"]
+        verbose_name = "Reconciliation Snapshot"
+        verbose_name_plural = "Reconciliation Snapshots"
+
+    def __str__(self):
+        return f"reconciliation {self.date}"
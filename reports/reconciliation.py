@@ -0,0 +1,186 @@
+"""
+Reconciliation ko'rsatkichlari: har bir jadval bo'yicha bitta GROUP BY kun + shartli agregatsiya
+(4 ta so'rov, oraliq uzunligidan qat'i nazar). Yopilgan kunlar ReconciliationSnapshot da saqlanadi —
+oraliq hisoboti ularni yig'adi va faqat bugun/snapshoti yo'q kunlarni jonli hisoblaydi.
+Eski kunlarni o'zgartiradigan jarayonlar (replay/rematch, guruhni tayinlash, recompute_range, run_weekly_penalties)
+shu kunlar snapshotlarini invalidate_snapshots bilan eskirgan deb belgilaydi — ular jonli hisoblanadi,
+kechasi qayta yoziladi.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from attendance.models import AttendanceLog, LatenessRecord
+from core.date_range import datetime_bounds
+from integrations.models import RawDeviceEvent
+from penalties.models import Penalty
+
+from .models import ReconciliationSnapshot
+
+METRIC_FIELDS = [
+    "raw_total",
+    "raw_unmatched",
+    "raw_failed",
+    "processed_without_log",
+    "processed_without_external_id",
+    "lateness_without_penalty",
+    "auto_penalty_without_lateness",
+    "duplicate_checkins",
+]
+
+
+def empty_metrics():
+    return dict.fromkeys(METRIC_FIELDS, 0)
+
+
+def compute_daily_metrics(start, end):
+    """{date: {metric: count}} — [start, end] dagi har bir kun uchun (ma'lumot yo'q kunlar nol bilan)."""
+    days = defaultdict(empty_metrics)
+    for offset in range((end - start).days + 1):
+        days[start + timedelta(days=offset)]
+    dt_from, dt_to = datetime_bounds(start, end)
+
+    processed = Q(status=RawDeviceEvent.STATUS_PROCESSED)
+    has_log = Exists(AttendanceLog.objects.filter(source_id=OuterRef("external_event_id")))
+    raw_rows = (
+        RawDeviceEvent.objects.filter(received_at__gte=dt_from, received_at__lt=dt_to)
+        .annotate(day=TruncDate("received_at"))
+        .values("day")
+        .annotate(
+            raw_total=Count("id"),
+            raw_unmatched=Count("id", filter=Q(status=RawDeviceEvent.STATUS_UNMATCHED)),
+            raw_failed=Count("id", filter=Q(status=RawDeviceEvent.STATUS_FAILED)),
+            processed_without_log=Count("id", filter=processed & ~Q(external_event_id="") & ~has_log),
+            processed_without_external_id=Count("id", filter=processed & Q(external_event_id="")),
+        )
+        .order_by()
+    )
+    for row in raw_rows:
+        day = row.pop("day")
+        days[day].update(row)
+
+    lateness_rows = (
+        LatenessRecord.objects.filter(date__gte=start, date__lte=end)
+        .values("date")
+        .annotate(
+            c=Count("id", filter=~Exists(Penalty.objects.filter(lateness_record=OuterRef("pk"))))
+        )
+        .order_by()
+    )
+    for row in lateness_rows:
+        days[row["date"]]["lateness_without_penalty"] = row["c"]
+
+    penalty_rows = (
+        Penalty.objects.filter(
+            penalty_date__gte=start, penalty_date__lte=end, is_manual=False, lateness_record__isnull=True
+        )
+        .values("penalty_date")
+        .annotate(c=Count("id"))
+        .order_by()
+    )
+    for row in penalty_rows:
+        days[row["penalty_date"]]["auto_penalty_without_lateness"] = row["c"]
+
+    # Takroriy check-in lar: (xodim, mahalliy kun) guruhlari, faqat c > 1 bo'lganlari qaytadi
+    for row in duplicate_checkins_queryset(dt_from, dt_to).values("timestamp__date"):
+        days[row["timestamp__date"]]["duplicate_checkins"] += 1
+    return dict(days)
+
+
+def duplicate_checkins_queryset(dt_from, dt_to):
+    return (
+        AttendanceLog.objects.filter(timestamp__gte=dt_from, timestamp__lt=dt_to, event_type="check_in")
+        .values("employee_id", "timestamp__date")
+        .annotate(c=Count("id"))
+        .filter(c__gt=1)
+        .order_by("-c")
+    )
+
+
+def _missing_runs(start, end, covered):
+    """[start, end] dagi covered da bo'lmagan kunlarning uzluksiz (run_start, run_end) bo'laklari."""
+    runs = []
+    run_start = None
+    day = start
+    while day <= end:
+        if day in covered:
+            if run_start is not None:
+                runs.append((run_start, day - timedelta(days=1)))
+                run_start = None
+        elif run_start is None:
+            run_start = day
+        day += timedelta(days=1)
+    if run_start is not None:
+        runs.append((run_start, end))
+    return runs
+
+
+def range_metrics(start, end, today=None):
+    """
+    Oraliq yig'indisi: bugundan oldingi, eskirmagan snapshoti bor kunlar — bitta SUM so'rovi;
+    qolgan kunlar (bugun, kelajak, snapshot yozilmagan yoki eskirgan) — har bir uzluksiz bo'lak uchun compute_daily_metrics bilan jonli.
+    Tarixiy kunlar uchun snapshotlar: manage.py backfill_reconciliation_snapshots.
+    """
+    today = today or timezone.localdate()
+    totals = empty_metrics()
+    snapshots = ReconciliationSnapshot.objects.filter(
+        date__gte=start, date__lte=min(end, today - timedelta(days=1)), is_stale=False
+    )
+    snapshot_days = set(snapshots.values_list("date", flat=True))
+    if snapshot_days:
+        summed = snapshots.aggregate(**{field: Sum(field) for field in METRIC_FIELDS})
+        for field in METRIC_FIELDS:
+            totals[field] += summed[field] or 0
+
+    # Snapshoti yo'q kunlar uzluksiz bo'laklarga ajratiladi — boshidagi bitta bo'shliq butun oraliqni jonli skanerlatmaydi
+    for run_start, run_end in _missing_runs(start, end, snapshot_days):
+        for metrics in compute_daily_metrics(run_start, run_end).values():
+            for field in METRIC_FIELDS:
+                totals[field] += metrics[field]
+    return totals
+
+
+def write_snapshots(start, end):
+    """[start, end] kunlari uchun snapshot qatorlarini qayta yozadi; yozilgan kunlar sonini qaytaradi."""
+    daily = compute_daily_metrics(start, end)
+    now = timezone.now()
+    rows = [
+        ReconciliationSnapshot(date=day, computed_at=now, is_stale=False, **metrics) for day, metrics in daily.items()
+    ]
+    with transaction.atomic():
+        ReconciliationSnapshot.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["date"],
+            update_fields=[*METRIC_FIELDS, "computed_at", "is_stale"],
+        )
+    return len(rows)
+
+
+def invalidate_snapshots(days=(), start=None, end=None):
+    """
+    Ma'lumoti o'zgargan kunlar ([start, end] oralig'i va/yoki days) snapshotlarini eskirgan deb belgilaydi:
+    range_metrics ularni jonli hisoblaydi, snapshot_reconciliation esa keyingi kechada qayta yozadi.
+    """
+    days = {day for day in days if day}
+    if not days and not (start and end):
+        return 0
+    query = Q(date__in=days)
+    if start and end:
+        query |= Q(date__gte=start, date__lte=end)
+    return ReconciliationSnapshot.objects.filter(query, is_stale=False).update(is_stale=True)
+
+
+def refresh_stale_snapshots(end):
+    """end gacha eskirgan deb belgilangan snapshotlarni qayta yozadi; yozilgan kunlar sonini qaytaradi."""
+    stale = set(ReconciliationSnapshot.objects.filter(is_stale=True, date__lte=end).values_list("date", flat=True))
+    if not stale:
+        return 0
+    first, last = min(stale), max(stale)
+    # Eskirgan kunlarning uzluksiz bo'laklari: qolgan kunlar "qoplangan" hisoblanadi
+    others = {first + timedelta(days=offset) for offset in range((last - first).days + 1)} - stale
+    return sum(write_snapshots(run_start, run_end) for run_start, run_end in _missing_runs(first, last, others))
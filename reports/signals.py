@@ -0,0 +1,24 @@
+"""Signal handlers: hisobotlarda ko'rinadigan bog'liq ma'lumot o'zgarganda ETag versiyasini oshirish."""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from attendance.models import LatenessRecord
+from employees.models import Employee
+from penalties.models import Penalty, PenaltyRule
+
+from .conditional import bump_reports_version
+
+
+@receiver(post_save, sender=Employee, dispatch_uid="reports_version_employee_save")
+@receiver(post_delete, sender=Employee, dispatch_uid="reports_version_employee_delete")
+@receiver(post_save, sender=PenaltyRule, dispatch_uid="reports_version_rule_save")
+@receiver(post_delete, sender=PenaltyRule, dispatch_uid="reports_version_rule_delete")
+# Jarima sababi/qoidasi va kechikish yozuvi tahriri aggregate stampni o'zgartirmasligi mumkin
+@receiver(post_save, sender=Penalty, dispatch_uid="reports_version_penalty_save")
+@receiver(post_delete, sender=Penalty, dispatch_uid="reports_version_penalty_delete")
+@receiver(post_save, sender=LatenessRecord, dispatch_uid="reports_version_lateness_save")
+@receiver(post_delete, sender=LatenessRecord, dispatch_uid="reports_version_lateness_delete")
+def bump_reports_version_on_change(sender, **kwargs):
+    # Commitdan keyin: aks holda boshqa so'rov commitdan oldingi ma'lumotni yangi versiya bilan keshlashi mumkin
+    transaction.on_commit(bump_reports_version)
@@ -0,0 +1,41 @@
+"""Celery tasks: reconciliation va ustunli davomat snapshotlari."""
+import logging
+from datetime import date, timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from .columnar import refresh_snapshots
+from .reconciliation import refresh_stale_snapshots, write_snapshots
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True)
+def snapshot_reconciliation(self, day=None, days=None):
+    """
+    Kechagi kun va undan oldingi RECONCILIATION_SNAPSHOT_DAYS kun uchun snapshotlarni qayta yozadi —
+    kech kelgan eventlar/qayta ishlash natijalari ham keyingi kechada snapshotga tushadi.
+    Oynadan eski kunlardan invalidate_snapshots eskirgan deb belgilaganlari ham qayta yoziladi.
+    day: oxirgi kun (YYYY-MM-DD yoki date); berilmasa kecha.
+    """
+    if day is None:
+        day = timezone.localdate() - timedelta(days=1)
+    elif isinstance(day, str):
+        day = date.fromisoformat(day)
+    days = days or settings.RECONCILIATION_SNAPSHOT_DAYS
+    window_start = day - timedelta(days=days - 1)
+    written = write_snapshots(window_start, day)
+    # Oynadan eski, keyin o'zgargani uchun eskirgan deb belgilangan snapshotlar
+    refilled = refresh_stale_snapshots(window_start - timedelta(days=1))
+    logger.info("snapshot_reconciliation: %s days up to %s, %s older days refilled", written, day, refilled)
+    return {"ok": True, "day": str(day), "days": written, "refilled": refilled}
+
+
+@shared_task(bind=True)
+def refresh_attendance_snapshots(self, months=None):
+    """Oxirgi ATTENDANCE_SNAPSHOT_MONTHS yopilgan oyning ustunli snapshotlarini yangilaydi (o'zgarmaganlari o'tkaziladi)."""
+    written = refresh_snapshots(months=months)
+    logger.info("refresh_attendance_snapshots: %s", ", ".join(written) or "o'zgarish yo'q")
+    return {"ok": True, "written": written}
@@ -0,0 +1,69 @@
+"""Oylik xodim × kun matritsasi: pandas pivot, bo'lim filtri, HTML va write-only Excel eksport."""
+from datetime import date, time
+from io import BytesIO
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from openpyxl import load_workbook
+
+from accounts.models import User
+from attendance.models import DailySummary
+from employees.models import Employee
+from reports.matrix import build_attendance_matrix
+
+
+class AttendanceMatrixTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(User.objects.create_user(username="mx", password="x", role="manager"))
+        common = {"work_start_time": time(9, 0), "work_end_time": time(18, 0)}
+        self.a = Employee.objects.create(employee_id="M001", first_name="Ali", last_name="V", department="IT", **common)
+        self.b = Employee.objects.create(employee_id="M002", first_name="Bek", last_name="S", department="HR", **common)
+        DailySummary.objects.bulk_create([
+            DailySummary(employee=self.a, date=date(2026, 2, 2), status=DailySummary.STATUS_PRESENT),
+            DailySummary(employee=self.a, date=date(2026, 2, 3), status=DailySummary.STATUS_LATE, minutes_late=15),
+            DailySummary(employee=self.a, date=date(2026, 2, 4), status=DailySummary.STATUS_ABSENT),
+            DailySummary(employee=self.b, date=date(2026, 2, 2), status=DailySummary.STATUS_LEAVE),
+            DailySummary(employee=self.b, date=date(2026, 3, 1), status=DailySummary.STATUS_PRESENT),
+        ])
+
+    def test_pivot_from_single_query(self):
+        with self.assertNumQueries(1):
+            matrix = build_attendance_matrix(2026, 2)
+        self.assertEqual(matrix.days, list(range(1, 29)))
+        self.assertEqual(list(matrix.employees["employee_id"]), ["M002", "M001"])  # bo'lim, keyin ID
+        self.assertEqual(matrix.labels.loc[self.a.pk, 2], "+")
+        self.assertEqual(matrix.labels.loc[self.a.pk, 3], "K15")
+        self.assertEqual(matrix.labels.loc[self.a.pk, 4], "Y")
+        self.assertEqual(matrix.labels.loc[self.a.pk, 5], "")
+        self.assertEqual(matrix.labels.loc[self.b.pk, 2], "R")
+        self.assertEqual(matrix.employees.loc[self.a.pk, "minutes_late_total"], 15)
+        self.assertEqual(matrix.employees.loc[self.a.pk, DailySummary.STATUS_LATE], 1)
+
+        only_it = build_attendance_matrix(2026, 2, "IT")
+        self.assertEqual(list(only_it.employees.index), [self.a.pk])
+        self.assertEqual(len(build_attendance_matrix(2025, 2)), 0)
+
+    def test_html_view_and_excel_export(self):
+        response = self.client.get(reverse("reports:attendance_matrix"), {"month": "2026-02", "department": "IT"})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "K15")
+        self.assertNotContains(response, "M002 —")
+
+        response = self.client.get(reverse("reports:export_attendance_matrix"), {"month": "2026-02"})
+        self.assertEqual(response.status_code, 200)
+        ws = load_workbook(BytesIO(response.content)).active
+        rows = list(ws.iter_rows(values_only=True))
+        self.assertEqual(rows[0][:4], ("Employee ID", "Name", "Department", 1))
+        self.assertEqual(rows[2][:3], ("M001", "Ali V", "IT"))
+        self.assertEqual(rows[2][3 + 2], "K15")  # 3-fevral
+        self.assertEqual(rows[2][-1], 15)
+
+    def test_department_changes_etag(self):
+        url = reverse("reports:attendance_matrix")
+        etag = self.client.get(url, {"month": "2026-02"})["ETag"]
+        filtered = self.client.get(url, {"month": "2026-02", "department": "IT"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(filtered.status_code, 200)
+        self.assertEqual(self.client.get(url, {"month": "2026-02"}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
@@ -0,0 +1,76 @@
+"""Ustunli oylik davomat snapshotlari: yozish, memory-map bilan o'qish, yopilgan oylar DB siz va yangilash."""
+import tempfile
+from datetime import date, time
+
+import numpy as np
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from attendance.models import DailySummary
+from employees.models import Employee
+from reports.columnar import (
+    department_monthly_summary,
+    load_attendance,
+    load_month,
+    refresh_snapshots,
+    write_month_snapshot,
+)
+
+TODAY = date(2026, 3, 10)
+
+
+class AttendanceSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(ATTENDANCE_SNAPSHOT_DIR=self.tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        common = {"work_start_time": time(9, 0), "work_end_time": time(18, 0)}
+        self.it = Employee.objects.create(employee_id="S001", first_name="A", last_name="B", department="IT", **common)
+        self.hr = Employee.objects.create(employee_id="S002", first_name="C", last_name="D", department="HR", **common)
+        self.late_jan = DailySummary.objects.create(
+            employee=self.it, date=date(2026, 1, 5), status=DailySummary.STATUS_LATE, minutes_late=20, working_minutes=460
+        )
+        DailySummary.objects.bulk_create([
+            DailySummary(employee=self.it, date=date(2026, 1, 6), status=DailySummary.STATUS_PRESENT, working_minutes=480),
+            DailySummary(employee=self.hr, date=date(2026, 1, 6), status=DailySummary.STATUS_ABSENT),
+            DailySummary(employee=self.hr, date=date(2026, 2, 2), status=DailySummary.STATUS_LATE, minutes_late=5),
+            DailySummary(employee=self.it, date=date(2026, 3, 2), status=DailySummary.STATUS_LATE, minutes_late=7),
+        ])
+
+    def test_snapshot_columns_are_typed_and_memory_mapped(self):
+        self.assertEqual(write_month_snapshot(2026, 1), 3)
+        columns = load_month(2026, 1)
+        self.assertIsInstance(columns["status"], np.memmap)
+        self.assertEqual(columns["day"].dtype, np.int8)
+        self.assertEqual(columns["minutes_late"].tolist(), [20, 0, 0])
+        self.assertIsNone(load_month(2025, 12))
+
+    def test_closed_months_read_from_snapshots_only(self):
+        self.assertEqual(refresh_snapshots(months=3, today=TODAY), ["2025-12", "2026-01", "2026-02"])
+        self.assertEqual(refresh_snapshots(months=3, today=TODAY), [])  # o'zgarmagan oylar qayta yozilmaydi
+        with self.assertNumQueries(1):  # faqat ochiq oy (mart)
+            frame = load_attendance(date(2026, 1, 6), date(2026, 3, 31), today=TODAY)
+        self.assertEqual(len(frame), 4)
+        self.assertEqual(frame["minutes_late"].sum(), 12)
+
+        # Yopilgan oy o'zgarsa — kechasi shu oy qayta yoziladi
+        self.late_jan.minutes_late = 30
+        self.late_jan.save()
+        self.assertEqual(refresh_snapshots(months=3, today=TODAY), ["2026-01"])
+        summary = department_monthly_summary(date(2026, 1, 1), date(2026, 3, 31), today=TODAY)
+        it_january = summary[(summary["month"] == "2026-01") & (summary["department"] == "IT")].iloc[0]
+        self.assertEqual(it_january["minutes_late"], 30)
+        self.assertEqual(it_january["late_rate"], 50.0)
+
+    def test_analytics_view(self):
+        client = Client()
+        client.force_login(User.objects.create_user(username="an", password="x", role="manager"))
+        response = client.get(reverse("reports:analytics"), {"year": "2026"})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "2026-01")
+        self.assertEqual([d["name"] for d in response.context["departments"]], ["HR", "IT"])
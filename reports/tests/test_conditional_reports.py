@@ -0,0 +1,76 @@
+"""Hisobot va eksportlar uchun ETag / Last-Modified: o'zgarmagan ma'lumotga 304, o'zgarganda yangi tana."""
+from datetime import date, datetime, time
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from attendance.models import DailySummary
+from employees.models import Employee
+from penalties.models import Penalty
+
+
+class ConditionalReportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(User.objects.create_user(username="cond", password="x", role="manager"))
+        self.emp = Employee.objects.create(
+            employee_id="C001", first_name="A", last_name="B", work_start_time=time(9, 0), work_end_time=time(18, 0)
+        )
+        self.summary = DailySummary.objects.create(
+            employee=self.emp,
+            date=date(2026, 5, 4),
+            status=DailySummary.STATUS_PRESENT,
+            check_in_time=timezone.make_aware(datetime(2026, 5, 4, 9, 0)),
+            working_minutes=480,
+        )
+        self.params = {"date_from": "2026-05-01", "date_to": "2026-05-31"}
+
+    def test_report_returns_304_without_running_report_query(self):
+        url = reverse("reports:attendance")
+        first = self.client.get(url, self.params)
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+        self.assertIn("Last-Modified", first)
+        with self.assertNumQueries(3):  # sessiya, foydalanuvchi, versiya aggregate
+            again = self.client.get(url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+
+        self.summary.working_minutes = 300
+        self.summary.save()
+        changed = self.client.get(url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+
+    def test_employee_rename_invalidates_and_ranges_differ(self):
+        url = reverse("reports:attendance")
+        etag = self.client.get(url, self.params)["ETag"]
+        other = self.client.get(url, {"date_from": "2026-04-01", "date_to": "2026-04-30"})["ETag"]
+        self.assertNotEqual(etag, other)
+        self.emp.first_name = "Z"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.emp.save()
+        self.assertEqual(self.client.get(url, self.params, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_export_not_regenerated_when_unchanged(self):
+        url = reverse("reports:export_attendance")
+        first = self.client.get(url, self.params)
+        self.assertEqual(first.status_code, 200)
+        again = self.client.get(url, self.params, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+
+    def test_penalty_reason_edit_invalidates(self):
+        penalty = Penalty.objects.create(employee=self.emp, penalty_date=date(2026, 5, 4), amount=1000, reason="eski")
+        url = reverse("reports:penalty")
+        etag = self.client.get(url, self.params)["ETag"]
+        self.assertEqual(self.client.get(url, self.params, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        penalty.reason = "yangi"
+        with self.captureOnCommitCallbacks(execute=True):
+            penalty.save()
+        response = self.client.get(url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "yangi")
@@ -30,3 +30,131 @@ class ReconciliationReportTests(TestCase):
         self.assertEqual(r.status_code, 200)
         self.assertContains(r, "Reconciliation")
         self.assertContains(r, "Raw unmatched")
+
+    def test_raw_counts_use_local_day_bounds(self):
+        from datetime import datetime, timedelta
+        from django.utils import timezone
+
+        day_start = timezone.make_aware(datetime(2026, 4, 15))
+        inside = RawDeviceEvent.objects.create(status=RawDeviceEvent.STATUS_UNMATCHED, payload_json={})
+        before = RawDeviceEvent.objects.create(status=RawDeviceEvent.STATUS_UNMATCHED, payload_json={})
+        after = RawDeviceEvent.objects.create(status=RawDeviceEvent.STATUS_UNMATCHED, payload_json={})
+        RawDeviceEvent.objects.filter(pk=inside.pk).update(received_at=day_start)
+        RawDeviceEvent.objects.filter(pk=before.pk).update(received_at=day_start - timedelta(seconds=1))
+        RawDeviceEvent.objects.filter(pk=after.pk).update(received_at=day_start + timedelta(days=1))
+        r = self.client.get("/reports/reconciliation/", {"date_from": "2026-04-15", "date_to": "2026-04-15"})
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.context["metrics"]["raw_total"], 1)
+        self.assertEqual(r.context["metrics"]["raw_unmatched"], 1)
+
+
+class ReconciliationSnapshotTests(TestCase):
+    """Bitta o'tishdagi agregatsiya eski per-metrika so'rovlari bilan bir xil va snapshotlar bilan mos."""
+
+    def setUp(self):
+        from datetime import date, datetime, timedelta
+
+        from django.utils import timezone
+
+        from attendance.models import AttendanceLog, LatenessRecord
+        from penalties.models import Penalty
+
+        self.start = date(2026, 4, 13)
+        self.end = date(2026, 4, 16)
+        emp = Employee.objects.create(
+            employee_id="EMP900", first_name="A", last_name="B", work_start_time=time(9, 0), work_end_time=time(18, 0)
+        )
+        for offset in range(4):
+            day = self.start + timedelta(days=offset)
+            at = timezone.make_aware(datetime.combine(day, time(9, 30)))
+            raw = RawDeviceEvent.objects.create(
+                status=RawDeviceEvent.STATUS_PROCESSED, external_event_id=f"ev{offset}", payload_json={}
+            )
+            RawDeviceEvent.objects.filter(pk=raw.pk).update(received_at=at)
+            unmatched = RawDeviceEvent.objects.create(status=RawDeviceEvent.STATUS_UNMATCHED, payload_json={})
+            RawDeviceEvent.objects.filter(pk=unmatched.pk).update(received_at=at)
+            if offset % 2:
+                AttendanceLog.objects.create(employee=emp, event_type="check_in", timestamp=at, source_id=f"ev{offset}")
+            AttendanceLog.objects.create(employee=emp, event_type="check_in", timestamp=at, source_id=f"dup{offset}")
+            LatenessRecord.objects.create(employee=emp, date=day, minutes_late=30, check_in_time=at, expected_start=time(9, 0))
+            if offset == 3:
+                Penalty.objects.create(employee=emp, amount=1000, penalty_date=day, is_manual=False)
+
+    def test_single_pass_matches_expected_counts(self):
+        from reports.reconciliation import range_metrics
+
+        metrics = range_metrics(self.start, self.end, today=self.end)
+        self.assertEqual(metrics["raw_total"], 8)
+        self.assertEqual(metrics["raw_unmatched"], 4)
+        self.assertEqual(metrics["processed_without_log"], 2)
+        self.assertEqual(metrics["lateness_without_penalty"], 4)
+        self.assertEqual(metrics["auto_penalty_without_lateness"], 1)
+        self.assertEqual(metrics["duplicate_checkins"], 2)
+
+    def test_snapshots_are_summed_and_today_is_live(self):
+        from datetime import timedelta
+
+        from reports.models import ReconciliationSnapshot
+        from reports.reconciliation import range_metrics
+        from reports.tasks import snapshot_reconciliation
+
+        live = range_metrics(self.start, self.end, today=self.end)
+        snapshot_reconciliation(day=self.end - timedelta(days=1), days=3)
+        self.assertEqual(ReconciliationSnapshot.objects.count(), 3)
+        with self.assertNumQueries(6):  # snapshot kunlari + SUM + bugun uchun 4 ta so'rov
+            combined = range_metrics(self.start, self.end, today=self.end)
+        self.assertEqual(combined, live)
+
+    def test_gap_at_range_start_only_scans_missing_days(self):
+        from datetime import timedelta
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from reports.models import ReconciliationSnapshot
+        from reports.reconciliation import range_metrics
+
+        today = self.end + timedelta(days=1)
+        live = range_metrics(self.start, self.end, today=today)
+        call_command(
+            "backfill_reconciliation_snapshots",
+            "--from", str(self.start + timedelta(days=1)), "--to", str(self.end), "--block", "2",
+            stdout=StringIO(),
+        )
+        self.assertTrue(ReconciliationSnapshot.objects.filter(date=self.end).exists())
+        self.assertFalse(ReconciliationSnapshot.objects.filter(date=self.start).exists())
+        with self.assertNumQueries(6):  # snapshot kunlari + SUM + faqat birinchi kun uchun 4 ta so'rov
+            combined = range_metrics(self.start, self.end, today=today)
+        self.assertEqual(combined, live)
+
+    def test_replay_marks_old_snapshots_stale_until_nightly_refresh(self):
+        from datetime import datetime, timedelta
+
+        from django.utils import timezone
+
+        from integrations.tasks import replay_raw_events_batch
+        from reports.models import ReconciliationSnapshot
+        from reports.reconciliation import range_metrics, write_snapshots
+        from reports.tasks import snapshot_reconciliation
+
+        raw = RawDeviceEvent.objects.create(
+            status=RawDeviceEvent.STATUS_UNMATCHED,
+            payload_json={"employee_id": "HV900", "event_type": "check_in", "timestamp": "2026-04-13T09:40:00+05:00"},
+        )
+        RawDeviceEvent.objects.filter(pk=raw.pk).update(
+            received_at=timezone.make_aware(datetime(2026, 4, 13, 9, 40))
+        )
+        write_snapshots(self.start, self.end)
+        self.assertEqual(range_metrics(self.start, self.end)["raw_unmatched"], 5)
+
+        # Eski kundagi eventni qo'lda tayinlash: snapshot eskiradi, jami jonli hisoblanadi
+        replay_raw_events_batch([raw.pk], employee_id="EMP900")
+        self.assertTrue(ReconciliationSnapshot.objects.get(date=self.start).is_stale)
+        self.assertEqual(range_metrics(self.start, self.end)["raw_unmatched"], 4)
+
+        # Kechki task oynadan eski eskirgan kunni ham qayta yozadi
+        result = snapshot_reconciliation(day=self.end + timedelta(days=30), days=3)
+        self.assertEqual(result["refilled"], 1)
+        snapshot = ReconciliationSnapshot.objects.get(date=self.start)
+        self.assertFalse(snapshot.is_stale)
+        self.assertEqual(snapshot.raw_unmatched, 1)
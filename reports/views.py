@@ -1,20 +1,27 @@
 """Reports: daily/weekly/monthly/yearly with Excel export."""
+from datetime import date
+
 from django.views.generic import TemplateView
 from django.utils import timezone
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import HttpResponse
-from django.db.models import Sum, Count, Exists, OuterRef
+from django.db.models import Sum, Exists, OuterRef
 from django.views import View
 from core.decorators import manager_required
 from django.utils.decorators import method_decorator
 
 from attendance.models import DailySummary, LatenessRecord
+from employees.models import Employee
 from penalties.models import Penalty
-from integrations.models import RawDeviceEvent
-from core.date_range import parse_date_range, query_string_for_export
+from core.date_range import parse_date_range, query_string_for_export, datetime_bounds
+from .columnar import department_monthly_summary
+from .conditional import ConditionalReportMixin
 from .export import export_attendance_excel, export_lateness_excel, export_penalty_excel
+from .matrix import build_attendance_matrix, export_attendance_matrix_excel, month_bounds
+from .reconciliation import duplicate_checkins_queryset, range_metrics
 
 REPORT_ROW_LIMIT = 500
+MATRIX_ROW_LIMIT = 1000
 
 
 @method_decorator(manager_required, name="dispatch")
@@ -27,6 +34,11 @@ class ReportDashboardView(LoginRequiredMixin, TemplateView):
         return context
 
 
+def _report_dates(request):
+    start, end, _mode = parse_date_range(request, default_period="month")
+    return start, end
+
+
 def _report_context(request):
     start, end, mode = parse_date_range(request, default_period="month")
     export_q = query_string_for_export(
@@ -49,8 +61,12 @@ def _report_context(request):
 
 
 @method_decorator(manager_required, name="dispatch")
-class ReportAttendanceView(LoginRequiredMixin, TemplateView):
+class ReportAttendanceView(LoginRequiredMixin, ConditionalReportMixin, TemplateView):
     template_name = "reports/attendance_report.html"
+    conditional_scope = "attendance"
+
+    def report_dates(self, request):
+        return _report_dates(request)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -66,8 +82,12 @@ class ReportAttendanceView(LoginRequiredMixin, TemplateView):
 
 
 @method_decorator(manager_required, name="dispatch")
-class ReportLatenessView(LoginRequiredMixin, TemplateView):
+class ReportLatenessView(LoginRequiredMixin, ConditionalReportMixin, TemplateView):
     template_name = "reports/lateness_report.html"
+    conditional_scope = "lateness"
+
+    def report_dates(self, request):
+        return _report_dates(request)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -83,8 +103,12 @@ class ReportLatenessView(LoginRequiredMixin, TemplateView):
 
 
 @method_decorator(manager_required, name="dispatch")
-class ReportPenaltyView(LoginRequiredMixin, TemplateView):
+class ReportPenaltyView(LoginRequiredMixin, ConditionalReportMixin, TemplateView):
     template_name = "reports/penalty_report.html"
+    conditional_scope = "penalty"
+
+    def report_dates(self, request):
+        return _report_dates(request)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -100,6 +124,103 @@ class ReportPenaltyView(LoginRequiredMixin, TemplateView):
         return context
 
 
+def _matrix_params(request):
+    """?month=YYYY-MM (standart: joriy oy) va ?department=... ."""
+    today = timezone.localdate()
+    year, month = today.year, today.month
+    raw = (request.GET.get("month") or "").strip()
+    try:
+        parsed_year, parsed_month = (int(part) for part in raw.split("-"))
+        if 1 <= parsed_month <= 12 and 2000 <= parsed_year <= 2100:
+            year, month = parsed_year, parsed_month
+    except ValueError:
+        pass
+    return year, month, (request.GET.get("department") or "").strip()
+
+
+class _MatrixConditionalMixin(ConditionalReportMixin):
+    conditional_scope = "attendance"
+
+    def report_dates(self, request):
+        year, month, _department = _matrix_params(request)
+        return month_bounds(year, month)
+
+    def conditional_extra(self, request):
+        return "matrix|" + _matrix_params(request)[2]
+
+
+@method_decorator(manager_required, name="dispatch")
+class ReportAttendanceMatrixView(LoginRequiredMixin, _MatrixConditionalMixin, TemplateView):
+    """Xodim × kun oylik davomat jadvali (bo'lim bo'yicha filtr)."""
+
+    template_name = "reports/attendance_matrix.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        year, month, department = _matrix_params(self.request)
+        matrix = build_attendance_matrix(year, month, department or None)
+        context.update({
+            "matrix": matrix,
+            "rows": matrix.html_rows(limit=MATRIX_ROW_LIMIT),
+            "filter_month": f"{year:04d}-{month:02d}",
+            "department": department,
+            "departments": Employee.objects.exclude(department="").order_by("department").values_list("department", flat=True).distinct(),
+            "export_query": query_string_for_export(self.request, allowed_keys={"month", "department"}),
+            "report_truncated": len(matrix) > MATRIX_ROW_LIMIT,
+            "report_row_limit": MATRIX_ROW_LIMIT,
+        })
+        return context
+
+
+@method_decorator(manager_required, name="dispatch")
+class ReportAnalyticsView(LoginRequiredMixin, TemplateView):
+    """Yil bo'yi kechikish trendi va bo'limlarni solishtirish (yopilgan oylar ustunli snapshotlardan)."""
+
+    template_name = "reports/analytics.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        today = timezone.localdate()
+        try:
+            year = int(self.request.GET.get("year") or today.year)
+        except ValueError:
+            year = today.year
+        year = min(max(year, 2000), today.year)
+        end = today if year == today.year else date(year, 12, 31)
+        summary = department_monthly_summary(date(year, 1, 1), end, today=today)
+        months = [f"{year:04d}-{m:02d}" for m in range(1, end.month + 1)]
+
+        trend = summary.groupby("month")[["employee_days", "late_days", "minutes_late"]].sum()
+        trend_cells = []
+        for month in months:
+            if month in trend.index and trend.loc[month, "employee_days"]:
+                row = trend.loc[month]
+                trend_cells.append({
+                    "late_rate": round(100 * row["late_days"] / row["employee_days"], 1),
+                    "minutes_late": int(row["minutes_late"]),
+                })
+            else:
+                trend_cells.append(None)
+
+        by_department = {}
+        for row in summary.itertuples(index=False):
+            by_department.setdefault(row.department, {})[row.month] = {
+                "late_rate": row.late_rate,
+                "minutes_late": int(row.minutes_late),
+            }
+        context.update({
+            "year": year,
+            "years": list(range(today.year, today.year - 5, -1)),
+            "months": months,
+            "trend": trend_cells,
+            "departments": [
+                {"name": name, "cells": [cells.get(month) for month in months]}
+                for name, cells in sorted(by_department.items())
+            ],
+        })
+        return context
+
+
 @method_decorator(manager_required, name="dispatch")
 class ReportReconciliationView(LoginRequiredMixin, TemplateView):
     """Cross-check consistency between ingestion, attendance and penalties."""
@@ -112,16 +233,9 @@ class ReportReconciliationView(LoginRequiredMixin, TemplateView):
         start, end = ctx["start"], ctx["end"]
         context.update(ctx)
 
-        raw_qs = RawDeviceEvent.objects.filter(received_at__date__gte=start, received_at__date__lte=end)
-        from attendance.models import AttendanceLog
-
-        processed_without_log_count = raw_qs.filter(
-            status=RawDeviceEvent.STATUS_PROCESSED,
-        ).exclude(external_event_id="").exclude(
-            Exists(
-                AttendanceLog.objects.filter(source_id=OuterRef("external_event_id"))
-            )
-        ).count()
+        dt_from, dt_to = datetime_bounds(start, end)
+        # Ko'rsatkichlar: yopilgan kunlar snapshotlardan, qolganlari kun bo'yicha bitta o'tishda
+        context["metrics"] = range_metrics(start, end)
 
         lateness_without_penalty_qs = LatenessRecord.objects.filter(
             date__gte=start,
@@ -139,31 +253,8 @@ class ReportReconciliationView(LoginRequiredMixin, TemplateView):
             lateness_record__isnull=True,
         )
 
-        duplicate_checkins_qs = (
-            AttendanceLog.objects.filter(
-                timestamp__date__gte=start,
-                timestamp__date__lte=end,
-                event_type="check_in",
-            )
-            .values("employee_id", "timestamp__date")
-            .annotate(c=Count("id"))
-            .filter(c__gt=1)
-            .order_by("-c")
-        )
+        duplicate_checkins_qs = duplicate_checkins_queryset(dt_from, dt_to)
 
-        context["metrics"] = {
-            "raw_total": raw_qs.count(),
-            "raw_unmatched": raw_qs.filter(status=RawDeviceEvent.STATUS_UNMATCHED).count(),
-            "raw_failed": raw_qs.filter(status=RawDeviceEvent.STATUS_FAILED).count(),
-            "processed_without_log": processed_without_log_count,
-            "processed_without_external_id": raw_qs.filter(
-                status=RawDeviceEvent.STATUS_PROCESSED,
-                external_event_id="",
-            ).count(),
-            "lateness_without_penalty": lateness_without_penalty_qs.count(),
-            "auto_penalty_without_lateness": penalty_without_lateness_qs.count(),
-            "duplicate_checkins": duplicate_checkins_qs.count(),
-        }
         context["lateness_without_penalty"] = lateness_without_penalty_qs.select_related("employee").order_by("-date")[:50]
         context["penalty_without_lateness"] = penalty_without_lateness_qs.select_related("employee").order_by("-penalty_date")[:50]
         context["duplicate_checkins"] = list(duplicate_checkins_qs[:50])
@@ -171,7 +262,13 @@ class ReportReconciliationView(LoginRequiredMixin, TemplateView):
 
 
 @method_decorator(manager_required, name="dispatch")
-class ExportAttendanceExcelView(LoginRequiredMixin, View):
+class ExportAttendanceExcelView(LoginRequiredMixin, ConditionalReportMixin, View):
+    conditional_scope = "attendance"
+    etag_per_user = False
+
+    def report_dates(self, request):
+        return _report_dates(request)
+
     def get(self, request, *args, **kwargs):
         start, end, _ = parse_date_range(request, default_period="month")
         buf = export_attendance_excel(start, end)
@@ -181,7 +278,13 @@ class ExportAttendanceExcelView(LoginRequiredMixin, View):
 
 
 @method_decorator(manager_required, name="dispatch")
-class ExportLatenessExcelView(LoginRequiredMixin, View):
+class ExportLatenessExcelView(LoginRequiredMixin, ConditionalReportMixin, View):
+    conditional_scope = "lateness"
+    etag_per_user = False
+
+    def report_dates(self, request):
+        return _report_dates(request)
+
     def get(self, request, *args, **kwargs):
         start, end, _ = parse_date_range(request, default_period="month")
         buf = export_lateness_excel(start, end)
@@ -191,10 +294,28 @@ class ExportLatenessExcelView(LoginRequiredMixin, View):
 
 
 @method_decorator(manager_required, name="dispatch")
-class ExportPenaltyExcelView(LoginRequiredMixin, View):
+class ExportPenaltyExcelView(LoginRequiredMixin, ConditionalReportMixin, View):
+    conditional_scope = "penalty"
+    etag_per_user = False
+
+    def report_dates(self, request):
+        return _report_dates(request)
+
     def get(self, request, *args, **kwargs):
         start, end, _ = parse_date_range(request, default_period="month")
         buf = export_penalty_excel(start, end)
         response = HttpResponse(buf.getvalue(), content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
         response["Content-Disposition"] = f'attachment; filename="penalties_{start}_{end}.xlsx"'
         return response
+
+
+@method_decorator(manager_required, name="dispatch")
+class ExportAttendanceMatrixExcelView(LoginRequiredMixin, _MatrixConditionalMixin, View):
+    etag_per_user = False
+
+    def get(self, request, *args, **kwargs):
+        year, month, department = _matrix_params(request)
+        buf = export_attendance_matrix_excel(build_attendance_matrix(year, month, department or None))
+        response = HttpResponse(buf.getvalue(), content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        response["Content-Disposition"] = f'attachment; filename="attendance_matrix_{year:04d}-{month:02d}.xlsx"'
+        return response